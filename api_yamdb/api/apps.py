@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     name = "api"
     verbose_name = 'API для получение отзывов(Review)'
+
+    def ready(self):
+        from . import profiling  # noqa: F401
+        from .v1 import cache  # noqa: F401
@@ -0,0 +1,84 @@
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def accepted_encodings(request):
+    """Content codings the client accepts, with a non-zero quality."""
+    accepted = set()
+    for part in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        coding, _, params = part.partition(";")
+        quality = params.strip().partition("q=")[2]
+        try:
+            if quality and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def compress(content, encoding):
+    if encoding == "br":
+        return brotli.compress(
+            content, quality=settings.COMPRESSION_BROTLI_QUALITY
+        )
+    return gzip.compress(
+        content, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0
+    )
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses of at least COMPRESSION_MIN_SIZE bytes with
+    brotli, when it is installed and accepted, or gzip. Smaller bodies
+    gain less than the time spent on them. Streamed responses, like
+    exports, are compressed by gzip chunk by chunk. Compressed responses
+    get weak ETags, as GZipMiddleware of Django does.
+    """
+
+    def get_encoding(self, request, response):
+        accepted = accepted_encodings(request)
+        # Brotli compresses whole bodies only
+        if brotli is not None and "br" in accepted and not response.streaming:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        if not response.streaming and (
+            len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = self.get_encoding(request, response)
+        if encoding is None:
+            return response
+        if response.streaming:
+            response.streaming_content = compress_sequence(
+                response.streaming_content
+            )
+            del response["Content-Length"]
+        else:
+            content = compress(response.content, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response["Content-Length"] = str(len(content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,299 @@
+import cProfile
+import hashlib
+import os
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from rest_framework.fields import empty
+
+current_profile = ContextVar("current_profile", default=None)
+
+# Sections measured besides the whole request, in Server-Timing order
+SECTIONS = ("db", "serializer", "render")
+METRICS = (
+    ("requests_total", "counter", "Requests handled."),
+    ("request_seconds_total", "counter", "Time spent handling requests."),
+    ("db_queries_total", "counter", "Database queries executed."),
+    ("db_seconds_total", "counter", "Time spent in database queries."),
+    ("serializer_seconds_total", "counter", "Time spent in serializers."),
+    ("render_seconds_total", "counter", "Time spent rendering responses."),
+    ("response_bytes_total", "counter", "Response body bytes sent."),
+)
+LABELS = ("view", "action", "method", "status")
+METRICS_KEY = "metrics:{}"
+# Cache backends increment integers, seconds are kept in microseconds
+MICROSECONDS = 10 ** 6
+
+
+class RequestProfile:
+    """Timings of one request, nested sections of a kind count once."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.seconds = defaultdict(float)
+        self.queries = 0
+        self.active = set()
+        self.render_started = None
+
+    @contextmanager
+    def section(self, name):
+        if name in self.active:
+            yield
+            return
+        self.active.add(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - started
+            self.active.discard(name)
+
+    def record_query(self, execute, sql, params, many, context):
+        self.queries += 1
+        with self.section("db"):
+            return execute(sql, params, many, context)
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+
+def profile_section(name):
+    """Measure a section of the current request, if it is profiled."""
+    profile = current_profile.get()
+    return nullcontext() if profile is None else profile.section(name)
+
+
+class ProfiledSerializerMixin:
+    """Count serialization and validation time in the request profile."""
+
+    def to_representation(self, instance):
+        with profile_section("serializer"):
+            return super().to_representation(instance)
+
+    def run_validation(self, data=empty):
+        with profile_section("serializer"):
+            return super().run_validation(data)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper of every connection, counts queries of profiles."""
+    profile = current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    return profile.record_query(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def wrap_connection(sender, connection, **kwargs):
+    # Connections of any thread, like the async read pool, are counted
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def increment(cache, key, delta):
+    """Add delta to a counter of the cache, return its new value."""
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        if cache.add(key, delta, None):
+            return delta
+        return cache.incr(key, delta)
+
+
+class MetricsRegistry:
+    """
+    Counters of profiled requests by view, action, method and status in
+    the METRICS_CACHE_ALIAS cache, so workers sharing it add up to one
+    total. Label sets are numbered in the cache as they first appear,
+    for render() to find their counters.
+    """
+
+    @property
+    def cache(self):
+        return caches[settings.METRICS_CACHE_ALIAS]
+
+    @staticmethod
+    def counter_key(labels, name):
+        digest = hashlib.md5(repr(labels).encode("utf-8")).hexdigest()
+        return METRICS_KEY.format(f"{digest}:{name}")
+
+    def register(self, labels):
+        cache = self.cache
+        if cache.add(self.counter_key(labels, "labels"), True, None):
+            number = increment(cache, METRICS_KEY.format("labels"), 1)
+            cache.set(METRICS_KEY.format(f"labels:{number}"), labels, None)
+
+    def record(self, labels, **values):
+        self.register(labels)
+        for name, value in values.items():
+            if name.endswith("_seconds_total"):
+                value = round(value * MICROSECONDS)
+            if value:
+                increment(self.cache, self.counter_key(labels, name), value)
+
+    def label_sets(self):
+        cache = self.cache
+        count = cache.get(METRICS_KEY.format("labels"), 0)
+        keys = [
+            METRICS_KEY.format(f"labels:{number}")
+            for number in range(1, count + 1)
+        ]
+        return keys, set(cache.get_many(keys).values())
+
+    def clear(self):
+        keys, label_sets = self.label_sets()
+        keys.append(METRICS_KEY.format("labels"))
+        for labels in label_sets:
+            keys.append(self.counter_key(labels, "labels"))
+            keys.extend(
+                self.counter_key(labels, name) for name, _, _ in METRICS
+            )
+        self.cache.delete_many(keys)
+
+    def render(self, prefix="yamdb_"):
+        """Counters in Prometheus text exposition format."""
+        label_sets = sorted(self.label_sets()[1])
+        found = self.cache.get_many([
+            self.counter_key(labels, name)
+            for labels in label_sets
+            for name, _, _ in METRICS
+        ])
+        lines = []
+        for name, kind, description in METRICS:
+            lines.append(f"# HELP {prefix}{name} {description}")
+            lines.append(f"# TYPE {prefix}{name} {kind}")
+            for labels in label_sets:
+                value = found.get(self.counter_key(labels, name), 0)
+                if name.endswith("_seconds_total"):
+                    value /= MICROSECONDS
+                text = ",".join(
+                    f'{key}="{label}"' for key, label in zip(LABELS, labels)
+                )
+                lines.append(f"{prefix}{name}{{{text}}} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def view_labels(request):
+    """(view, action) of the resolved DRF view or Django view function."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved", ""
+    view = getattr(match.func, "cls", match.func)
+    actions = getattr(match.func, "actions", None) or {}
+    return (
+        getattr(view, "__name__", type(view).__name__),
+        actions.get(request.method.lower(), request.method.lower()),
+    )
+
+
+def counted(chunks, on_close):
+    """Pass streamed chunks through, report their total size at the end."""
+    size = 0
+    try:
+        for chunk in chunks:
+            size += len(chunk)
+            yield chunk
+    finally:
+        on_close(size)
+
+
+class ProfilingMiddleware:
+    """
+    Enabled by API_PROFILING. Records view and action, database query
+    count and time, serializer, rendering and total time and response
+    size of every request. Sends them in the Server-Timing header and
+    adds them to the counters served by the metrics endpoint. With
+    API_PROFILING_DUMP_DIR set, a sample of requests is run under
+    cProfile and dumped there.
+    """
+
+    def __init__(self, get_response):
+        if not settings.API_PROFILING:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.dump_dir = settings.API_PROFILING_DUMP_DIR
+        self.sample_rate = settings.API_PROFILING_SAMPLE_RATE
+        if self.dump_dir:
+            os.makedirs(self.dump_dir, exist_ok=True)
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        profiler = None
+        if self.dump_dir and random.random() < self.sample_rate:
+            profiler = cProfile.Profile()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            current_profile.reset(token)
+        view, action = view_labels(request)
+        if profiler is not None:
+            self.dump(profiler, view, action)
+        response["Server-Timing"] = self.server_timing(profile, view, action)
+        labels = (view, action, request.method, str(response.status_code))
+        values = {
+            "requests_total": 1,
+            "request_seconds_total": profile.total(),
+            "db_queries_total": profile.queries,
+            "db_seconds_total": profile.seconds["db"],
+            "serializer_seconds_total": profile.seconds["serializer"],
+            "render_seconds_total": profile.seconds["render"],
+        }
+        if response.streaming:
+            response.streaming_content = counted(
+                response.streaming_content,
+                lambda size: metrics.record(
+                    labels, response_bytes_total=size
+                ),
+            )
+        else:
+            values["response_bytes_total"] = len(response.content)
+        metrics.record(labels, **values)
+        return response
+
+    def process_template_response(self, request, response):
+        """DRF responses render right after this hook."""
+        profile = current_profile.get()
+        if profile is not None:
+            profile.render_started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: self.rendered(profile)
+            )
+        return response
+
+    @staticmethod
+    def rendered(profile):
+        profile.seconds["render"] += (
+            time.perf_counter() - profile.render_started
+        )
+
+    @staticmethod
+    def server_timing(profile, view, action):
+        entries = [f'view;desc="{view}.{action}"']
+        for name in SECTIONS:
+            entry = f"{name};dur={profile.seconds[name] * 1000:.2f}"
+            if name == "db":
+                entry += f';desc="{profile.queries} queries"'
+            entries.append(entry)
+        entries.append(f"total;dur={profile.total() * 1000:.2f}")
+        return ", ".join(entries)
+
+    def dump(self, profiler, view, action):
+        name = f"{int(time.time() * 1000)}-{view}.{action}-{uuid4().hex[:8]}"
+        profiler.dump_stats(os.path.join(self.dump_dir, f"{name}.prof"))
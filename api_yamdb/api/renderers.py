@@ -0,0 +1,67 @@
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Magnitudes of floats which orjson writes as the stdlib does. Beyond
+# them it writes exponents like 1e-7 instead of 1e-07, and null for NaN
+# and infinity, which strict encoding refuses
+PLAIN_FLOATS = (1e-4, 1e16)
+# Most values, skipped without isinstance() checks
+SCALARS = frozenset([str, int, bool, type(None)])
+
+
+def has_exponent_floats(data):
+    """Whether data holds a float beyond PLAIN_FLOATS, NaN included."""
+    if isinstance(data, dict):
+        data = data.values()
+    elif not isinstance(data, (list, tuple)):
+        if not isinstance(data, (float, Decimal)):
+            return False
+        # Decimals are encoded as floats
+        value = abs(float(data))
+        low, high = PLAIN_FLOATS
+        return bool(value) and not low <= value < high
+    for item in data:
+        if type(item) not in SCALARS and has_exponent_floats(item):
+            return True
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when it is installed. The output
+    keeps the bytes of the compact, unicode, strict stdlib encoding of
+    DRF: dates, times and other objects go through its encoder class,
+    line separators are escaped. Indented output, other settings, data
+    orjson refuses, like integers beyond 64 bits, and floats it would
+    write differently are encoded by the stdlib.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or not (self.compact and self.strict)
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            is not None
+            or has_exponent_floats(data)
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME
+                | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
@@ -0,0 +1,101 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+PIN_KEY = "replicas:pin:{}"
+
+reading_from_replica = ContextVar("reading_from_replica", default=False)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Send reads inside the block to DATABASE_REPLICAS, or the primary."""
+    token = reading_from_replica.set(enabled)
+    try:
+        yield
+    finally:
+        reading_from_replica.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Reads inside replica_reads go to a random replica, unless the
+    primary has an open transaction. Everything else goes to the
+    default database. Replicas get their tables by replication, so they
+    are never migrated.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or not reading_from_replica.get():
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        # Rows read from a replica are saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def user_id(request):
+    """User of the access token sent with the request, not checked."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    try:
+        raw_token = authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+        token = authentication.get_validated_token(raw_token)
+    except AuthenticationFailed:
+        return None
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+class ReplicaMiddleware:
+    """
+    Enabled when DATABASE_REPLICAS are set. Safe requests read from the
+    replicas. A user whose write succeeded reads from the primary for
+    the next REPLICA_PIN_SECONDS, so replication lag never hides their
+    own changes. Pins are kept in the API cache, which must be shared by
+    the workers. Anonymous writes, like signup, are not pinned.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.pin_seconds = settings.REPLICA_PIN_SECONDS
+        self.cache = caches[settings.API_CACHE_ALIAS]
+
+    def __call__(self, request):
+        user = user_id(request)
+        key = None if user is None else PIN_KEY.format(user)
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            if key is not None and response.status_code < 400:
+                self.cache.set(key, True, self.pin_seconds)
+            return response
+        if key is not None and self.cache.get(key):
+            return self.get_response(request)
+        with replica_reads():
+            return self.get_response(request)
@@ -0,0 +1,194 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+WINDOW_KEY = "throttle:{}:{}"
+
+
+def parse_rate(rate):
+    """(requests, seconds) of a rate like "10/m", None for no limit."""
+    if rate is None:
+        return None
+    number, period = rate.split("/")
+    if int(number) < 1:
+        raise ImproperlyConfigured(
+            f"Throttle rate {rate!r} must allow at least one request"
+        )
+    return int(number), PERIODS[period[0]]
+
+
+class MemoryStore:
+    """
+    Token buckets in memory of the process, shared by its threads.
+    A bucket holds up to limit tokens and refills at limit per period,
+    so bursts are allowed as long as the average rate keeps. The least
+    recently used buckets are dropped beyond max_entries.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        # key: (tokens, updated at)
+        self.buckets = OrderedDict()
+
+    def consume(self, key, limit, period):
+        """Take a token, or return seconds to wait when there is none."""
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self.buckets.pop(key, (limit, now))
+            tokens = min(limit, tokens + (now - updated) * limit / period)
+            allowed = tokens >= 1
+            self.buckets[key] = (tokens - 1 if allowed else tokens, now)
+            if len(self.buckets) > self.max_entries:
+                self.buckets.popitem(last=False)
+        if allowed:
+            return None
+        return (1 - tokens) * period / limit
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheStore:
+    """
+    Sliding window counters in a cache shared by the workers. Requests
+    of the previous fixed window count in proportion to its part still
+    inside the sliding one. Counters are changed by the atomic incr of
+    memcached and Redis, a burst may overshoot the limit by the number
+    of concurrent checks.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def consume(self, key, limit, period):
+        cache = caches[self.alias]
+        now = time.time()
+        window = int(now // period)
+        current_key = WINDOW_KEY.format(key, window)
+        previous_key = WINDOW_KEY.format(key, window - 1)
+        counts = cache.get_many([previous_key, current_key])
+        previous = counts.get(previous_key, 0)
+        current = counts.get(current_key, 0)
+        elapsed = now - window * period
+        if previous * (1 - elapsed / period) + current + 1 > limit:
+            return self.wait(previous, current, limit, period, elapsed)
+        cache.add(current_key, 0, period * 2)
+        try:
+            cache.incr(current_key)
+        except ValueError:
+            # Evicted between add and incr
+            cache.set(current_key, 1, period * 2)
+        return None
+
+    @staticmethod
+    def wait(previous, current, limit, period, elapsed):
+        """Seconds until the weighted count leaves room for a request."""
+        room = limit - 1
+        if current > room:
+            # Current window becomes the previous one first
+            return period - elapsed + period * (1 - room / current)
+        return max(period * (1 - (room - current) / previous) - elapsed, 0)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    """Store of the THROTTLE_STORE setting, "memory" or "cache"."""
+    name = settings.THROTTLE_STORE
+    with _stores_lock:
+        if name not in _stores:
+            if name == "cache":
+                _stores[name] = CacheStore(settings.THROTTLE_CACHE_ALIAS)
+            else:
+                _stores[name] = MemoryStore(settings.THROTTLE_MEMORY_ENTRIES)
+        return _stores[name]
+
+
+class RateThrottle(BaseThrottle):
+    """
+    Limit requests of a client kind, by default the client address,
+    through the throttle store. Rate of a view is the
+    "<throttle_scope>.<kind>" entry of DEFAULT_THROTTLE_RATES, falling
+    back to the "<kind>" entry. Neither the check nor a 429 answer touch
+    the database.
+    """
+
+    kind = None
+
+    def get_client(self, request):
+        """Client key of the request, None to not throttle it."""
+        return self.get_ident(request)
+
+    def get_scope(self, view):
+        return getattr(view, "throttle_scope", None) or "default"
+
+    def get_rate(self, view):
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        scoped = f"{self.get_scope(view)}.{self.kind}"
+        return parse_rate(rates.get(scoped, rates.get(self.kind)))
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        rate = self.get_rate(view)
+        if rate is None:
+            return True
+        client = self.get_client(request)
+        if client is None:
+            return True
+        key = f"{self.get_scope(view)}:{self.kind}:{client}"
+        wait = get_store().consume(key, *rate)
+        if wait is None:
+            return True
+        self.wait_seconds = max(math.ceil(wait), 1)
+        return False
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AddressThrottle(RateThrottle):
+    """Anonymous requests by client address."""
+
+    kind = "ip"
+
+    def get_client(self, request):
+        if request.user and request.user.is_authenticated:
+            return None
+        return super().get_client(request)
+
+
+class UserThrottle(RateThrottle):
+    """Authenticated requests by user."""
+
+    kind = "user"
+
+    def get_client(self, request):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return None
+
+
+class UsernameThrottle(RateThrottle):
+    """Requests naming a username in their data, like signup and login."""
+
+    kind = "username"
+
+    def get_client(self, request):
+        data = request.data
+        username = data.get("username") if hasattr(data, "get") else None
+        if not isinstance(username, str) or not username:
+            return None
+        return hashlib.md5(username.lower().encode("utf-8")).hexdigest()
@@ -0,0 +1,72 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_read_executor():
+    """
+    Pool running blocking reads. Its size, ASYNC_READ_THREADS, bounds the
+    number of reads, and database connections they hold, per process.
+    """
+    size = settings.ASYNC_READ_THREADS
+    with _executors_lock:
+        if size not in _executors:
+            _executors[size] = ThreadPoolExecutor(
+                max_workers=size, thread_name_prefix="api-read"
+            )
+        return _executors[size]
+
+
+def run_read(view, request, *args, **kwargs):
+    """Run a view in a pool thread, which owns its database connection."""
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        # Templates are rendered by the handler, outside of this thread
+        if hasattr(response, "render"):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_read_view(view):
+    """
+    Async wrapper of a sync view for ASGI servers. Reads run in the
+    bounded read pool without blocking the event loop, writes run in
+    the thread of their request, see api_yamdb.asgi.
+    """
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            loop = asyncio.get_running_loop()
+            # Unlike sync_to_async, executors do not pass context
+            # variables, like the replica routing of the request
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(
+                get_read_executor(),
+                partial(context.run, run_read, view, request, *args, **kwargs),
+            )
+        return await sync_to_async(view)(request, *args, **kwargs)
+
+    return wrapper
+
+
+def async_read_urls(patterns, views):
+    """Wrap URL patterns of the given view classes in async_read_view."""
+    for pattern in patterns:
+        if getattr(pattern.callback, "cls", None) in views:
+            pattern.callback = async_read_view(pattern.callback)
+    return patterns
@@ -0,0 +1,274 @@
+from django.conf import settings
+from django.db import transaction
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from reviews.models import Category, Genre, Title
+from reviews.signals import catalog_changed
+
+REQUIRED = "This field is required."
+NOT_FOUND = "Not found."
+NOT_UNIQUE = "This field must be unique."
+DUPLICATE = "Duplicate value in this batch."
+TITLE_NOT_UNIQUE = "This record has already been created!"
+DOES_NOT_EXIST = "Object with slug={} does not exist."
+
+
+def raise_for_errors(errors):
+    """Reject the whole batch if any item has errors."""
+    if any(errors):
+        raise ValidationError(errors)
+
+
+def add_error(error, field, message):
+    error.setdefault(field, []).append(message)
+
+
+def slug_ids(model, slugs):
+    """Map given slugs to ids with one query."""
+    if not slugs:
+        return {}
+    return dict(
+        model.objects.filter(slug__in=slugs).values_list("slug", "id")
+    )
+
+
+class BulkWriteMixin:
+    """
+    bulk/ action creating (POST) or updating (PATCH) a list of objects.
+    Items are validated one by one without queries, then checked and
+    written in bulk within one transaction. Any invalid item rejects
+    the batch, errors are listed per item, as for many=True serializers.
+    """
+
+    bulk_serializer_class = None
+    # Field written objects are read back by, known before insert
+    bulk_key = "pk"
+
+    @action(detail=False, methods=["post", "patch"], url_path="bulk")
+    def bulk(self, request):
+        partial = request.method == "PATCH"
+        rows = self.validate_bulk(request.data, partial)
+        with transaction.atomic():
+            if partial:
+                objs = self.perform_bulk_update(rows)
+            else:
+                objs = self.perform_bulk_create(rows)
+            # Bulk queries send no model signals
+            catalog_changed.send(sender=self.__class__)
+        return Response(
+            self.get_bulk_data(objs),
+            status=status.HTTP_200_OK if partial else status.HTTP_201_CREATED,
+        )
+
+    def validate_bulk(self, data, partial):
+        if not isinstance(data, list) or not data:
+            raise ValidationError(
+                {"non_field_errors": ["Expected a non-empty list of items."]}
+            )
+        if len(data) > settings.BULK_MAX_ITEMS:
+            raise ValidationError(
+                {
+                    "non_field_errors": [
+                        f"Ensure this list has no more than "
+                        f"{settings.BULK_MAX_ITEMS} items."
+                    ]
+                }
+            )
+        serializers = [
+            self.bulk_serializer_class(data=item, partial=partial)
+            for item in data
+        ]
+        errors = [
+            {} if serializer.is_valid() else serializer.errors
+            for serializer in serializers
+        ]
+        raise_for_errors(errors)
+        return [serializer.validated_data for serializer in serializers]
+
+    def get_bulk_data(self, objs):
+        """Written objects read back in the shape of the list action."""
+        serializer_class = self.get_serializer_class()
+        keys = [getattr(obj, self.bulk_key) for obj in objs]
+        queryset = self.get_queryset().filter(**{f"{self.bulk_key}__in": keys})
+        if hasattr(serializer_class, "setup_eager_loading"):
+            queryset = serializer_class.setup_eager_loading(queryset)
+        by_key = {getattr(obj, self.bulk_key): obj for obj in queryset}
+        return serializer_class(
+            [by_key[key] for key in keys],
+            many=True,
+            context=self.get_serializer_context(),
+        ).data
+
+
+class SlugBulkWriteMixin(BulkWriteMixin):
+    """Bulk writes of models identified by a unique slug."""
+
+    bulk_key = "slug"
+
+    def perform_bulk_create(self, rows):
+        model = self.get_queryset().model
+        slugs = [row["slug"] for row in rows]
+        existing = set(
+            model.objects.filter(slug__in=slugs).values_list(
+                "slug", flat=True
+            )
+        )
+        errors, seen = [], set()
+        for slug in slugs:
+            error = {}
+            if slug in existing:
+                add_error(error, "slug", NOT_UNIQUE)
+            elif slug in seen:
+                add_error(error, "slug", DUPLICATE)
+            seen.add(slug)
+            errors.append(error)
+        raise_for_errors(errors)
+        return model.objects.bulk_create([model(**row) for row in rows])
+
+    def perform_bulk_update(self, rows):
+        model = self.get_queryset().model
+        errors = [
+            {} if "slug" in row else {"slug": [REQUIRED]} for row in rows
+        ]
+        raise_for_errors(errors)
+        objs = model.objects.in_bulk(
+            [row["slug"] for row in rows], field_name="slug"
+        )
+        seen = set()
+        for row, error in zip(rows, errors):
+            if row["slug"] not in objs:
+                add_error(error, "slug", NOT_FOUND)
+            elif row["slug"] in seen:
+                add_error(error, "slug", DUPLICATE)
+            seen.add(row["slug"])
+        raise_for_errors(errors)
+
+        updated = []
+        for row in rows:
+            obj = objs[row["slug"]]
+            for field, value in row.items():
+                setattr(obj, field, value)
+            updated.append(obj)
+        fields = sorted({field for row in rows for field in row} - {"slug"})
+        if fields:
+            model.objects.bulk_update(updated, fields)
+        return updated
+
+
+class TitleBulkWriteMixin(BulkWriteMixin):
+    """
+    Bulk writes of titles: genre and category slugs of the batch are
+    resolved with one query per table, genre links are written with
+    one insert into the through table.
+    """
+
+    def resolve_slugs(self, rows, errors):
+        genres = slug_ids(
+            Genre, {slug for row in rows for slug in row.get("genre", ())}
+        )
+        categories = slug_ids(
+            Category, {row["category"] for row in rows if "category" in row}
+        )
+        for row, error in zip(rows, errors):
+            for slug in row.get("genre", ()):
+                if slug not in genres:
+                    add_error(error, "genre", DOES_NOT_EXIST.format(slug))
+            category = row.get("category")
+            if category is not None and category not in categories:
+                add_error(error, "category", DOES_NOT_EXIST.format(category))
+        return genres, categories
+
+    def check_unique(self, titles, errors):
+        """Check (name, year) pairs against the batch and the database."""
+        pairs = [(title.name, title.year) for title in titles]
+        existing = {
+            (name, year): pk
+            for pk, name, year in Title.objects.filter(
+                name__in={name for name, _ in pairs},
+                year__in={year for _, year in pairs},
+            ).values_list("pk", "name", "year")
+        }
+        seen = set()
+        for title, pair, error in zip(titles, pairs, errors):
+            if existing.get(pair, title.pk) != title.pk or pair in seen:
+                add_error(error, "non_field_errors", TITLE_NOT_UNIQUE)
+            seen.add(pair)
+
+    def build(self, title, row, categories):
+        for field, value in row.items():
+            if field not in ("id", "genre", "category"):
+                setattr(title, field, value)
+        if "category" in row:
+            title.category_id = categories[row["category"]]
+        return title
+
+    def fill_pks(self, titles):
+        """Read ids of created titles, where the backend returns none."""
+        pks = {
+            (name, year): pk
+            for pk, name, year in Title.objects.filter(
+                name__in={title.name for title in titles},
+                year__in={title.year for title in titles},
+            ).values_list("pk", "name", "year")
+        }
+        for title in titles:
+            title.pk = pks[(title.name, title.year)]
+
+    def set_genres(self, titles, rows, genres, replace=False):
+        through = Title.genre.through
+        changed = [
+            (title, row["genre"])
+            for title, row in zip(titles, rows)
+            if "genre" in row
+        ]
+        if replace and changed:
+            through.objects.filter(
+                title_id__in=[title.pk for title, _ in changed]
+            ).delete()
+        through.objects.bulk_create(
+            through(title_id=title.pk, genre_id=genres[slug])
+            for title, slugs in changed
+            for slug in dict.fromkeys(slugs)
+        )
+
+    def perform_bulk_create(self, rows):
+        errors = [{} for _ in rows]
+        genres, categories = self.resolve_slugs(rows, errors)
+        raise_for_errors(errors)
+        titles = [self.build(Title(), row, categories) for row in rows]
+        self.check_unique(titles, errors)
+        raise_for_errors(errors)
+        titles = Title.objects.bulk_create(titles)
+        if any(title.pk is None for title in titles):
+            self.fill_pks(titles)
+        self.set_genres(titles, rows, genres)
+        return titles
+
+    def perform_bulk_update(self, rows):
+        errors = [{} if "id" in row else {"id": [REQUIRED]} for row in rows]
+        raise_for_errors(errors)
+        objs = Title.objects.in_bulk([row["id"] for row in rows])
+        seen = set()
+        for row, error in zip(rows, errors):
+            if row["id"] not in objs:
+                add_error(error, "id", NOT_FOUND)
+            elif row["id"] in seen:
+                add_error(error, "id", DUPLICATE)
+            seen.add(row["id"])
+        genres, categories = self.resolve_slugs(rows, errors)
+        raise_for_errors(errors)
+        titles = [
+            self.build(objs[row["id"]], row, categories) for row in rows
+        ]
+        self.check_unique(titles, errors)
+        raise_for_errors(errors)
+
+        fields = sorted(
+            {field for row in rows for field in row} - {"id", "genre"}
+        )
+        if fields:
+            Title.objects.bulk_update(titles, fields)
+        self.set_genres(titles, rows, genres, replace=True)
+        return titles
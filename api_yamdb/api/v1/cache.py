@@ -0,0 +1,288 @@
+import hashlib
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.signals import catalog_changed
+
+from ..replicas import replica_reads
+
+VERSION_KEY = "api:version:{}"
+RESPONSE_KEY = "api:response:{}"
+WRITTEN_KEY = "api:written:{}"
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_versions(scopes):
+    """Return current version of every scope, creating missing ones."""
+    cache = get_cache()
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid4().hex, None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*scopes):
+    """
+    Make every cached response that depends on scopes unreachable.
+    Bump happens on commit, so a response read before the commit
+    cannot be cached under the new version.
+    """
+    versions = {VERSION_KEY.format(scope): uuid4().hex for scope in scopes}
+    transaction.on_commit(lambda: get_cache().set_many(versions, None))
+
+
+def mark_written(*scopes):
+    """Record time of a write to scopes, on commit like bump_versions."""
+    keys = [WRITTEN_KEY.format(scope) for scope in scopes]
+    transaction.on_commit(
+        lambda: get_cache().set_many(dict.fromkeys(keys, time.time()), None)
+    )
+
+
+def get_written(scopes):
+    """
+    Time of the last write to any of scopes. A scope without a record,
+    never written or evicted, counts as written now.
+    """
+    cache = get_cache()
+    keys = [WRITTEN_KEY.format(scope) for scope in scopes]
+    written = cache.get_many(keys)
+    for key in keys:
+        if key not in written:
+            cache.add(key, time.time(), None)
+            written[key] = cache.get(key)
+    return max(written.values())
+
+
+def response_key(request, *state):
+    """
+    Key of a response to request, given the state it depends on. Scheme
+    and host are part of it, pagination links of responses are absolute.
+    """
+    query = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    raw = repr((
+        request.scheme,
+        request.get_host(),
+        request.path,
+        query,
+        request.accepted_renderer.format,
+        state,
+    ))
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+def etag_matches(request, etag):
+    """Weak comparison of If-None-Match, compressed responses are weak."""
+    if_none_match = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+    return "*" in if_none_match or any(
+        tag.replace("W/", "", 1) == etag for tag in if_none_match
+    )
+
+
+def not_modified(etag, last_modified=None):
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = last_modified
+    return response
+
+
+class CachedResponseMixin:
+    """
+    Cache list and retrieve responses of read-only catalog endpoints.
+    Key covers path, query string (with pagination parameters) and
+    versions of the scopes response depends on. Writes bump versions,
+    so stale entries are never read again and simply expire.
+    """
+
+    cache_actions = ("list", "retrieve")
+    cache_scopes = ()
+
+    def get_cache_scopes(self):
+        return ("catalog",) + tuple(self.cache_scopes)
+
+    def get_response_cache_key(self, request):
+        scopes = self.get_cache_scopes()
+        return response_key(request, tuple(zip(scopes, get_versions(scopes))))
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if self.action not in self.cache_actions:
+            return handler(request, *args, **kwargs)
+        key = self.get_response_cache_key(request)
+        etag = f'"{key}"'
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        cache = get_cache()
+        data = cache.get(RESPONSE_KEY.format(key))
+        if data is None:
+            # A lagging replica could store old data under new versions
+            with replica_reads(False):
+                response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cache.set(
+                RESPONSE_KEY.format(key),
+                response.data,
+                settings.API_CACHE_TIMEOUT,
+            )
+        else:
+            response = Response(data)
+        response["ETag"] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalListMixin:
+    """
+    Conditional GET of a list by a stamp of its collection. Count and
+    latest pub_date of the rows change on inserts and deletes, even
+    those made without signals; edits are recorded as write times of
+    the scopes of get_written_scopes(). A matching If-None-Match, or
+    If-Modified-Since without it, gets 304 after one aggregate query,
+    whose count the pagination reuses otherwise. Keyset pages are left
+    out, they are read without COUNT(*).
+    """
+
+    row_count = None
+    # Scopes formatted with URL keyword arguments, like "reviews:{title_id}"
+    written_scopes = ()
+
+    def get_written_scopes(self):
+        return tuple(
+            scope.format(**self.kwargs) for scope in self.written_scopes
+        )
+
+    def is_conditional(self, request):
+        get_keyset_paginator = getattr(
+            self.paginator, "get_keyset_paginator", None
+        )
+        return (
+            get_keyset_paginator is None
+            or get_keyset_paginator(request) is None
+        )
+
+    def get_collection_stamp(self):
+        """(count, latest pub_date, last write time) of the collection."""
+        stats = (
+            self.filter_queryset(self.get_queryset())
+            .order_by()
+            .aggregate(count=Count("pk"), latest=Max("pub_date"))
+        )
+        return (
+            stats["count"],
+            stats["latest"],
+            get_written(self.get_written_scopes()),
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_conditional(request):
+            return super().list(request, *args, **kwargs)
+        self.row_count, latest, written = stamp = self.get_collection_stamp()
+        etag = f'"{response_key(request, stamp)}"'
+        modified = max(written, latest.timestamp() if latest else 0)
+        last_modified = http_date(modified)
+        if "HTTP_IF_NONE_MATCH" in request.META:
+            if etag_matches(request, etag):
+                return not_modified(etag, last_modified)
+        else:
+            since = parse_http_date_safe(
+                request.META.get("HTTP_IF_MODIFIED_SINCE", "")
+            )
+            if since is not None and int(modified) <= since:
+                return not_modified(etag, last_modified)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response["ETag"] = etag
+            response["Last-Modified"] = last_modified
+        return response
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_categories(sender, **kwargs):
+    bump_versions("categories")
+
+
+@receiver([post_save, post_delete], sender=Genre)
+def invalidate_genres(sender, **kwargs):
+    bump_versions("genres")
+
+
+@receiver([post_save, post_delete], sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    bump_versions("titles", f"title:{instance.pk}")
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, action, reverse, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if reverse:
+        # Changed from the genre side, titles may be unknown on clear
+        bump_versions("titles", "genres")
+    else:
+        bump_versions("titles", f"title:{instance.pk}")
+
+
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_title_reviews(sender, instance, **kwargs):
+    bump_versions("titles", f"title:{instance.title_id}")
+
+
+@receiver(catalog_changed)
+def invalidate_catalog(sender, **kwargs):
+    bump_versions("catalog")
+
+
+@receiver([post_save, post_delete], sender=Review)
+def mark_reviews_written(sender, instance, **kwargs):
+    # Comments of a deleted review are gone without signals of their own
+    mark_written(f"reviews:{instance.title_id}", f"comments:{instance.pk}")
+
+
+@receiver(post_save, sender=Comment)
+def mark_comments_written(sender, instance, **kwargs):
+    mark_written(f"comments:{instance.review_id}")
+
+
+@receiver(post_delete, sender=Title)
+def mark_title_reviews_written(sender, instance, **kwargs):
+    mark_written(f"reviews:{instance.pk}")
+
+
+@receiver(post_save, sender=get_user_model())
+def mark_authors_written(sender, created, update_fields, **kwargs):
+    # Usernames are shown as authors of reviews and comments
+    if not created and (update_fields is None or "username" in update_fields):
+        mark_written("authors")
@@ -1,5 +1,11 @@
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
 from django_filters import rest_framework as filters
-from reviews.models import Title
+from rest_framework.filters import SearchFilter
+from reviews.models import Category, Genre, Title
+from reviews.search import get_title_search
 
 
 class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
@@ -7,15 +13,78 @@ class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
 
 
 class TitleFilter(filters.FilterSet):
-    category = filters.CharFilter(
-        field_name="category__slug", lookup_expr="icontains"
-    )
-    genre = filters.CharFilter(
-        field_name="genre__slug", lookup_expr="icontains"
-    )
-    name = filters.CharFilter(field_name="name", lookup_expr="icontains")
+    """
+    Substring filters go through the title search index. Category and
+    genre slugs are matched in their own small tables and applied as
+    subqueries, which avoids joining the genre M2M table into the list.
+    """
+
+    category = filters.CharFilter(method="filter_category")
+    genre = filters.CharFilter(method="filter_genre")
+    name = filters.CharFilter(method="filter_name")
     year = NumberInFilter(field_name="year", lookup_expr="in")
 
     class Meta:
         model = Title
         fields = "__all__"
+
+    def filter_name(self, queryset, name, value):
+        return queryset.filter(get_title_search(queryset.db).contains(value))
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(
+            category__in=Category.objects.filter(slug__icontains=value)
+        )
+
+    def filter_genre(self, queryset, name, value):
+        return queryset.filter(
+            id__in=Title.genre.through.objects.filter(
+                genre__in=Genre.objects.filter(slug__icontains=value)
+            ).values("title_id")
+        )
+
+
+class TitleSearchFilter(SearchFilter):
+    """
+    SearchFilter routing substring and prefix lookups on title name
+    through the search index, plus ranked search by the ?q= parameter.
+    Ranked results are ordered by relevance unless ?ordering= is given.
+    """
+
+    rank_param = "q"
+    indexed_fields = ("name",)
+
+    def filter_queryset(self, request, queryset, view):
+        search = get_title_search(queryset.db)
+        query = request.query_params.get(self.rank_param, "").strip()
+        if query:
+            queryset = search.ranked(queryset, query)
+            if not request.query_params.get("ordering"):
+                queryset = queryset.order_by("-search_rank", "name", "id")
+
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+        for term in search_terms:
+            queryset = queryset.filter(
+                reduce(
+                    or_,
+                    (
+                        self.get_condition(search, field, term)
+                        for field in search_fields
+                    ),
+                )
+            )
+        return queryset
+
+    def get_condition(self, search, search_field, term):
+        prefix, field = search_field[:1], search_field[1:]
+        if prefix not in self.lookup_prefixes:
+            prefix, field = "", search_field
+        if field in self.indexed_fields:
+            if prefix == "":
+                return search.contains(term)
+            if prefix == "^":
+                return search.startswith(term)
+        return Q(**{self.construct_search(search_field): term})
@@ -0,0 +1,246 @@
+import json
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+from collections import OrderedDict
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a fixed unique ordering.
+    The position of a page is the ordering key of its edge item,
+    so neither COUNT(*) nor OFFSET is sent to the database. Pages
+    replace the ordering of the view, an ?ordering= is rejected.
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    offset_query_param = "offset"
+    ordering_query_param = api_settings.ORDERING_PARAM
+    invalid_cursor_message = "Invalid cursor"
+    ordering_message = "Cursor pages have a fixed ordering"
+
+    def __init__(self, ordering, default_limit, max_limit=None):
+        self.ordering = ordering
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = remove_query_param(
+            request.build_absolute_uri(), self.offset_query_param
+        )
+        if request.query_params.get(self.ordering_query_param):
+            raise ValidationError(
+                {self.ordering_query_param: [self.ordering_message]}
+            )
+        self.limit = self.get_limit(request)
+        position, reverse = self.decode_cursor(request)
+        ordering = self.get_ordering(reverse)
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_position_filter(queryset.model, ordering, position)
+            )
+        results = list(queryset[:self.limit + 1])
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+        if reverse:
+            results.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else position is not None
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        if limit <= 0:
+            return self.default_limit
+        if self.max_limit:
+            return min(limit, self.max_limit)
+        return limit
+
+    def get_ordering(self, reverse):
+        if not reverse:
+            return self.ordering
+        return tuple(
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in self.ordering
+        )
+
+    def get_position_filter(self, model, ordering, position):
+        """
+        Build (a > x) OR (a = x AND b > y) ... for the ordering fields,
+        comparing with < for descending ones.
+        """
+        conditions = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            value = self.to_python(model, name, position[index])
+            equal = [
+                Q(**{prev.lstrip("-"): self.to_python(
+                    model, prev.lstrip("-"), position[prev_index]
+                )})
+                for prev_index, prev in enumerate(ordering[:index])
+            ]
+            conditions.append(
+                reduce(and_, equal + [Q(**{f"{name}__{lookup}": value})])
+            )
+        return reduce(or_, conditions)
+
+    def to_python(self, model, name, value):
+        """Value of a cursor position, NotFound when it is not valid."""
+        if value is None or isinstance(value, (list, dict)):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            value = model._meta.get_field(name).to_python(value)
+        except (DjangoValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value
+
+    def get_position(self, item):
+        position = []
+        for field in self.ordering:
+            name = field.lstrip("-")
+            if isinstance(item, dict):
+                value = item[name]
+            else:
+                value = getattr(item, name)
+            if hasattr(value, "isoformat"):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(b64decode(encoded.encode("ascii")))
+            position = cursor["p"]
+            reverse = bool(cursor.get("r"))
+        except (BinasciiError, UnicodeError, ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or (
+            len(position) != len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, item, reverse):
+        cursor = {"p": self.get_position(item)}
+        if reverse:
+            cursor["r"] = 1
+        encoded = b64encode(
+            json.dumps(cursor, separators=(",", ":")).encode("utf-8")
+        ).decode("ascii")
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class OptInKeysetPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination by default, keyset pagination on demand.
+    Client opts in with ?pagination=cursor and then follows the
+    next/previous links, which carry the ?cursor= parameter.
+    """
+
+    keyset_ordering = ("id",)
+    mode_query_param = "pagination"
+    keyset_mode = "cursor"
+
+    def get_keyset_paginator(self, request):
+        params = request.query_params
+        if (
+            params.get(self.mode_query_param) != self.keyset_mode
+            and KeysetPagination.cursor_query_param not in params
+        ):
+            return None
+        return KeysetPagination(
+            self.keyset_ordering,
+            default_limit=self.default_limit,
+            max_limit=self.max_limit,
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.get_keyset_paginator(request)
+        if self.keyset is not None:
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.view = view
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count(self, queryset):
+        # Views may have counted the rows already, like for conditional GET
+        count = getattr(self.view, "row_count", None)
+        if count is not None:
+            return count
+        return super().get_count(queryset)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.keyset is not None:
+            return {
+                "previous_url": self.keyset.get_previous_link(),
+                "next_url": self.keyset.get_next_link(),
+            }
+        return super().get_html_context()
+
+    def to_html(self):
+        if self.keyset is not None:
+            self.template = "rest_framework/pagination/previous_and_next.html"
+        return super().to_html()
+
+
+class TitlePagination(OptInKeysetPagination):
+    keyset_ordering = ("name", "id")
+
+
+class ReviewPagination(OptInKeysetPagination):
+    keyset_ordering = ("pub_date", "id")
+
+
+class CommentPagination(OptInKeysetPagination):
+    keyset_ordering = ("pub_date", "id")
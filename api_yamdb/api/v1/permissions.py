@@ -50,7 +50,7 @@ class ReviewCommentPermission(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         return (
             request.method in permissions.SAFE_METHODS
-            or request.user.username == obj.author.username
+            or request.user.id == obj.author_id
             or request.user.is_authenticated
             and request.user.is_moderator
         )
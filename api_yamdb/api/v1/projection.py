@@ -0,0 +1,120 @@
+from rest_framework import serializers
+
+
+def requested_fields(request, parameter="fields"):
+    """Names listed by a comma separated query parameter, or None."""
+    if request is None or parameter not in request.query_params:
+        return None
+    return {
+        name.strip()
+        for name in request.query_params[parameter].split(",")
+        if name.strip()
+    }
+
+
+def parent_path(path):
+    return path.rpartition(".")[0]
+
+
+class FieldSelection:
+    """
+    Output fields picked by ?fields=, ?omit= and ?expand= of a request.
+    Fields of nested serializers are named by dotted paths, like
+    "category.slug"; a listed nested field keeps all its own fields.
+    Optional fields are left out unless listed by fields or expand.
+    """
+
+    def __init__(self, fields=None, omit=(), expand=()):
+        self.fields = None if fields is None else frozenset(fields)
+        self.omit = frozenset(omit)
+        self.expand = frozenset(expand)
+
+    def __eq__(self, other):
+        if not isinstance(other, FieldSelection):
+            return NotImplemented
+        return (self.fields, self.omit, self.expand) == (
+            other.fields, other.omit, other.expand
+        )
+
+    def __hash__(self):
+        return hash((self.fields, self.omit, self.expand))
+
+    @classmethod
+    def from_request(cls, request):
+        return cls(
+            requested_fields(request),
+            requested_fields(request, "omit") or (),
+            requested_fields(request, "expand") or (),
+        )
+
+    def is_omitted(self, path):
+        while path:
+            if path in self.omit:
+                return True
+            path = parent_path(path)
+        return False
+
+    def is_expanded(self, path):
+        return path in self.expand or (
+            self.fields is not None and path in self.fields
+        )
+
+    def is_narrowed(self, path):
+        """Whether fields list some of the fields nested in path."""
+        prefix = path + "."
+        return any(name.startswith(prefix) for name in self.fields)
+
+    def is_whole(self, path):
+        """Whether all fields nested in path are picked."""
+        if not path or self.is_narrowed(path):
+            return False
+        return path in self.fields or self.is_whole(parent_path(path))
+
+    def is_selected(self, path, optional=False):
+        if self.is_omitted(path):
+            return False
+        if optional:
+            return self.is_expanded(path)
+        if self.fields is None:
+            return True
+        return (
+            path in self.fields
+            or self.is_narrowed(path)
+            or self.is_whole(parent_path(path))
+        )
+
+
+ALL_FIELDS = FieldSelection()
+
+
+def field_path(field):
+    """Dotted path of a bound field from the root serializer."""
+    names = []
+    while field is not None:
+        if field.field_name:
+            names.append(field.field_name)
+        field = field.parent
+    return ".".join(reversed(names))
+
+
+def selected_lookup(serializer_class, lookup, selection, prefix=""):
+    """
+    Longest part of a queryset lookup the selected fields need, or an
+    empty string. The lookup belongs to the serializer field named by
+    its first part, or is needed whole when there is no such field.
+    """
+    name, _, rest = lookup.partition("__")
+    meta = getattr(serializer_class, "Meta", None)
+    if name not in getattr(meta, "fields", ()):
+        return lookup
+    path = prefix + name
+    optional = name in getattr(meta, "optional_fields", ())
+    if not selection.is_selected(path, optional):
+        return ""
+    nested = serializer_class._declared_fields.get(name)
+    if isinstance(nested, serializers.ListSerializer):
+        nested = nested.child
+    if not rest or not isinstance(nested, serializers.BaseSerializer):
+        return lookup
+    rest = selected_lookup(type(nested), rest, selection, path + ".")
+    return f"{name}__{rest}" if rest else name
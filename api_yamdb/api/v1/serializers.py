@@ -1,10 +1,107 @@
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    TitleRanking,
+)
 from users.models import User
 
+from ..profiling import ProfiledSerializerMixin
+from .projection import (
+    ALL_FIELDS,
+    FieldSelection,
+    field_path,
+    selected_lookup,
+)
 
-class RegisterUserSerializer(serializers.ModelSerializer):
+
+class EagerLoadingMixin:
+    """Declare relations that serializer reads from related objects."""
+
+    select_related_fields = ()
+    prefetch_related_fields = ()
+    # Columns serializer reads, the rest are not fetched
+    only_fields = ()
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, selection=ALL_FIELDS):
+        """
+        Preload declared relations to avoid a query per object. Relations
+        and columns of fields left out of selection are not fetched.
+        """
+
+        def selected(lookups, partly=False):
+            parts = [
+                selected_lookup(cls, lookup, selection) for lookup in lookups
+            ]
+            return [
+                part
+                for part, lookup in zip(parts, lookups)
+                if part == lookup or partly and part
+            ]
+
+        # A relation of unselected fields is still joined to reach others
+        select_related = selected(cls.select_related_fields, partly=True)
+        prefetch_related = selected(cls.prefetch_related_fields)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if not cls.only_fields:
+            return queryset
+        return queryset.only(
+            *(selected(cls.only_fields) + select_related or ["pk"])
+        )
+
+
+class BaseModelSerializer(
+    ProfiledSerializerMixin, serializers.ModelSerializer
+):
+    """
+    Model serializer whose time counts in the request profile. Output
+    fields follow the field selection of the request, input is not
+    affected. Fields of Meta.optional_fields are only output on request.
+    """
+
+    def get_field_selection(self):
+        request = self.context.get("request")
+        if request is None:
+            return ALL_FIELDS
+        return FieldSelection.from_request(request)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        optional = getattr(self.Meta, "optional_fields", ())
+        if optional:
+            selection = self.get_field_selection()
+            prefix = field_path(self)
+            for name in optional:
+                path = f"{prefix}.{name}" if prefix else name
+                if not selection.is_expanded(path):
+                    fields.pop(name, None)
+        return fields
+
+    @property
+    def _readable_fields(self):
+        # Computed once, a list serializer reuses its child for every row
+        if not hasattr(self, "_selected_fields"):
+            selection = self.get_field_selection()
+            optional = getattr(self.Meta, "optional_fields", ())
+            self._selected_fields = [
+                field
+                for field in super()._readable_fields
+                if selection.is_selected(
+                    field_path(field), field.field_name in optional
+                )
+            ]
+        return self._selected_fields
+
+
+class RegisterUserSerializer(BaseModelSerializer):
     """User model serializer for user registration."""
 
     class Meta:
@@ -15,8 +112,8 @@ class RegisterUserSerializer(serializers.ModelSerializer):
         )
 
 
-class UserSerializer(serializers.ModelSerializer):
-    """User model serializer."""
+class UserSerializer(BaseModelSerializer):
+    """User model serializer, activity counters on request."""
 
     class Meta:
         model = User
@@ -27,10 +124,18 @@ class UserSerializer(serializers.ModelSerializer):
             "last_name",
             "bio",
             "role",
+            "review_count",
+            "comment_count",
+            "average_score",
+        )
+        optional_fields = (
+            "review_count",
+            "comment_count",
+            "average_score",
         )
 
 
-class CategoriesSerializer(serializers.ModelSerializer):
+class CategoriesSerializer(BaseModelSerializer):
     """Category model serializer."""
 
     class Meta:
@@ -41,7 +146,7 @@ class CategoriesSerializer(serializers.ModelSerializer):
         )
 
 
-class GenresSerializer(serializers.ModelSerializer):
+class GenresSerializer(BaseModelSerializer):
     """Genre model serializer."""
 
     class Meta:
@@ -52,9 +157,21 @@ class GenresSerializer(serializers.ModelSerializer):
         )
 
 
-class ReadTitleSerializer(serializers.ModelSerializer):
+class ReadTitleSerializer(EagerLoadingMixin, BaseModelSerializer):
     """Title model serializer."""
 
+    select_related_fields = ("category",)
+    prefetch_related_fields = ("genre",)
+    only_fields = (
+        "id",
+        "name",
+        "year",
+        "rating",
+        "description",
+        "category__name",
+        "category__slug",
+    )
+
     category = CategoriesSerializer(read_only=True)
     genre = GenresSerializer(read_only=True, many=True)
     description = serializers.CharField(required=False)
@@ -92,12 +209,96 @@ class CreateTitleSerializer(ReadTitleSerializer):
         queryset=Category.objects.all(),
         slug_field="slug",
     )
-    rating = serializers.IntegerField(required=False)
+    rating = serializers.IntegerField(read_only=True)
+
+
+class TitleRankingSerializer(EagerLoadingMixin, BaseModelSerializer):
+    """Leaderboard position serializer."""
+
+    select_related_fields = ("title__category",)
+    prefetch_related_fields = ("title__genre",)
+    only_fields = (
+        "position",
+        "score",
+        "title__id",
+        "title__name",
+        "title__year",
+        "title__rating",
+        "title__description",
+        "title__category__name",
+        "title__category__slug",
+    )
+
+    title = ReadTitleSerializer(read_only=True)
+
+    class Meta:
+        model = TitleRanking
+        fields = (
+            "position",
+            "score",
+            "title",
+        )
+
+
+class BulkCategorySerializer(BaseModelSerializer):
+    """Category item of a bulk write, checked for uniqueness in bulk."""
+
+    slug = serializers.SlugField(max_length=50)
+
+    class Meta:
+        model = Category
+        fields = (
+            "name",
+            "slug",
+        )
+
+
+class BulkGenreSerializer(BulkCategorySerializer):
+    """Genre item of a bulk write, checked for uniqueness in bulk."""
+
+    class Meta(BulkCategorySerializer.Meta):
+        model = Genre
+
+
+class BulkTitleSerializer(BaseModelSerializer):
+    """
+    Title item of a bulk write. Slugs and uniqueness are checked
+    for the whole batch at once, so no queries are made here.
+    """
+
+    id = serializers.IntegerField(required=False)
+    genre = serializers.ListField(
+        child=serializers.SlugField(max_length=50), allow_empty=False
+    )
+    category = serializers.SlugField(max_length=50)
 
+    class Meta:
+        model = Title
+        fields = (
+            "id",
+            "name",
+            "year",
+            "description",
+            "genre",
+            "category",
+        )
+        validators = []
 
-class ReviewSerializer(serializers.ModelSerializer):
+
+class ReviewSerializer(EagerLoadingMixin, BaseModelSerializer):
     """Review serializer."""
 
+    select_related_fields = ("author",)
+    only_fields = (
+        "id",
+        "title_id",
+        "text",
+        "score",
+        "pub_date",
+        "author__username",
+    )
+    values_lookups = {"author": "author__username"}
+
     text = serializers.CharField()
     score = serializers.IntegerField(max_value=10, min_value=1)
     id = serializers.PrimaryKeyRelatedField(read_only=True)
@@ -120,9 +321,19 @@ class ReviewSerializer(serializers.ModelSerializer):
         )
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(EagerLoadingMixin, BaseModelSerializer):
     """Comment serializer."""
 
+    select_related_fields = ("author",)
+    only_fields = (
+        "id",
+        "review_id",
+        "text",
+        "pub_date",
+        "author__username",
+    )
+    values_lookups = {"author": "author__username"}
+
     id = serializers.PrimaryKeyRelatedField(read_only=True)
     author = serializers.StringRelatedField(read_only=True)
 
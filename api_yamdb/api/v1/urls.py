@@ -1,11 +1,16 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from .async_reads import async_read_urls
 from .views import (
     CategoriesViewSet,
     CommentViewSet,
+    ExportView,
     GenresViewSet,
+    LeaderboardView,
     ManageUsersViewSet,
+    MetricsView,
     PersonalProfileView,
     RegisterUserViewSet,
     RequestJWTView,
@@ -30,8 +35,22 @@ router.register(
     basename="comments",
 )
 
+router_urls = router.urls
+if settings.API_ASYNC_READS:
+    router_urls = async_read_urls(
+        router_urls,
+        (CategoriesViewSet, GenresViewSet, TitleViewSet, ReviewViewSet),
+    )
+
 urlpatterns = [
     path("auth/token/", RequestJWTView.as_view(), name="request-jwt"),
     path("users/me/", PersonalProfileView.as_view(), name="personal-profile"),
-    path("", include(router.urls)),
+    path("export/<str:dataset>/", ExportView.as_view(), name="export"),
+    path("_metrics", MetricsView.as_view(), name="metrics"),
+    path(
+        "leaderboards/<str:board>/",
+        LeaderboardView.as_view(),
+        name="leaderboard",
+    ),
+    path("", include(router_urls)),
 ]
@@ -0,0 +1,191 @@
+import threading
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+from ..profiling import profile_section
+from .projection import ALL_FIELDS
+
+# Readers kept by serializer class and field selection
+READERS_MAX_ENTRIES = 256
+
+
+class UnsupportedFieldError(Exception):
+    """Serializer field that cannot be read as a column."""
+
+
+class ValuesReader:
+    """
+    Representation of a serializer built from values() rows, without
+    model instances and the per field attribute lookups of serializers.
+    The readable fields are compiled once into getters of row columns:
+    plain fields by their model column, nested serializers by columns
+    of the joined relation and nested lists by one more query per
+    many-to-many relation. Serializer fields which are not columns raise
+    UnsupportedFieldError. Fields named in the values_lookups attribute
+    of a serializer are read from the given lookup, like str() of a
+    relation.
+    """
+
+    def __init__(self, serializer, key=None):
+        self.lookups = [] if key is None else [key]
+        self.relations = []
+        model = serializer.Meta.model
+        self.build = self.compile(serializer, model, "")
+
+    def compile(self, serializer, model, prefix):
+        lookups = getattr(serializer, "values_lookups", {})
+        getters = []
+        for field in serializer._readable_fields:
+            name = field.field_name
+            if name in lookups:
+                getter = self.column_getter(prefix + lookups[name])
+            else:
+                getter = self.compile_field(field, model, prefix)
+            getters.append((name, getter))
+
+        def build(row, related):
+            return {name: getter(row, related) for name, getter in getters}
+
+        return build
+
+    def compile_field(self, field, model, prefix):
+        try:
+            if field.source == "*" or "." in field.source:
+                raise FieldDoesNotExist(field.source)
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            raise UnsupportedFieldError(field.field_name)
+        if isinstance(field, serializers.ListSerializer):
+            return self.many_getter(field.child, model, model_field, prefix)
+        if isinstance(field, serializers.BaseSerializer):
+            return self.nested_getter(field, model_field, prefix)
+        lookup = prefix + field.source
+        # Primary keys are the column value, other relations need a lookup
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and (
+            field.pk_field is None
+        ):
+            return self.column_getter(lookup)
+        if isinstance(field, serializers.RelatedField) or (
+            model_field.is_relation
+        ):
+            raise UnsupportedFieldError(field.field_name)
+        if isinstance(field, serializers.CharField):
+            return self.column_getter(lookup)
+        return self.column_getter(lookup, field.to_representation)
+
+    def column(self, lookup):
+        """Key of the lookup in rows."""
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+        return lookup
+
+    def column_getter(self, lookup, convert=None):
+        key = self.column(lookup)
+        if convert is None:
+            return lambda row, related: row[key]
+
+        def get(row, related):
+            value = row[key]
+            return None if value is None else convert(value)
+
+        return get
+
+    def nested_getter(self, serializer, model_field, prefix):
+        if not model_field.many_to_one:
+            raise UnsupportedFieldError(serializer.field_name)
+        key = self.column(prefix + model_field.name)
+        build = self.compile(
+            serializer,
+            model_field.related_model,
+            f"{prefix}{model_field.name}__",
+        )
+
+        def get_nested(row, related):
+            if row[key] is None:
+                return None
+            return build(row, related)
+
+        return get_nested
+
+    def many_getter(self, serializer, model, model_field, prefix):
+        if not model_field.many_to_many or model_field.auto_created:
+            raise UnsupportedFieldError(serializer.parent.field_name)
+        owner = self.column(f"{prefix}{model._meta.pk.name}")
+        index = len(self.relations)
+        self.relations.append((owner, ManyRelation(serializer, model_field)))
+
+        def get_many(row, related):
+            return related[index].get(row[owner], [])
+
+        return get_many
+
+    def read(self, rows, using):
+        """Representations of values() rows."""
+        related = [
+            relation.fetch({row[owner] for row in rows}, using)
+            for owner, relation in self.relations
+        ]
+        with profile_section("serializer"):
+            return [self.build(row, related) for row in rows]
+
+
+class ManyRelation:
+    """
+    Nested list of a many-to-many relation, read by one query for all
+    the owners in the way prefetch_related() reads it.
+    """
+
+    def __init__(self, serializer, model_field):
+        self.model = model_field.related_model
+        self.query_name = model_field.related_query_name()
+        self.key = f"{self.query_name}__pk"
+        self.reader = ValuesReader(serializer, key=self.key)
+
+    def fetch(self, owners, using):
+        """Representations of related objects by owner primary key."""
+        if not owners:
+            return {}
+        rows = list(
+            self.model._default_manager.using(using)
+            .filter(**{f"{self.query_name}__in": owners})
+            .values(*self.reader.lookups)
+        )
+        found = {}
+        for row, item in zip(rows, self.reader.read(rows, using)):
+            found.setdefault(row[self.key], []).append(item)
+        return found
+
+
+_readers = OrderedDict()
+_readers_lock = threading.Lock()
+
+
+def build_values_reader(serializer):
+    try:
+        return ValuesReader(serializer)
+    except UnsupportedFieldError:
+        return None
+
+
+def get_values_reader(serializer):
+    """
+    ValuesReader of the serializer, None when it is unsupported. A reader
+    depends only on the serializer class and the field selection, so it
+    is built once for them. The least recently used readers are dropped
+    beyond READERS_MAX_ENTRIES, selections come from query parameters.
+    """
+    get_selection = getattr(serializer, "get_field_selection", None)
+    selection = ALL_FIELDS if get_selection is None else get_selection()
+    key = (type(serializer), selection)
+    with _readers_lock:
+        if key in _readers:
+            _readers.move_to_end(key)
+            return _readers[key]
+    reader = build_values_reader(serializer)
+    with _readers_lock:
+        _readers[key] = reader
+        if len(_readers) > READERS_MAX_ENTRIES:
+            _readers.popitem(last=False)
+    return reader
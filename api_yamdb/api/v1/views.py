@@ -1,19 +1,45 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
 from django.db.utils import IntegrityError
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, mixins, status, views, viewsets
-from rest_framework.exceptions import ParseError
+from rest_framework import (
+    filters,
+    generics,
+    mixins,
+    permissions,
+    status,
+    views,
+    viewsets,
+)
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ParseError, ValidationError
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
-from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Genre, Review, Title
-from users.tokens import confirmation_code
-
-from .filters import TitleFilter
+from reviews.exporting import CONTENT_TYPES, DATASETS, export
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    TitleRanking,
+    TitleScoreBucket,
+)
+from reviews.ratings import score_stats
+from users.authentication import DatabaseJWTAuthentication
+from users.outbox import queue_email
+from users.tokens import RoleAccessToken, confirmation_code
+
+from ..profiling import metrics
+from ..throttling import AddressThrottle, UsernameThrottle
+from .bulk import SlugBulkWriteMixin, TitleBulkWriteMixin
+from .cache import CachedResponseMixin, ConditionalListMixin
+from .filters import TitleFilter, TitleSearchFilter
+from .pagination import CommentPagination, ReviewPagination, TitlePagination
 from .permissions import (
     AccessPersonalProfileData,
     AdminUserOnly,
@@ -21,7 +47,11 @@ from .permissions import (
     ReviewCommentPermission,
     TitleGenreCategoryPermission,
 )
+from .projection import ALL_FIELDS, FieldSelection
 from .serializers import (
+    BulkCategorySerializer,
+    BulkGenreSerializer,
+    BulkTitleSerializer,
     CategoriesSerializer,
     CommentSerializer,
     CreateTitleSerializer,
@@ -29,8 +59,10 @@ from .serializers import (
     ReadTitleSerializer,
     RegisterUserSerializer,
     ReviewSerializer,
+    TitleRankingSerializer,
     UserSerializer,
 )
+from .values import get_values_reader
 
 User = get_user_model()
 
@@ -51,23 +83,26 @@ class RegisterUserViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
     queryset = User.objects.all()
     serializer_class = RegisterUserSerializer
     permission_classes = (AllowPostForAnonymousUser,)
+    throttle_classes = (AddressThrottle, UsernameThrottle)
+    throttle_scope = "signup"
 
     def perform_create(self, serializer):
-        """Create confirmation code, save and send email."""
+        """Create confirmation code, save user and queue email."""
         username = serializer.validated_data.get("username")
         email = serializer.validated_data.get("email")
-        # Create confirmation code and save user
+        # Create confirmation code
         user = User(username=username)
         token = confirmation_code.make_token(user)
-        serializer.save(confirmation_code=token)
-        # Send email with confirmation code
-        send_mail(
-            subject=settings.CONFIRMATION_SUBJECT,
-            message=settings.CONFIRMATION_MESSAGE.format(token),
-            from_email=settings.SIGNUP_EMAIL,
-            recipient_list=[email],
-            fail_silently=False,
-        )
+        # Save user and email with confirmation code together,
+        # the send_outbox worker delivers it after commit
+        with transaction.atomic():
+            serializer.save(confirmation_code=token)
+            queue_email(
+                subject=settings.CONFIRMATION_SUBJECT,
+                body=settings.CONFIRMATION_MESSAGE.format(token),
+                from_email=settings.SIGNUP_EMAIL,
+                recipient=email,
+            )
 
     def create(self, request, *args, **kwargs):
         """Override response status to 200_OK."""
@@ -84,6 +119,8 @@ class RequestJWTView(views.APIView):
     """Request JWT token view."""
 
     permission_classes = (AllowPostForAnonymousUser,)
+    throttle_classes = (AddressThrottle, UsernameThrottle)
+    throttle_scope = "token"
 
     def post(self, request):
         # Check required fields
@@ -99,8 +136,7 @@ class RequestJWTView(views.APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         # Generate JWT token
-        refresh = RefreshToken.for_user(user)
-        return Response({"token": str(refresh.access_token)})
+        return Response({"token": str(RoleAccessToken.for_user(user))})
 
 
 class ManageUsersViewSet(viewsets.ModelViewSet):
@@ -109,6 +145,7 @@ class ManageUsersViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     lookup_field = "username"
+    authentication_classes = (DatabaseJWTAuthentication,)
     permission_classes = (AdminUserOnly,)
     filter_backends = (filters.SearchFilter, filters.OrderingFilter)
     search_fields = ("username",)
@@ -118,26 +155,113 @@ class ManageUsersViewSet(viewsets.ModelViewSet):
 class PersonalProfileView(views.APIView):
     """Read and edit personal profile data view."""
 
+    authentication_classes = (DatabaseJWTAuthentication,)
     permission_classes = (AccessPersonalProfileData,)
 
     def get(self, request):
-        user = get_object_or_404(User, username=request.user.username)
-        serializer = UserSerializer(user)
+        serializer = UserSerializer(request.user, context={"request": request})
         return Response(serializer.data)
 
     def patch(self, request):
-        user = get_object_or_404(User, username=request.user.username)
+        user = request.user
         # Do not allow user to change his role
         data = request.data.dict()
         if request.data.get("role"):
             data["role"] = user.role
-        serializer = UserSerializer(user, data, partial=True)
+        serializer = UserSerializer(
+            user, data, partial=True, context={"request": request}
+        )
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class ExportView(views.APIView):
+    """Stream catalog dataset as JSON lines or CSV."""
+
+    permission_classes = (AdminUserOnly,)
+
+    def get(self, request, dataset):
+        if dataset not in DATASETS:
+            raise NotFound()
+        output_format = request.query_params.get("output", "jsonl")
+        if output_format not in CONTENT_TYPES:
+            raise ValidationError(
+                {"output": [f"Choose one of: {', '.join(CONTENT_TYPES)}."]}
+            )
+        response = StreamingHttpResponse(
+            export(
+                dataset,
+                output_format,
+                chunk_size=settings.EXPORT_CHUNK_SIZE,
+            ),
+            content_type=CONTENT_TYPES[output_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{dataset}.{output_format}"'
+        )
+        return response
+
+
+class MetricsView(views.APIView):
+    """Profiled request counters in Prometheus text format."""
+
+    permission_classes = (AdminUserOnly,)
+
+    def get(self, request):
+        return HttpResponse(
+            metrics.render(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+
+class EagerLoadingViewSetMixin:
+    """Preload relations declared by serializer for read actions."""
+
+    eager_loading_actions = ("list", "retrieve")
+
+    def get_field_selection(self):
+        """Fields of the response, writes load whole objects."""
+        if self.request.method in permissions.SAFE_METHODS:
+            return FieldSelection.from_request(self.request)
+        return ALL_FIELDS
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        if self.action in self.eager_loading_actions and hasattr(
+            serializer_class, "setup_eager_loading"
+        ):
+            queryset = serializer_class.setup_eager_loading(
+                queryset, self.get_field_selection()
+            )
+        return queryset
+
+
+class ValuesListMixin:
+    """
+    List action read with values() into plain dicts, skipping model
+    instances and per field serializer calls. Falls back to the
+    serializer when some of its fields are not model columns.
+    """
+
+    def list(self, request, *args, **kwargs):
+        reader = get_values_reader(self.get_serializer())
+        if reader is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        # Keyset pagination reads positions from rows
+        ordering = getattr(self.paginator, "keyset_ordering", ())
+        rows = queryset.prefetch_related(None).values(
+            *reader.lookups, *ordering
+        )
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(reader.read(list(rows), queryset.db))
+        return self.get_paginated_response(reader.read(page, queryset.db))
+
+
 class BaseCreateListDestroyViewSet(
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
@@ -153,56 +277,174 @@ class BaseCreateListDestroyViewSet(
     ordering = ("name",)
 
 
-class CategoriesViewSet(BaseCreateListDestroyViewSet):
+class CategoriesViewSet(
+    CachedResponseMixin, SlugBulkWriteMixin, BaseCreateListDestroyViewSet
+):
     """Category viewset."""
 
     queryset = Category.objects.all()
     serializer_class = CategoriesSerializer
+    bulk_serializer_class = BulkCategorySerializer
+    cache_scopes = ("categories",)
 
 
-class GenresViewSet(BaseCreateListDestroyViewSet):
+class GenresViewSet(
+    CachedResponseMixin, SlugBulkWriteMixin, BaseCreateListDestroyViewSet
+):
     """Genre viewset."""
 
     queryset = Genre.objects.all()
     serializer_class = GenresSerializer
+    bulk_serializer_class = BulkGenreSerializer
+    cache_scopes = ("genres",)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    CachedResponseMixin,
+    ValuesListMixin,
+    EagerLoadingViewSetMixin,
+    TitleBulkWriteMixin,
+    viewsets.ModelViewSet,
+):
     """Title viewset."""
 
-    queryset = Title.objects.annotate(rating=Avg("reviews__score")).all()
+    queryset = Title.objects.all()
+    bulk_serializer_class = BulkTitleSerializer
     permission_classes = (TitleGenreCategoryPermission,)
     filter_backends = (
         DjangoFilterBackend,
         filters.OrderingFilter,
-        filters.SearchFilter,
+        TitleSearchFilter,
     )
     filterset_class = TitleFilter
+    pagination_class = TitlePagination
     search_fields = ("=name",)
     ordering = ("name",)
+    cache_actions = ("list", "retrieve", "stats")
+    cache_scopes = ("titles", "categories", "genres")
+
+    def get_cache_scopes(self):
+        if self.action == "stats":
+            return ("catalog", f"title:{self.kwargs[self.lookup_field]}")
+        scopes = super().get_cache_scopes()
+        if self.action == "retrieve":
+            # Single title does not depend on the rest of the list
+            return tuple(scope for scope in scopes if scope != "titles") + (
+                f"title:{self.kwargs[self.lookup_field]}",
+            )
+        return scopes
+
+    @action(detail=True, methods=["get"])
+    def stats(self, request, pk=None):
+        """Review count, mean, median and histogram of title scores."""
+        return self.get_cached_response(self.get_stats, request, pk=pk)
+
+    def get_stats(self, request, pk=None):
+        if not pk.isdigit():
+            raise Http404
+        histogram = dict(
+            TitleScoreBucket.objects.filter(
+                title_id=pk, count__gt=0
+            ).values_list("score", "count")
+        )
+        if not histogram and not Title.objects.filter(pk=pk).exists():
+            raise Http404
+        return Response(score_stats(histogram))
 
     def get_serializer_class(self):
-        if self.action in ("retrieve", "list"):
+        if self.action in ("retrieve", "list", "bulk"):
             return ReadTitleSerializer
         return CreateTitleSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class LeaderboardView(generics.ListAPIView):
+    """
+    Precomputed leaderboard, overall or for ?genre=<slug> or
+    ?category=<slug>, read by an index range scan.
+    """
+
+    serializer_class = TitleRankingSerializer
+
+    def get_scope(self):
+        for name in ("genre", "category"):
+            slug = self.request.query_params.get(name)
+            if slug:
+                return f"{name}:{slug}"
+        return TitleRanking.ALL
+
+    def get_queryset(self):
+        board = self.kwargs["board"]
+        if board not in dict(TitleRanking.BOARD_CHOICES):
+            raise Http404
+        return self.serializer_class.setup_eager_loading(
+            TitleRanking.objects.filter(board=board, scope=self.get_scope()),
+            FieldSelection.from_request(self.request),
+        ).order_by("position")
+
+
+class NestedParentMixin:
+    """
+    Nested route filtered by parent id directly. The parent is looked up
+    only when the page is empty, to tell an empty list from a 404.
+    Views set parent_model and parent_lookups, which maps its fields to
+    URL keyword arguments.
+    """
+
+    parent_model = None
+    parent_lookups = {}
+
+    def get_parent_queryset(self):
+        if self.parent_model is None:
+            raise ImproperlyConfigured(
+                f"{type(self).__name__} must set parent_model"
+            )
+        return self.parent_model.objects.filter(
+            **{
+                field: self.kwargs.get(kwarg)
+                for field, kwarg in self.parent_lookups.items()
+            }
+        )
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page and not self.get_parent_queryset().exists():
+            raise Http404
+        return page
+
+
+class ReviewViewSet(
+    ConditionalListMixin,
+    NestedParentMixin,
+    ValuesListMixin,
+    EagerLoadingViewSetMixin,
+    viewsets.ModelViewSet,
+):
     """Review viewset."""
 
     serializer_class = ReviewSerializer
     permission_classes = (ReviewCommentPermission,)
+    # Edited objects are returned with their author
+    eager_loading_actions = (
+        "list",
+        "retrieve",
+        "update",
+        "partial_update",
+    )
+    pagination_class = ReviewPagination
+    parent_model = Title
+    parent_lookups = {"id": "title_id"}
+    written_scopes = ("reviews:{title_id}", "authors")
 
     def get_title_or_404(self):
-        return get_object_or_404(Title, id=self.kwargs.get("title_id"))
+        return get_object_or_404(self.get_parent_queryset())
 
     def get_queryset(self):
-        return self.get_title_or_404().reviews.all()
+        return Review.objects.filter(title_id=self.kwargs.get("title_id"))
 
     def perform_create(self, serializer):
         try:
             serializer.save(
-                author=self.request.user, title=self.get_title_or_404()
+                author_id=self.request.user.id, title=self.get_title_or_404()
             )
         except IntegrityError:
             raise ParseError(
@@ -210,23 +452,39 @@ class ReviewViewSet(viewsets.ModelViewSet):
             )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ConditionalListMixin,
+    NestedParentMixin,
+    ValuesListMixin,
+    EagerLoadingViewSetMixin,
+    viewsets.ModelViewSet,
+):
     """Comment viewset."""
 
     serializer_class = CommentSerializer
     permission_classes = (ReviewCommentPermission,)
+    # Edited objects are returned with their author
+    eager_loading_actions = (
+        "list",
+        "retrieve",
+        "update",
+        "partial_update",
+    )
+    pagination_class = CommentPagination
+    parent_model = Review
+    parent_lookups = {"title_id": "title_id", "id": "review_id"}
+    written_scopes = ("comments:{review_id}", "authors")
 
     def get_review_or_404(self):
-        return get_object_or_404(
-            Review,
-            title=self.kwargs.get("title_id"),
-            id=self.kwargs.get("review_id"),
-        )
+        return get_object_or_404(self.get_parent_queryset())
 
     def get_queryset(self):
-        return self.get_review_or_404().comments.all()
+        return Comment.objects.filter(
+            review_id=self.kwargs.get("review_id"),
+            review__title_id=self.kwargs.get("title_id"),
+        )
 
     def perform_create(self, serializer):
         serializer.save(
-            author=self.request.user, review=self.get_review_or_404()
+            author_id=self.request.user.id, review=self.get_review_or_404()
         )
@@ -9,8 +9,19 @@ https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
 
 import os
 
+from asgiref.sync import ThreadSensitiveContext
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+
+async def application(scope, receive, send):
+    """
+    Run sync middleware and views of every request in a thread of its
+    own. Without the context, which the handler of Django 3.2 does not
+    open, they share one thread per process and run one at a time.
+    """
+    async with ThreadSensitiveContext():
+        await django_application(scope, receive, send)
@@ -0,0 +1,48 @@
+"""
+PostgreSQL backend taking connections from a pool of the worker process.
+Closing a connection, which Django does at the end of every request
+unless CONN_MAX_AGE keeps it, returns it to the pool instead. Pool size
+and limits are set by the POOL dictionary of the database settings.
+"""
+import psycopg2.extras
+from django.db.backends.postgresql import base, creation
+
+from .pool import close_pools, get_pool
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # A database cannot be dropped while pooled connections use it
+        close_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_pool(self, conn_params):
+        return get_pool(conn_params, self.settings_dict.get("POOL", {}))
+
+    def get_new_connection(self, conn_params):
+        connection = self.get_pool(conn_params).get()
+        # As in the parent, which connects instead
+        options = self.settings_dict["OPTIONS"]
+        try:
+            self.isolation_level = options["isolation_level"]
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.get_pool(self.get_connection_params()).put(
+                    self.connection
+                )
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """No connection was returned to an exhausted pool in time."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections to one database.
+    Connections idle for longer than check_after are pinged before they
+    are handed out, connections older than max_lifetime are closed
+    instead of being reused. Callers wait up to timeout seconds for a
+    connection when max_size of them are in use.
+    """
+
+    def __init__(
+        self, conn_params, max_size, max_lifetime, check_after, timeout
+    ):
+        self.conn_params = conn_params
+        self.database = conn_params.get("database")
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        # (connection, opened at, returned at), the last returned on top
+        self.idle = []
+        # id of connection in use: opened at
+        self.opened = {}
+        self.closed = False
+
+    def get(self):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(
+                f"No database connection became free in {self.timeout}s."
+            )
+        try:
+            return self.checkout()
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def checkout(self):
+        while True:
+            with self.lock:
+                item = self.idle.pop() if self.idle else None
+            now = time.monotonic()
+            if item is None:
+                connection = psycopg2.connect(**self.conn_params)
+                self.opened[id(connection)] = now
+                return connection
+            connection, opened, returned = item
+            if self.expired(opened, now) or not self.healthy(
+                connection, now - returned
+            ):
+                connection.close()
+                continue
+            self.opened[id(connection)] = opened
+            return connection
+
+    def put(self, connection):
+        if id(connection) not in self.opened:
+            # Taken from a pool closed since then
+            connection.close()
+            return
+        try:
+            now = time.monotonic()
+            opened = self.opened.pop(id(connection))
+            if self.closed or connection.closed or self.expired(opened, now):
+                connection.close()
+                return
+            status = connection.info.transaction_status
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    connection.rollback()
+                except psycopg2.Error:
+                    connection.close()
+                    return
+            with self.lock:
+                self.idle.append((connection, opened, now))
+        finally:
+            self.slots.release()
+
+    def expired(self, opened, now):
+        return self.max_lifetime is not None and (
+            now - opened >= self.max_lifetime
+        )
+
+    def healthy(self, connection, idle):
+        if connection.closed:
+            return False
+        if idle < self.check_after:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def close(self):
+        """Close idle connections, those in use are closed when put."""
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for connection, _, _ in idle:
+            connection.close()
+
+
+def get_pool(conn_params, options):
+    """Pool of this process for the connection parameters."""
+    # Forked workers must not share the sockets of their parent
+    key = (
+        os.getpid(),
+        repr(sorted(conn_params.items())),
+        repr(sorted(options.items())),
+    )
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                conn_params,
+                max_size=options.get("MAX_SIZE", 10),
+                max_lifetime=options.get("MAX_LIFETIME"),
+                check_after=options.get("CHECK_AFTER", 30),
+                timeout=options.get("TIMEOUT", 10),
+            )
+        return _pools[key]
+
+
+def close_pools(database=None):
+    """Close pooled connections, of one database or all of them."""
+    with _pools_lock:
+        for key, pool in list(_pools.items()):
+            if database is None or pool.database == database:
+                pool.close()
+                del _pools[key]
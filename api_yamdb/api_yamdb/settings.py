@@ -31,6 +31,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.profiling.ProfilingMiddleware",
+    "api.compression.CompressionMiddleware",
+    "api.replicas.ReplicaMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -71,10 +74,74 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT')
+        'PORT': os.getenv('DB_PORT'),
+        # Seconds to keep a connection between requests, 0 closes it
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=0)),
+        # Used with DB_ENGINE=api_yamdb.postgresql_pool
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', default=10)),
+            'MAX_LIFETIME': int(
+                os.getenv('DB_POOL_MAX_LIFETIME', default=1800)
+            ),
+            'CHECK_AFTER': int(os.getenv('DB_POOL_CHECK_AFTER', default=30)),
+            'TIMEOUT': int(os.getenv('DB_POOL_TIMEOUT', default=10)),
+        },
     }
 }
 
+# Read replicas: comma separated hosts of the default database, or
+# database files with SQLite. Safe requests read from them, a user reads
+# from the primary for REPLICA_PIN_SECONDS after a write
+DATABASE_REPLICAS = []
+REPLICA_LOCATION = (
+    'NAME' if DATABASES['default']['ENGINE'].endswith('sqlite3') else 'HOST'
+)
+for number, location in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', default='').split(',')), 1
+):
+    alias = f'replica_{number}'
+    DATABASES[alias] = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    DATABASES[alias][REPLICA_LOCATION] = location.strip()
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', default=5))
+
+
+# Cache
+
+# Response versions, write stamps, replica pins, token versions and
+# throttle windows live in this cache. The process-local default suits
+# a single process; several workers need a shared backend, like
+# django.core.cache.backends.memcached.PyMemcacheCache, or they miss
+# invalidations made by the others and by management commands
+CACHE_BACKEND = os.getenv(
+    'CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'
+)
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
+        'TIMEOUT': int(os.getenv('CACHE_TIMEOUT', default=300)),
+    }
+}
+# Memcached clients take their own options, it evicts by memory size
+if 'memcached' not in CACHE_BACKEND:
+    CACHES['default']['OPTIONS'] = {
+        'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', default=1000)),
+    }
+
+# Cache alias and TTL in seconds for catalog responses
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=300))
+
+# Responses from this size in bytes are compressed, with brotli when it
+# is installed and accepted by the client, with gzip otherwise
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', default=1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', default=6))
+COMPRESSION_BROTLI_QUALITY = int(
+    os.getenv('COMPRESSION_BROTLI_QUALITY', default=5)
+)
+
 
 # Password validation
 
@@ -117,6 +184,9 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 
+DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
+
+
 # Override default user model
 
 AUTH_USER_MODEL = "users.User"
@@ -133,15 +203,55 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.ClaimsJWTAuthentication",
     ),
+    # JSON is encoded and decoded by orjson when it is installed
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     "PAGE_SIZE": 5,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.AddressThrottle',
+        'api.throttling.UserThrottle',
+    ],
+    # Rates as number/period of s, m, h or d, none when unset. Views pick
+    # "<throttle_scope>.<kind>" rates before the "<kind>" ones
+    'DEFAULT_THROTTLE_RATES': {
+        'ip': os.getenv('THROTTLE_IP_RATE'),
+        'user': os.getenv('THROTTLE_USER_RATE'),
+        'signup.ip': os.getenv('THROTTLE_SIGNUP_IP_RATE', default='20/h'),
+        'signup.username': os.getenv(
+            'THROTTLE_SIGNUP_USERNAME_RATE', default='5/h'
+        ),
+        'token.ip': os.getenv('THROTTLE_TOKEN_IP_RATE', default='30/m'),
+        'token.username': os.getenv(
+            'THROTTLE_TOKEN_USERNAME_RATE', default='10/h'
+        ),
+    },
+    # Proxies in front of the app, 0 ignores X-Forwarded-For
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=0)),
 }
 
+# Throttle counters: token buckets in process memory ("memory") or
+# sliding windows in the THROTTLE_CACHE_ALIAS cache ("cache"). The
+# cache is shared by all workers only when CACHE_BACKEND is memcached
+# or Redis, otherwise every process keeps its own limits
+THROTTLE_STORE = os.getenv('THROTTLE_STORE', default='memory')
+THROTTLE_CACHE_ALIAS = 'default'
+THROTTLE_MEMORY_ENTRIES = int(
+    os.getenv('THROTTLE_MEMORY_ENTRIES', default=100000)
+)
+
 
 # Simplejwt settings
 
@@ -172,6 +282,46 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=1),
 }
 
+# Leaderboards, see the rebuild_leaderboards command
+LEADERBOARD_SIZE = int(os.getenv('LEADERBOARD_SIZE', default=100))
+LEADERBOARD_MIN_REVIEWS = int(os.getenv('LEADERBOARD_MIN_REVIEWS', default=3))
+LEADERBOARD_PRIOR_WEIGHT = float(
+    os.getenv('LEADERBOARD_PRIOR_WEIGHT', default=5)
+)
+LEADERBOARD_TRENDING_DAYS = int(
+    os.getenv('LEADERBOARD_TRENDING_DAYS', default=7)
+)
+
+# Largest list accepted by bulk write endpoints
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', default=500))
+
+# Rows fetched at once by streaming exports
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', default=2000))
+
+# Token versions are cached for claims authentication, user saves and
+# deletes refresh the cached value. Other workers only see the refresh
+# through a shared CACHE_BACKEND, so with the process-local default
+# every token is checked against the database
+TOKEN_VERSION_CACHE_TIMEOUT = int(
+    os.getenv('TOKEN_VERSION_CACHE_TIMEOUT', default=300)
+)
+
+# Per-request profiling: Server-Timing headers, counters served at
+# /api/v1/_metrics and sampled cProfile dumps when a directory is set
+API_PROFILING = os.getenv('API_PROFILING', default='False') == 'True'
+API_PROFILING_DUMP_DIR = os.getenv('API_PROFILING_DUMP_DIR') or None
+API_PROFILING_SAMPLE_RATE = float(
+    os.getenv('API_PROFILING_SAMPLE_RATE', default=0.01)
+)
+# Request counters live in this cache, they add up across workers
+# when CACHE_BACKEND is shared, like memcached
+METRICS_CACHE_ALIAS = 'default'
+
+# ASGI mode: catalog and review reads run as async views, their blocking
+# ORM work goes to a pool of this many threads per process
+API_ASYNC_READS = os.getenv('API_ASYNC_READS', default='False') == 'True'
+ASYNC_READ_THREADS = int(os.getenv('ASYNC_READ_THREADS', default=8))
+
 # Email settings
 
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
@@ -179,3 +329,9 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 SIGNUP_EMAIL = "signup@yamdb.com"
 CONFIRMATION_SUBJECT = "Registration confirmation code"
 CONFIRMATION_MESSAGE = "Confirmation code: {}."
+
+# Outbox worker (send_outbox command) defaults
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', default=100))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', default=5))
+OUTBOX_RETRY_BACKOFF = float(os.getenv('OUTBOX_RETRY_BACKOFF', default=30))
+OUTBOX_POLL_INTERVAL = float(os.getenv('OUTBOX_POLL_INTERVAL', default=5))
@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Review
+from .ratings import rating_expression
+
+User = get_user_model()
+
+
+def update_user_reviews(user_id, score_delta, count_delta):
+    """Atomically shift review counters of the user by the given deltas."""
+    score_sum = F("review_score_sum") + score_delta
+    review_count = F("review_count") + count_delta
+    return User.objects.filter(pk=user_id).update(
+        review_score_sum=score_sum,
+        review_count=review_count,
+        average_score=rating_expression(score_sum, review_count),
+    )
+
+
+def update_user_comments(user_id, delta):
+    """Atomically shift the comment counter of the user."""
+    return User.objects.filter(pk=user_id).update(
+        comment_count=F("comment_count") + delta
+    )
+
+
+def rebuild_user_activity(
+    user_model=User,
+    review_model=Review,
+    comment_model=Comment,
+    using=DEFAULT_DB_ALIAS,
+):
+    """Recalculate activity counters of all users from their writings."""
+    users = user_model.objects.using(using)
+    reviews = (
+        review_model.objects.using(using)
+        .filter(author=OuterRef("pk"))
+        .order_by()
+        .values("author")
+    )
+    comments = (
+        comment_model.objects.using(using)
+        .filter(author=OuterRef("pk"))
+        .order_by()
+        .values("author")
+    )
+    users.update(
+        review_score_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum("score")).values("total")),
+            0,
+            output_field=IntegerField(),
+        ),
+        review_count=Coalesce(
+            Subquery(reviews.annotate(total=Count("pk")).values("total")),
+            0,
+            output_field=IntegerField(),
+        ),
+        comment_count=Coalesce(
+            Subquery(comments.annotate(total=Count("pk")).values("total")),
+            0,
+            output_field=IntegerField(),
+        ),
+    )
+    return users.update(
+        average_score=rating_expression(
+            F("review_score_sum"), F("review_count")
+        )
+    )
@@ -0,0 +1,155 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import Comment, Review, Title
+
+CONTENT_TYPES = {
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv",
+}
+# Rows are joined into pieces of about this size before being written
+PIECE_SIZE = 64 * 1024
+
+
+class Echo:
+    """File-like object which returns written value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+class Dataset:
+    """Rows of a model read with a server-side cursor in id order."""
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+
+    @property
+    def columns(self):
+        return [name for name, _ in self.fields]
+
+    def rows(self, using, chunk_size):
+        names = self.columns
+        queryset = (
+            self.model.objects.using(using)
+            .order_by("pk")
+            .values_list(*[lookup for _, lookup in self.fields])
+        )
+        for values in queryset.iterator(chunk_size=chunk_size):
+            yield dict(zip(names, values))
+
+
+class TitleDataset(Dataset):
+    """Titles with genre slugs, merged from the link table in id order."""
+
+    @property
+    def columns(self):
+        return super().columns + ["genre"]
+
+    def rows(self, using, chunk_size):
+        links = (
+            Title.genre.through.objects.using(using)
+            .order_by("title_id", "genre__slug")
+            .values_list("title_id", "genre__slug")
+            .iterator(chunk_size=chunk_size)
+        )
+        link = next(links, None)
+        for row in super().rows(using, chunk_size):
+            genres = []
+            while link is not None and link[0] <= row["id"]:
+                if link[0] == row["id"]:
+                    genres.append(link[1])
+                link = next(links, None)
+            row["genre"] = genres
+            yield row
+
+
+DATASETS = {
+    "titles": TitleDataset(
+        Title,
+        (
+            ("id", "id"),
+            ("name", "name"),
+            ("year", "year"),
+            ("description", "description"),
+            ("category", "category__slug"),
+            ("rating", "rating"),
+            ("rating_count", "rating_count"),
+        ),
+    ),
+    "reviews": Dataset(
+        Review,
+        (
+            ("id", "id"),
+            ("title_id", "title_id"),
+            ("author", "author__username"),
+            ("text", "text"),
+            ("score", "score"),
+            ("pub_date", "pub_date"),
+        ),
+    ),
+    "comments": Dataset(
+        Comment,
+        (
+            ("id", "id"),
+            ("review_id", "review_id"),
+            ("author", "author__username"),
+            ("text", "text"),
+            ("pub_date", "pub_date"),
+        ),
+    ),
+}
+
+
+def csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return " ".join(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def render_jsonl(dataset, rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False)
+        yield "\n"
+
+
+def render_csv(dataset, rows):
+    writer = csv.writer(Echo())
+    columns = dataset.columns
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([csv_value(row[column]) for column in columns])
+
+
+RENDERERS = {
+    "jsonl": render_jsonl,
+    "csv": render_csv,
+}
+
+
+def join_pieces(strings, size=PIECE_SIZE):
+    """Join small strings, so output is written in large pieces."""
+    piece, length = [], 0
+    for string in strings:
+        piece.append(string)
+        length += len(string)
+        if length >= size:
+            yield "".join(piece)
+            piece, length = [], 0
+    if piece:
+        yield "".join(piece)
+
+
+def export(name, output_format, using=DEFAULT_DB_ALIAS, chunk_size=2000):
+    """Lazily render a dataset, memory use does not depend on its size."""
+    dataset = DATASETS[name]
+    rows = dataset.rows(using, chunk_size)
+    return join_pieces(RENDERERS[output_format](dataset, rows))
@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import (
+    Count,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    Q,
+    Sum,
+    Value,
+)
+from django.utils import timezone
+
+from .models import Category, Genre, Title, TitleRanking
+
+
+def scopes(using=DEFAULT_DB_ALIAS):
+    """Yield (scope, title filter) of every leaderboard scope."""
+    yield TitleRanking.ALL, Q()
+    for model, name in ((Genre, "genre"), (Category, "category")):
+        rows = model.objects.using(using).values_list("id", "slug")
+        for pk, slug in rows:
+            yield f"{name}:{slug}", Q(**{name: pk})
+
+
+def bayesian_score(prior_mean, prior_weight):
+    """
+    Average score pulled towards the mean of all reviews, so titles with
+    few reviews do not top the board with a single high score.
+    """
+    return ExpressionWrapper(
+        (Value(prior_weight * prior_mean) + F("rating_sum"))
+        / (Value(float(prior_weight)) + F("rating_count")),
+        output_field=FloatField(),
+    )
+
+
+class LeaderboardBuilder:
+    """Compute rankings of every board and scope into TitleRanking rows."""
+
+    def __init__(
+        self,
+        size,
+        min_reviews,
+        prior_weight,
+        trending_days,
+        using=DEFAULT_DB_ALIAS,
+    ):
+        self.size = size
+        self.min_reviews = min_reviews
+        self.prior_weight = prior_weight
+        self.trending_since = timezone.now() - timedelta(days=trending_days)
+        self.using = using
+
+    def prior_mean(self):
+        totals = Title.objects.using(self.using).aggregate(
+            score=Sum("rating_sum"), count=Sum("rating_count")
+        )
+        if not totals["count"]:
+            return None
+        return totals["score"] / totals["count"]
+
+    def top(self, titles, prior_mean):
+        return (
+            titles.filter(rating_count__gte=max(self.min_reviews, 1))
+            .annotate(
+                board_score=bayesian_score(prior_mean, self.prior_weight)
+            )
+            .order_by("-board_score", "-rating_count", "id")
+        )
+
+    def trending(self, titles):
+        return (
+            titles.annotate(
+                board_score=Count(
+                    "reviews",
+                    filter=Q(reviews__pub_date__gte=self.trending_since),
+                )
+            )
+            .filter(board_score__gt=0)
+            .order_by("-board_score", F("rating").desc(nulls_last=True), "id")
+        )
+
+    def rankings(self):
+        prior_mean = self.prior_mean()
+        if prior_mean is None:
+            return
+        titles = Title.objects.using(self.using)
+        for scope, condition in scopes(self.using):
+            scoped = titles.filter(condition)
+            boards = {
+                TitleRanking.TOP: self.top(scoped, prior_mean),
+                TitleRanking.TRENDING: self.trending(scoped),
+            }
+            for board, queryset in boards.items():
+                rows = queryset.values_list("id", "board_score")[:self.size]
+                for position, (title_id, score) in enumerate(rows, 1):
+                    yield TitleRanking(
+                        board=board,
+                        scope=scope,
+                        position=position,
+                        title_id=title_id,
+                        score=score,
+                    )
+
+    def rebuild(self):
+        """Replace all rankings, the caller provides the transaction."""
+        rankings = TitleRanking.objects.using(self.using)
+        rankings.all().delete()
+        return len(rankings.bulk_create(self.rankings()))
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from reviews.exporting import DATASETS, RENDERERS, export
+
+
+class Command(BaseCommand):
+    help = "Stream titles, reviews or comments as JSON lines or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(DATASETS))
+        parser.add_argument(
+            "--format",
+            dest="output_format",
+            choices=sorted(RENDERERS),
+            default="jsonl",
+            help="Output format.",
+        )
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="File to write, standard output by default.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Rows fetched from the database cursor at once.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to export from.",
+        )
+
+    def handle(self, *args, **options):
+        pieces = export(
+            options["dataset"],
+            options["output_format"],
+            using=options["database"],
+            chunk_size=options["chunk_size"],
+        )
+        if options["output"] == "-":
+            for piece in pieces:
+                self.stdout.write(piece, ending="")
+            return
+        path = options["output"]
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            for piece in pieces:
+                file.write(piece)
+        self.stdout.write(
+            self.style.SUCCESS(f"Exported {options['dataset']} to {path}.")
+        )
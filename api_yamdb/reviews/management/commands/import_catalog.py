@@ -0,0 +1,93 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from reviews.importing import CatalogImporter, CatalogImportError
+from reviews.signals import catalog_changed
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import users, categories, genres, titles, genre links, "
+        "reviews and comments from CSV or JSON lines files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "directory",
+            help=(
+                "Directory with users, category, genre, titles, "
+                "genre_title, review and comments files (.csv or .jsonl)."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows inserted per query.",
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Load rows with COPY, PostgreSQL only.",
+        )
+        parser.add_argument(
+            "--ignore-conflicts",
+            action="store_true",
+            help="Skip rows which violate unique constraints.",
+        )
+        parser.add_argument(
+            "--progress-every",
+            type=int,
+            default=10000,
+            help="Report progress after this many rows.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to import into.",
+        )
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        if options["batch_size"] <= 0:
+            raise CommandError("Batch size must be positive.")
+        if options["copy"]:
+            if connections[using].vendor != "postgresql":
+                raise CommandError("COPY is supported on PostgreSQL only.")
+            if options["ignore_conflicts"]:
+                raise CommandError("COPY cannot ignore conflicts.")
+        self.reported = {}
+        importer = CatalogImporter(
+            using=using,
+            batch_size=options["batch_size"],
+            use_copy=options["copy"],
+            ignore_conflicts=options["ignore_conflicts"],
+            progress=self.report_progress,
+        )
+        self.progress_every = options["progress_every"]
+        if not importer.find_files(options["directory"]):
+            raise CommandError("No files to import found.")
+        try:
+            with transaction.atomic(using=using):
+                results = importer.run(options["directory"])
+                importer.finish()
+        except CatalogImportError as error:
+            raise CommandError(error)
+        catalog_changed.send(sender=self.__class__)
+        for entity, rows, seconds in results:
+            self.stdout.write(
+                f"{entity}: {rows} rows in {seconds:.2f}s "
+                f"({self.rate(rows, seconds):.0f} rows/s)"
+            )
+        self.stdout.write(self.style.SUCCESS("Catalog imported."))
+
+    def report_progress(self, entity, rows, seconds):
+        if rows - self.reported.get(entity, 0) < self.progress_every:
+            return
+        self.reported[entity] = rows
+        self.stdout.write(
+            f"{entity}: {rows} rows ({self.rate(rows, seconds):.0f} rows/s)"
+        )
+
+    @staticmethod
+    def rate(rows, seconds):
+        return rows / seconds if seconds else rows
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+from reviews.leaderboards import LeaderboardBuilder
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute top rated and trending leaderboards, overall, "
+        "per genre and per category. Meant to run periodically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=settings.LEADERBOARD_SIZE,
+            help="Titles kept on every board.",
+        )
+        parser.add_argument(
+            "--min-reviews",
+            type=int,
+            default=settings.LEADERBOARD_MIN_REVIEWS,
+            help="Reviews a title needs to be top rated.",
+        )
+        parser.add_argument(
+            "--prior-weight",
+            type=float,
+            default=settings.LEADERBOARD_PRIOR_WEIGHT,
+            help="Reviews worth of the mean score added to every title.",
+        )
+        parser.add_argument(
+            "--trending-days",
+            type=int,
+            default=settings.LEADERBOARD_TRENDING_DAYS,
+            help="Window of reviews counted for trending titles.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to rebuild leaderboards in.",
+        )
+
+    def handle(self, *args, **options):
+        builder = LeaderboardBuilder(
+            size=options["size"],
+            min_reviews=options["min_reviews"],
+            prior_weight=options["prior_weight"],
+            trending_days=options["trending_days"],
+            using=options["database"],
+        )
+        with transaction.atomic(using=options["database"]):
+            created = builder.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Leaderboards rebuilt with {created} rows.")
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews.ratings import rebuild_ratings, rebuild_score_buckets
+from reviews.signals import catalog_changed
+
+
+class Command(BaseCommand):
+    help = "Recalculate stored title ratings and score histograms."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = rebuild_ratings()
+            rebuild_score_buckets()
+        catalog_changed.send(sender=self.__class__)
+        self.stdout.write(
+            self.style.SUCCESS(f"Ratings rebuilt for {updated} titles.")
+        )
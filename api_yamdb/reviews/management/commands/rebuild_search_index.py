@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from reviews.search import get_title_search
+
+
+class Command(BaseCommand):
+    help = "Recreate title search index structures and refill them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to rebuild the index in.",
+        )
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        search = get_title_search(using)
+        with transaction.atomic(using=using):
+            with connections[using].cursor() as cursor:
+                search.install(cursor)
+                search.rebuild(cursor)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Search index rebuilt with {type(search).__name__}."
+            )
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews.activity import rebuild_user_activity
+
+
+class Command(BaseCommand):
+    help = "Recalculate review and comment counters of users."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = rebuild_user_activity()
+        self.stdout.write(
+            self.style.SUCCESS(f"Activity rebuilt for {updated} users.")
+        )
@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from reviews.seeding import CatalogSeeder
+from reviews.signals import catalog_changed
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with a synthetic catalog of the given size, "
+        "for benchmarks and load tests."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--titles",
+            type=int,
+            default=10000,
+            help="Titles to create.",
+        )
+        parser.add_argument(
+            "--reviews",
+            type=int,
+            default=1000000,
+            help="Reviews to create, spread evenly over titles.",
+        )
+        parser.add_argument(
+            "--comments",
+            type=int,
+            default=0,
+            help="Comments to create, spread evenly over reviews.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows inserted per query.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Random seed of scores and genres.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to seed.",
+        )
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        if options["batch_size"] <= 0:
+            raise CommandError("Batch size must be positive.")
+        if min(options["titles"], options["reviews"], options["comments"]) < 0:
+            raise CommandError("Row counts cannot be negative.")
+        seeder = CatalogSeeder(
+            titles=options["titles"],
+            reviews=options["reviews"],
+            comments=options["comments"],
+            using=using,
+            batch_size=options["batch_size"],
+            seed=options["seed"],
+        )
+        started = time.monotonic()
+        with transaction.atomic(using=using):
+            users, titles, reviews = seeder.run()
+        catalog_changed.send(sender=self.__class__)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(titles)} titles, {len(reviews)} reviews "
+                f"by {len(users)} users in "
+                f"{time.monotonic() - started:.1f}s."
+            )
+        )
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-17 07:02
+
+from django.db import migrations, models
+import reviews.ratings
+
+
+def fill_ratings(apps, schema_editor):
+    reviews.ratings.rebuild_ratings(
+        title_model=apps.get_model('reviews', 'Title'),
+        review_model=apps.get_model('reviews', 'Review'),
+        using=schema_editor.connection.alias,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_auto_20220802_2249'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
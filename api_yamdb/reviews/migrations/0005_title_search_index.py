@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from reviews.search import get_title_search
+
+
+def install_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    search = get_title_search(connection.alias)
+    with connection.cursor() as cursor:
+        search.install(cursor)
+        search.rebuild(cursor)
+
+
+def uninstall_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        get_title_search(connection.alias).uninstall(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 2.2.16 on 2026-10-17 07:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+import reviews.ratings
+
+
+def fill_score_buckets(apps, schema_editor):
+    reviews.ratings.rebuild_score_buckets(
+        bucket_model=apps.get_model('reviews', 'TitleScoreBucket'),
+        review_model=apps.get_model('reviews', 'Review'),
+        using=schema_editor.connection.alias,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleScoreBucket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveSmallIntegerField(verbose_name='Оценка')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_buckets', to='reviews.Title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Оценки произведения',
+                'verbose_name_plural': 'Оценки произведений',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='titlescorebucket',
+            constraint=models.UniqueConstraint(fields=('title', 'score'), name='unique_title_score_bucket'),
+        ),
+        migrations.RunPython(fill_score_buckets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-17 07:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_score_bucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('top', 'Top rated'), ('trending', 'Trending')], max_length=20, verbose_name='Рейтинг')),
+                ('scope', models.CharField(default='all', help_text='all, genre:<slug> или category:<slug>', max_length=60, verbose_name='Область')),
+                ('position', models.PositiveIntegerField(verbose_name='Место')),
+                ('score', models.FloatField(verbose_name='Оценка')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.Title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Места в рейтингах',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='titleranking',
+            constraint=models.UniqueConstraint(fields=('board', 'scope', 'position'), name='unique_board_scope_position'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 2.2.16 on 2026-10-17 07:26
+
+from django.db import migrations, models
+
+from reviews.search import get_title_search
+
+
+def install_name_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        get_title_search(connection.alias).install_name_indexes(cursor)
+
+
+def uninstall_name_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        get_title_search(connection.alias).uninstall_name_indexes(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_ranking'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['name'], name='category_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='genre',
+            index=models.Index(fields=['name'], name='genre_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', 'name', 'id'], name='title_year_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'name', 'id'], name='title_category_name_idx'),
+        ),
+        migrations.RunPython(install_name_indexes, uninstall_name_indexes),
+    ]
@@ -37,6 +37,9 @@ class Category(models.Model):
     )
 
     class Meta:
+        indexes = [
+            models.Index(fields=["name"], name="category_name_idx"),
+        ]
         verbose_name = "Категория"
         verbose_name_plural = "Категории"
 
@@ -60,6 +63,9 @@ class Genre(models.Model):
     )
 
     class Meta:
+        indexes = [
+            models.Index(fields=["name"], name="genre_name_idx"),
+        ]
         verbose_name = "Жанр"
         verbose_name_plural = "Жанры"
 
@@ -101,6 +107,22 @@ class Title(models.Model):
         verbose_name="Категория",
         help_text="Выберите категорию",
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Сумма оценок",
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество оценок",
+    )
+    rating = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Рейтинг",
+    )
 
     class Meta:
         constraints = [
@@ -109,6 +131,17 @@ class Title(models.Model):
                 fields=["name", "year"],
             )
         ]
+        indexes = [
+            models.Index(fields=["name", "id"], name="title_name_id_idx"),
+            models.Index(
+                fields=["year", "name", "id"],
+                name="title_year_name_idx",
+            ),
+            models.Index(
+                fields=["category", "name", "id"],
+                name="title_category_name_idx",
+            ),
+        ]
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
 
@@ -169,6 +202,12 @@ class Review(models.Model):
                 fields=["title", "author"],
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["title", "pub_date", "id"],
+                name="review_title_pub_date_idx",
+            ),
+        ]
         verbose_name = "Отзыв"
         verbose_name_plural = "Отзывы"
 
@@ -177,6 +216,80 @@ class Review(models.Model):
                 f" с оценкой {self.score}")
 
 
+class TitleScoreBucket(models.Model):
+    """Number of title reviews with the given score."""
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name="score_buckets",
+        verbose_name="Произведение",
+    )
+    score = models.PositiveSmallIntegerField(verbose_name="Оценка")
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество отзывов",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name="unique_title_score_bucket",
+                fields=["title", "score"],
+            )
+        ]
+        verbose_name = "Оценки произведения"
+        verbose_name_plural = "Оценки произведений"
+
+    def __str__(self):
+        return f"{self.title_id}: {self.score} x {self.count}"
+
+
+class TitleRanking(models.Model):
+    """Precomputed position of a title on a leaderboard."""
+
+    TOP = "top"
+    TRENDING = "trending"
+    BOARD_CHOICES = [
+        (TOP, "Top rated"),
+        (TRENDING, "Trending"),
+    ]
+    ALL = "all"
+
+    board = models.CharField(
+        max_length=20,
+        choices=BOARD_CHOICES,
+        verbose_name="Рейтинг",
+    )
+    scope = models.CharField(
+        max_length=60,
+        default=ALL,
+        verbose_name="Область",
+        help_text="all, genre:<slug> или category:<slug>",
+    )
+    position = models.PositiveIntegerField(verbose_name="Место")
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name="rankings",
+        verbose_name="Произведение",
+    )
+    score = models.FloatField(verbose_name="Оценка")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name="unique_board_scope_position",
+                fields=["board", "scope", "position"],
+            )
+        ]
+        verbose_name = "Место в рейтинге"
+        verbose_name_plural = "Места в рейтингах"
+
+    def __str__(self):
+        return f"{self.board} {self.scope} #{self.position}: {self.title_id}"
+
+
 class Comment(models.Model):
     """Comment model."""
 
@@ -205,6 +318,12 @@ class Comment(models.Model):
     )
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=["review", "pub_date", "id"],
+                name="comment_review_pub_date_idx",
+            ),
+        ]
         verbose_name = "Комментарий к отзыву"
         verbose_name_plural = "Комментарии к отзывам"
 
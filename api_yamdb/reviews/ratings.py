@@ -0,0 +1,133 @@
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import (
+    Count,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from .models import Review, Title, TitleScoreBucket
+
+SCORES = [score for score, _ in Review.RATING_CHOICES if score is not None]
+
+
+def rating_expression(rating_sum, rating_count):
+    """Average score expression, NULL for titles without reviews."""
+    return ExpressionWrapper(
+        Cast(rating_sum, FloatField()) / NullIf(rating_count, 0),
+        output_field=FloatField(),
+    )
+
+
+def update_title_rating(title_id, score_delta, count_delta):
+    """Atomically shift stored rating of the title by the given deltas."""
+    rating_sum = F("rating_sum") + score_delta
+    rating_count = F("rating_count") + count_delta
+    return Title.objects.filter(pk=title_id).update(
+        rating_sum=rating_sum,
+        rating_count=rating_count,
+        rating=rating_expression(rating_sum, rating_count),
+    )
+
+
+def update_score_bucket(title_id, score, delta):
+    """Atomically shift the number of title reviews with the score."""
+    buckets = TitleScoreBucket.objects.filter(title_id=title_id, score=score)
+    if buckets.update(count=F("count") + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            TitleScoreBucket.objects.create(
+                title_id=title_id, score=score, count=delta
+            )
+    except IntegrityError:
+        # Bucket was created by a concurrent review
+        buckets.update(count=F("count") + delta)
+
+
+def score_stats(histogram):
+    """Review count, mean and median score of a {score: count} histogram."""
+    histogram = {score: histogram.get(score, 0) for score in SCORES}
+    count = sum(histogram.values())
+    if not count:
+        return {
+            "count": 0,
+            "mean": None,
+            "median": None,
+            "histogram": histogram,
+        }
+
+    def nth(index):
+        seen = 0
+        for score, score_count in histogram.items():
+            seen += score_count
+            if index < seen:
+                return score
+
+    total = sum(score * number for score, number in histogram.items())
+    return {
+        "count": count,
+        "mean": total / count,
+        "median": (nth((count - 1) // 2) + nth(count // 2)) / 2,
+        "histogram": histogram,
+    }
+
+
+def rebuild_ratings(
+    title_model=Title, review_model=Review, using=DEFAULT_DB_ALIAS
+):
+    """Recalculate stored ratings of all titles from their reviews."""
+    titles = title_model.objects.using(using)
+    reviews = (
+        review_model.objects.using(using)
+        .filter(title=OuterRef("pk"))
+        .order_by()
+        .values("title")
+    )
+    titles.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum("score")).values("total")),
+            0,
+            output_field=IntegerField(),
+        ),
+        rating_count=Coalesce(
+            Subquery(reviews.annotate(total=Count("pk")).values("total")),
+            0,
+            output_field=IntegerField(),
+        ),
+    )
+    return titles.update(
+        rating=rating_expression(F("rating_sum"), F("rating_count"))
+    )
+
+
+def rebuild_score_buckets(
+    bucket_model=TitleScoreBucket,
+    review_model=Review,
+    using=DEFAULT_DB_ALIAS,
+):
+    """Recalculate score histograms of all titles from their reviews."""
+    bucket_model.objects.using(using).delete()
+    rows = (
+        review_model.objects.using(using)
+        .order_by()
+        .values("title_id", "score")
+        .annotate(total=Count("pk"))
+    )
+    return len(
+        bucket_model.objects.using(using).bulk_create(
+            (
+                bucket_model(
+                    title_id=row["title_id"],
+                    score=row["score"],
+                    count=row["total"],
+                )
+                for row in rows.iterator()
+            )
+        )
+    )
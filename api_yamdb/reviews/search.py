@@ -0,0 +1,216 @@
+from django.db import connections
+from django.db.models import (
+    BooleanField,
+    Case,
+    FloatField,
+    Func,
+    IntegerField,
+    Q,
+    Value,
+    When,
+)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Upper
+
+from .models import Title
+
+# Shortest substring trigram indexes can answer
+MIN_INDEXED_LENGTH = 3
+
+
+class TitleSearch:
+    """
+    Title name search without a dedicated index.
+    Backends for databases with one override the hooks below.
+    """
+
+    # Tables whose names are looked up case-insensitively ("=name" search)
+    name_tables = ("reviews_title", "reviews_genre", "reviews_category")
+    # Indexed expression matching what Django emits for iexact
+    name_expression = None
+
+    def install(self, cursor):
+        """Create index structures, must be idempotent."""
+        self.install_name_indexes(cursor)
+
+    def uninstall(self, cursor):
+        """Drop index structures."""
+        self.uninstall_name_indexes(cursor)
+
+    def install_name_indexes(self, cursor):
+        if self.name_expression is None:
+            return
+        for table in self.name_tables:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_name_ci_idx "
+                f"ON {table} ({self.name_expression})"
+            )
+
+    def uninstall_name_indexes(self, cursor):
+        for table in self.name_tables:
+            cursor.execute(f"DROP INDEX IF EXISTS {table}_name_ci_idx")
+
+    def rebuild(self, cursor):
+        """Refill index from the titles table."""
+
+    def contains(self, value):
+        return Q(name__icontains=value)
+
+    def startswith(self, value):
+        return Q(name__istartswith=value)
+
+    def ranked(self, queryset, query):
+        """Titles matching query annotated with search_rank."""
+        return queryset.filter(self.contains(query)).annotate(
+            search_rank=Case(
+                When(name__iexact=query, then=Value(3)),
+                When(name__istartswith=query, then=Value(2)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        )
+
+
+class PostgresTitleSearch(TitleSearch):
+    """
+    pg_trgm GIN indexes over UPPER(column), the expression Django
+    emits for icontains/istartswith, so these lookups use the index.
+    """
+
+    indexes = (
+        ("title_name_trgm_idx", "reviews_title", "name"),
+        ("category_slug_trgm_idx", "reviews_category", "slug"),
+        ("genre_slug_trgm_idx", "reviews_genre", "slug"),
+    )
+    name_expression = "UPPER(name)"
+
+    def install(self, cursor):
+        super().install(cursor)
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, table, column in self.indexes:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+                f"USING gin (UPPER({column}) gin_trgm_ops)"
+            )
+
+    def uninstall(self, cursor):
+        super().uninstall(cursor)
+        for name, _, _ in self.indexes:
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+    def ranked(self, queryset, query):
+        upper_name, upper_query = Upper("name"), Upper(Value(query))
+        return (
+            queryset.annotate(
+                search_similar=Func(
+                    upper_name,
+                    upper_query,
+                    template="%(expressions)s",
+                    arg_joiner=" %% ",
+                    output_field=BooleanField(),
+                ),
+                search_rank=Func(
+                    upper_name,
+                    upper_query,
+                    function="similarity",
+                    output_field=FloatField(),
+                ),
+            )
+            .filter(Q(search_similar=True) | self.contains(query))
+        )
+
+
+class SQLiteTitleSearch(TitleSearch):
+    """
+    FTS5 trigram shadow table over title names, kept in sync by
+    triggers, so bulk inserts and updates are indexed too.
+    Django remakes tables on some SQLite schema changes and drops their
+    triggers and indexes on the way: run rebuild_search_index after such
+    migrations.
+    """
+
+    table = "reviews_title_fts"
+    # LIKE, which Django uses for iexact, can search NOCASE indexes
+    name_expression = "name COLLATE NOCASE"
+
+    def install(self, cursor):
+        super().install(cursor)
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+            f"name, content='reviews_title', content_rowid='id', "
+            f"tokenize='trigram')"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {self.table}_insert "
+            f"AFTER INSERT ON reviews_title BEGIN "
+            f"INSERT INTO {self.table}(rowid, name) "
+            f"VALUES (new.id, new.name); END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {self.table}_delete "
+            f"AFTER DELETE ON reviews_title BEGIN "
+            f"INSERT INTO {self.table}({self.table}, rowid, name) "
+            f"VALUES ('delete', old.id, old.name); END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {self.table}_update "
+            f"AFTER UPDATE OF name ON reviews_title BEGIN "
+            f"INSERT INTO {self.table}({self.table}, rowid, name) "
+            f"VALUES ('delete', old.id, old.name); "
+            f"INSERT INTO {self.table}(rowid, name) "
+            f"VALUES (new.id, new.name); END"
+        )
+
+    def uninstall(self, cursor):
+        super().uninstall(cursor)
+        for suffix in ("insert", "delete", "update"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {self.table}_{suffix}")
+        cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def rebuild(self, cursor):
+        cursor.execute(
+            f"INSERT INTO {self.table}({self.table}) VALUES ('rebuild')"
+        )
+
+    def match(self, value):
+        """FTS5 phrase query, which matches a substring for trigrams."""
+        return 'name:"{}"'.format(value.replace('"', '""'))
+
+    def contains(self, value):
+        if len(value) < MIN_INDEXED_LENGTH:
+            return super().contains(value)
+        return Q(
+            id__in=RawSQL(
+                f"SELECT rowid FROM {self.table} "
+                f"WHERE {self.table} MATCH %s",
+                (self.match(value),),
+            )
+        )
+
+    def startswith(self, value):
+        return self.contains(value) & super().startswith(value)
+
+    def ranked(self, queryset, query):
+        if len(query) < MIN_INDEXED_LENGTH:
+            return super().ranked(queryset, query)
+        return queryset.filter(self.contains(query)).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({self.table}) FROM {self.table} "
+                f"WHERE {self.table} MATCH %s "
+                f"AND rowid = {Title._meta.db_table}.id",
+                (self.match(query),),
+                output_field=FloatField(),
+            )
+        )
+
+
+BACKENDS = {
+    "postgresql": PostgresTitleSearch,
+    "sqlite": SQLiteTitleSearch,
+}
+
+
+def get_title_search(using="default"):
+    """Search backend for the vendor of the given database alias."""
+    vendor = connections[using].vendor
+    return BACKENDS.get(vendor, TitleSearch)()
@@ -0,0 +1,195 @@
+import random
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Max
+from django.utils import timezone
+
+from .activity import rebuild_user_activity
+from .importing import keep_timestamps
+from .leaderboards import LeaderboardBuilder
+from .models import Category, Comment, Genre, Review, Title
+from .ratings import rebuild_ratings, rebuild_score_buckets
+
+User = get_user_model()
+
+
+class CatalogSeeder:
+    """
+    Synthetic catalog for benchmarks and load tests. Rows get explicit
+    primary keys, so related rows are built without reading ids back.
+    Reviews are spread evenly over titles, every title is reviewed by
+    distinct users to satisfy the one review per author constraint.
+    """
+
+    def __init__(
+        self,
+        titles,
+        reviews,
+        comments=0,
+        categories=10,
+        genres=20,
+        using=DEFAULT_DB_ALIAS,
+        batch_size=5000,
+        seed=0,
+    ):
+        self.titles = titles
+        self.reviews = reviews
+        self.comments = comments
+        self.categories = categories
+        self.genres = genres
+        self.using = using
+        self.batch_size = batch_size
+        self.reviewers = max(-(-reviews // max(titles, 1)), 1)
+        self.random = random.Random(seed)
+        self.now = timezone.now()
+        self.seeded = []
+
+    def next_id(self, model):
+        last = model.objects.using(self.using).aggregate(last=Max("pk"))
+        return (last["last"] or 0) + 1
+
+    def insert(self, model, objs):
+        objs = iter(objs)
+        manager = model.objects.using(self.using)
+        with keep_timestamps(model):
+            batch = list(islice(objs, self.batch_size))
+            while batch:
+                manager.bulk_create(batch)
+                batch = list(islice(objs, self.batch_size))
+        self.seeded.append(model)
+
+    def run(self):
+        """Insert the catalog, return ids of (users, titles, reviews)."""
+        users = self.seed_users()
+        category_ids = self.seed_named(Category, "category", self.categories)
+        genre_ids = self.seed_named(Genre, "genre", self.genres)
+        titles = self.seed_titles(category_ids, genre_ids)
+        reviews = self.seed_reviews(users, titles)
+        self.seed_comments(users, reviews)
+        self.finish()
+        return users, titles, reviews
+
+    def seed_users(self):
+        first = self.next_id(User)
+        password = make_password(None)
+        ids = range(first, first + self.reviewers)
+        self.insert(
+            User,
+            (
+                User(
+                    id=pk,
+                    username=f"reviewer{pk}",
+                    email=f"reviewer{pk}@yamdb.fake",
+                    password=password,
+                )
+                for pk in ids
+            ),
+        )
+        return ids
+
+    def seed_named(self, model, name, count):
+        first = self.next_id(model)
+        ids = range(first, first + count)
+        self.insert(
+            model,
+            (
+                model(id=pk, name=f"{name.title()} {pk}", slug=f"{name}-{pk}")
+                for pk in ids
+            ),
+        )
+        return ids
+
+    def seed_titles(self, category_ids, genre_ids):
+        first = self.next_id(Title)
+        ids = range(first, first + self.titles)
+        self.insert(
+            Title,
+            (
+                Title(
+                    id=pk,
+                    name=f"Title {pk:07}",
+                    year=1900 + pk % 125,
+                    description=f"Synthetic title {pk}",
+                    category_id=category_ids[pk % len(category_ids)],
+                )
+                for pk in ids
+            ),
+        )
+        self.insert(
+            Title.genre.through,
+            (
+                Title.genre.through(title_id=pk, genre_id=genre_id)
+                for pk in ids
+                for genre_id in self.random.sample(
+                    genre_ids, min(2, len(genre_ids))
+                )
+            ),
+        )
+        return ids
+
+    def seed_reviews(self, users, titles):
+        if not titles:
+            return range(0)
+        first = self.next_id(Review)
+        ids = range(first, first + self.reviews)
+        self.insert(
+            Review,
+            (
+                Review(
+                    id=pk,
+                    title_id=titles[index % len(titles)],
+                    author_id=users[index // len(titles)],
+                    text=f"Synthetic review {pk}",
+                    score=self.random.randint(1, 10),
+                    pub_date=self.now - timedelta(minutes=index),
+                )
+                for index, pk in enumerate(ids)
+            ),
+        )
+        return ids
+
+    def seed_comments(self, users, reviews):
+        if not reviews:
+            return
+        first = self.next_id(Comment)
+        self.insert(
+            Comment,
+            (
+                Comment(
+                    id=pk,
+                    review_id=reviews[index % len(reviews)],
+                    author_id=users[index % len(users)],
+                    text=f"Synthetic comment {pk}",
+                    pub_date=self.now - timedelta(minutes=index),
+                )
+                for index, pk in enumerate(
+                    range(first, first + self.comments)
+                )
+            ),
+        )
+
+    def finish(self):
+        """Reset sequences past explicit ids, fill ratings and boards."""
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), self.seeded
+        )
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+        rebuild_score_buckets(using=self.using)
+        rebuild_ratings(using=self.using)
+        rebuild_user_activity(using=self.using)
+        LeaderboardBuilder(
+            size=settings.LEADERBOARD_SIZE,
+            min_reviews=settings.LEADERBOARD_MIN_REVIEWS,
+            prior_weight=settings.LEADERBOARD_PRIOR_WEIGHT,
+            trending_days=settings.LEADERBOARD_TRENDING_DAYS,
+            using=self.using,
+        ).rebuild()
@@ -0,0 +1,99 @@
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_save,
+)
+from django.dispatch import Signal, receiver
+
+from .activity import update_user_comments, update_user_reviews
+from .models import Comment, Review
+from .ratings import update_score_bucket, update_title_rating
+
+# Sent after bulk changes that bypass model signals (rebuilds, imports)
+catalog_changed = Signal()
+
+
+@receiver(post_init, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    """
+    Remember loaded title, score and author without touching deferred
+    fields.
+    """
+    instance._rating_state = (
+        instance.__dict__.get("title_id"),
+        instance.__dict__.get("score"),
+        instance.__dict__.get("author_id"),
+    )
+
+
+@receiver(pre_save, sender=Review)
+def load_deferred_review_score(sender, instance, raw, **kwargs):
+    """Fetch original values if they were deferred when review was loaded."""
+    if raw or instance._state.adding or None not in instance._rating_state:
+        return
+    instance._rating_state = (
+        Review.objects.filter(pk=instance.pk)
+        .values_list("title_id", "score", "author_id")
+        .first()
+    ) or (None, None, None)
+
+
+@receiver(post_save, sender=Review)
+def apply_review_score(sender, instance, created, raw, **kwargs):
+    """
+    Add new review score to the title rating and author counters, or
+    apply score change.
+    """
+    if raw:
+        return
+    old_title_id, old_score, old_author_id = instance._rating_state
+    if created:
+        update_title_rating(instance.title_id, instance.score, 1)
+        update_score_bucket(instance.title_id, instance.score, 1)
+        update_user_reviews(instance.author_id, instance.score, 1)
+    elif old_title_id != instance.title_id:
+        update_title_rating(old_title_id, -old_score, -1)
+        update_title_rating(instance.title_id, instance.score, 1)
+        update_score_bucket(old_title_id, old_score, -1)
+        update_score_bucket(instance.title_id, instance.score, 1)
+    elif old_score != instance.score:
+        update_title_rating(instance.title_id, instance.score - old_score, 0)
+        update_score_bucket(instance.title_id, old_score, -1)
+        update_score_bucket(instance.title_id, instance.score, 1)
+    if not created:
+        move_author_score(instance, old_author_id, old_score)
+    instance._rating_state = (
+        instance.title_id,
+        instance.score,
+        instance.author_id,
+    )
+
+
+def move_author_score(instance, old_author_id, old_score):
+    """Apply score change of a saved review, or its move to new author."""
+    if old_author_id != instance.author_id:
+        update_user_reviews(old_author_id, -old_score, -1)
+        update_user_reviews(instance.author_id, instance.score, 1)
+    elif old_score != instance.score:
+        update_user_reviews(instance.author_id, instance.score - old_score, 0)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_score(sender, instance, **kwargs):
+    """Subtract score of deleted review, including cascade deletes."""
+    update_title_rating(instance.title_id, -instance.score, -1)
+    update_score_bucket(instance.title_id, instance.score, -1)
+    update_user_reviews(instance.author_id, -instance.score, -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        update_user_comments(instance.author_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    """Uncount deleted comment, including queryset and cascade deletes."""
+    update_user_comments(instance.author_id, -1)
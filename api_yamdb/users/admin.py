@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.translation import gettext_lazy as _
 
-from .models import User
+from .models import OutgoingEmail, User
 
 
 class CustomUserAdmin(UserAdmin):
@@ -44,3 +44,12 @@ class CustomUserAdmin(UserAdmin):
 
 
 admin.site.register(User, CustomUserAdmin)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'recipient', 'subject', 'status', 'attempts',
+                    'next_attempt_at', 'sent_at',)
+    list_filter = ('status',)
+    search_fields = ('recipient',)
+    readonly_fields = ('created_at',)
@@ -0,0 +1,63 @@
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import RoleMixin
+from .tokens import get_token_version, token_versions_shared
+
+VERSION_CLAIM = "ver"
+CLAIMS = ("username", "role", "is_staff", "is_superuser", VERSION_CLAIM)
+
+
+class ClaimsUser(RoleMixin, TokenUser):
+    """User built from access token claims, without a database row."""
+
+    @cached_property
+    def role(self):
+        return self.token.get("role", self.USER)
+
+
+class DatabaseJWTAuthentication(JWTAuthentication):
+    """
+    Load the user row, for endpoints which need all of its fields.
+    Tokens issued before the last role change are rejected.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        version = validated_token.get(VERSION_CLAIM)
+        if version is not None and version != user.token_version:
+            raise AuthenticationFailed(
+                _("Token is outdated"), code="token_outdated"
+            )
+        return user
+
+
+class ClaimsJWTAuthentication(DatabaseJWTAuthentication):
+    """
+    Build the user from role claims of the token. Only the token
+    version is checked, through the cache. Tokens without claims fall
+    back to the database, as do all tokens when the cache is local to
+    the process: saves in other workers would not refresh it.
+    """
+
+    def get_user(self, validated_token):
+        if not token_versions_shared() or any(
+            claim not in validated_token for claim in CLAIMS
+        ):
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise AuthenticationFailed(
+                _("Token contained no recognizable user identification"),
+                code="token_not_valid",
+            )
+        if get_token_version(user_id) != validated_token[VERSION_CLAIM]:
+            raise AuthenticationFailed(
+                _("Token is outdated"), code="token_outdated"
+            )
+        return ClaimsUser(validated_token)
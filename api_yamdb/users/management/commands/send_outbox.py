@@ -0,0 +1,74 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from users.outbox import OutboxWorker
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.OUTBOX_BATCH_SIZE,
+            help="Emails sent over one connection per batch.",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=settings.OUTBOX_MAX_ATTEMPTS,
+            help="Attempts before email is marked as failed.",
+        )
+        parser.add_argument(
+            "--backoff",
+            type=float,
+            default=settings.OUTBOX_RETRY_BACKOFF,
+            help="Delay in seconds before the first retry, doubled after.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.OUTBOX_POLL_INTERVAL,
+            help="Sleep in seconds when there is nothing to send.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain due emails and exit instead of polling forever.",
+        )
+
+    def handle(self, *args, **options):
+        worker = OutboxWorker(
+            batch_size=options["batch_size"],
+            max_attempts=options["max_attempts"],
+            backoff=options["backoff"],
+        )
+        try:
+            while True:
+                started = time.monotonic()
+                stats = worker.deliver_batch()
+                processed = sum(stats.values())
+                if processed:
+                    self.report(worker, stats, time.monotonic() - started)
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            worker.close()
+        totals = ", ".join(
+            f"{key}={value}" for key, value in worker.totals.items()
+        )
+        self.stdout.write(self.style.SUCCESS(f"Outbox totals: {totals}"))
+
+    def report(self, worker, stats, elapsed):
+        processed = sum(stats.values())
+        self.stdout.write(
+            f"batch sent={stats['sent']} retried={stats['retried']} "
+            f"failed={stats['failed']} pending={worker.pending_count()} "
+            f"seconds={elapsed:.3f} rate={processed / elapsed:.1f}/s"
+        )
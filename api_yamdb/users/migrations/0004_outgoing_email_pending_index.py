@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-17 07:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_token_version'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='outgoingemail',
+            name='outgoing_email_queue_idx',
+        ),
+        migrations.AddIndex(
+            model_name='outgoingemail',
+            index=models.Index(condition=models.Q(status='pending'), fields=['next_attempt_at'], name='outgoing_email_pending_idx'),
+        ),
+    ]
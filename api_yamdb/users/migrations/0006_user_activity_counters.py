@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-17 08:06
+
+from django.db import migrations, models
+import reviews.activity
+
+
+def fill_counters(apps, schema_editor):
+    reviews.activity.rebuild_user_activity(
+        user_model=apps.get_model('users', 'User'),
+        review_model=apps.get_model('reviews', 'Review'),
+        comment_model=apps.get_model('reviews', 'Comment'),
+        using=schema_editor.connection.alias,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_alter_user_first_name'),
+        ('reviews', '0008_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='average_score',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Средняя оценка'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='review_score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
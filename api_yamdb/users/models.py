@@ -2,9 +2,13 @@ from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
+from .tokens import cache_token_version
+
 
 def prohibited_usernames_validator(value):
     """Validate prohibited usernames."""
@@ -15,14 +19,50 @@ def prohibited_usernames_validator(value):
         )
 
 
-class User(AbstractUser):
+class RoleMixin:
+    """Role checks shared by user model and users built from token claims."""
+
     USER = "user"
     MODERATOR = "moderator"
     ADMIN = "admin"
+
+    # Computed once per instance, users are loaded for every request
+    ROLE_CHECKS = ("is_admin", "is_moderator")
+
+    @cached_property
+    def is_admin(self):
+        return self.is_staff or self.role == self.ADMIN or self.is_superuser
+
+    @cached_property
+    def is_moderator(self):
+        return self.role == self.MODERATOR or self.is_admin
+
+    def reset_role_checks(self):
+        for name in self.ROLE_CHECKS:
+            self.__dict__.pop(name, None)
+
+
+class User(RoleMixin, AbstractUser):
+    # Fields copied into access token claims, changing any of them
+    # invalidates issued tokens
+    TOKEN_STATE_FIELDS = (
+        "username",
+        "role",
+        "is_staff",
+        "is_superuser",
+        "is_active",
+    )
+    # Never written back from instances, which may hold stale values
+    ACTIVITY_FIELDS = (
+        "review_count",
+        "review_score_sum",
+        "average_score",
+        "comment_count",
+    )
     ROLE_CHOICES = [
-        (USER, "User"),
-        (MODERATOR, "Moderator"),
-        (ADMIN, "Administrator"),
+        (RoleMixin.USER, "User"),
+        (RoleMixin.MODERATOR, "Moderator"),
+        (RoleMixin.ADMIN, "Administrator"),
     ]
 
     username_validator = UnicodeUsernameValidator()
@@ -46,7 +86,7 @@ class User(AbstractUser):
     role = models.CharField(
         "Роль пользователя",
         choices=ROLE_CHOICES,
-        default=USER,
+        default=RoleMixin.USER,
         max_length=20,
         blank=True,
     )
@@ -55,24 +95,128 @@ class User(AbstractUser):
         blank=True,
     )
     confirmation_code = models.CharField(max_length=24, blank=True)
+    token_version = models.PositiveIntegerField(
+        "Версия токенов",
+        default=0,
+        editable=False,
+    )
+    # Activity counters, shifted atomically by reviews.activity
+    review_count = models.PositiveIntegerField(
+        "Количество отзывов",
+        default=0,
+        editable=False,
+    )
+    review_score_sum = models.PositiveIntegerField(
+        "Сумма оценок",
+        default=0,
+        editable=False,
+    )
+    average_score = models.FloatField(
+        "Средняя оценка",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    comment_count = models.PositiveIntegerField(
+        "Количество комментариев",
+        default=0,
+        editable=False,
+    )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._token_state = user.get_token_state()
+        return user
+
+    def get_token_state(self):
+        return tuple(
+            self.__dict__.get(field) for field in self.TOKEN_STATE_FIELDS
+        )
+
+    def get_saved_fields(self):
+        """Loaded fields besides the activity counters."""
+        deferred = self.get_deferred_fields()
+        return [
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.name not in self.ACTIVITY_FIELDS
+            and field.attname not in deferred
+        ]
 
     def save(self, *args, **kwargs):
-        """Update is_staff for admin users and role for superuser."""
+        """
+        Update is_staff for admin users and role for superuser.
+        Bump token version when data copied into tokens changes.
+        Activity counters are left to their atomic updates.
+        """
         if self.role == User.ADMIN:
             self.is_staff = True
         if self.is_superuser:
             self.role = User.ADMIN
+        self.reset_role_checks()
+        loaded_state = getattr(self, "_token_state", None)
+        token_state = self.get_token_state()
+        bumped = loaded_state is not None and loaded_state != token_state
+        if bumped:
+            self.token_version += 1
+        if not (
+            self._state.adding
+            or kwargs.get("force_insert")
+            or kwargs.get("update_fields") is not None
+        ):
+            kwargs["update_fields"] = self.get_saved_fields()
         super(User, self).save(*args, **kwargs)
+        self._token_state = token_state
+        if bumped:
+            user_id, version = self.pk, self.token_version
+            transaction.on_commit(
+                lambda: cache_token_version(user_id, version)
+            )
 
-    @property
-    def is_admin(self):
-        return self.is_staff or self.role == self.ADMIN or self.is_superuser
 
-    @property
-    def is_moderator(self):
-        return (
-            self.role == self.MODERATOR
-            or self.role == self.ADMIN
-            or self.is_staff
-            or self.is_superuser
-        )
+class OutgoingEmail(models.Model):
+    """Outbox email, delivered by the send_outbox worker."""
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    subject = models.CharField("Тема", max_length=255)
+    body = models.TextField("Текст")
+    from_email = models.EmailField("Отправитель")
+    recipient = models.EmailField("Получатель")
+    status = models.CharField(
+        "Статус",
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        max_length=20,
+    )
+    attempts = models.PositiveSmallIntegerField("Попытки", default=0)
+    next_attempt_at = models.DateTimeField(
+        "Следующая попытка", default=timezone.now
+    )
+    last_error = models.TextField("Последняя ошибка", blank=True)
+    created_at = models.DateTimeField("Создано", auto_now_add=True)
+    sent_at = models.DateTimeField("Отправлено", null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Only pending emails are polled, sent ones stay out of the index
+            models.Index(
+                fields=["next_attempt_at"],
+                name="outgoing_email_pending_idx",
+                condition=models.Q(status="pending"),
+            ),
+        ]
+        verbose_name = "Исходящее письмо"
+        verbose_name_plural = "Исходящие письма"
+
+    def __str__(self):
+        return f"{self.recipient}: {self.subject}"
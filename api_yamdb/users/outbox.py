@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def queue_email(subject, body, recipient, from_email=None):
+    """Put email into the outbox of the current transaction."""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipient=recipient,
+    )
+
+
+def retry_delay(attempts, backoff):
+    """Exponential backoff: backoff, 2 * backoff, 4 * backoff..."""
+    return timedelta(seconds=backoff * 2 ** (attempts - 1))
+
+
+class OutboxWorker:
+    """Deliver outbox emails in batches over one mail connection."""
+
+    def __init__(self, batch_size, max_attempts, backoff):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.connection = get_connection(fail_silently=False)
+        self.totals = {"sent": 0, "retried": 0, "failed": 0}
+
+    def open(self):
+        try:
+            self.connection.open()
+        except Exception:
+            # Next send opens it again and records the error on the email
+            self.connection.close()
+
+    def close(self):
+        self.connection.close()
+
+    def deliver_batch(self):
+        """Send one batch of due emails and return its counters."""
+        stats = {"sent": 0, "retried": 0, "failed": 0}
+        with transaction.atomic():
+            # Locked rows are skipped, so several workers can drain one queue
+            emails = list(
+                OutgoingEmail.objects.select_for_update(skip_locked=True)
+                .filter(
+                    status=OutgoingEmail.PENDING,
+                    next_attempt_at__lte=timezone.now(),
+                )
+                .order_by("next_attempt_at")[:self.batch_size]
+            )
+            if not emails:
+                return stats
+            self.open()
+            for email in emails:
+                stats[self.deliver(email)] += 1
+            OutgoingEmail.objects.bulk_update(
+                emails,
+                [
+                    "status",
+                    "attempts",
+                    "next_attempt_at",
+                    "last_error",
+                    "sent_at",
+                ],
+            )
+        for key, value in stats.items():
+            self.totals[key] += value
+        return stats
+
+    def deliver(self, email):
+        email.attempts += 1
+        message = EmailMessage(
+            subject=email.subject,
+            body=email.body,
+            from_email=email.from_email,
+            to=[email.recipient],
+            connection=self.connection,
+        )
+        try:
+            message.send()
+        except Exception as error:
+            email.last_error = f"{type(error).__name__}: {error}"
+            # Broken connection is reopened for the rest of the batch
+            self.close()
+            self.open()
+            if email.attempts >= self.max_attempts:
+                email.status = OutgoingEmail.FAILED
+                return "failed"
+            email.next_attempt_at = timezone.now() + retry_delay(
+                email.attempts, self.backoff
+            )
+            return "retried"
+        email.status = OutgoingEmail.SENT
+        email.sent_at = timezone.now()
+        email.last_error = ""
+        return "sent"
+
+    def pending_count(self):
+        return OutgoingEmail.objects.filter(
+            status=OutgoingEmail.PENDING
+        ).count()
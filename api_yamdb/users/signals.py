@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import User
+from .tokens import forget_token_version
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_user_token_version(sender, instance, **kwargs):
+    """Tokens of a deleted user stop working with its cached version."""
+    user_id = instance.pk
+    transaction.on_commit(lambda: forget_token_version(user_id))
@@ -1,3 +1,56 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework_simplejwt.tokens import AccessToken
+
+TOKEN_VERSION_KEY = "users:token_version:{}"
 
 confirmation_code = PasswordResetTokenGenerator()
+
+
+class RoleAccessToken(AccessToken):
+    """Access token carrying the claims permissions need."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token["username"] = user.username
+        token["role"] = user.role
+        token["is_staff"] = user.is_staff
+        token["is_superuser"] = user.is_superuser
+        token["ver"] = user.token_version
+        return token
+
+
+def cache_token_version(user_id, version):
+    cache.set(
+        TOKEN_VERSION_KEY.format(user_id),
+        version,
+        settings.TOKEN_VERSION_CACHE_TIMEOUT,
+    )
+
+
+def forget_token_version(user_id):
+    cache.delete(TOKEN_VERSION_KEY.format(user_id))
+
+
+def token_versions_shared():
+    """Whether a cached version is refreshed for every worker."""
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache)
+
+
+def get_token_version(user_id):
+    """Current token version of active user or None, cached."""
+    version = cache.get(TOKEN_VERSION_KEY.format(user_id))
+    if version is None:
+        version = (
+            get_user_model()
+            .objects.filter(pk=user_id, is_active=True)
+            .values_list("token_version", flat=True)
+            .first()
+        )
+        if version is not None:
+            cache_token_version(user_id, version)
+    return version
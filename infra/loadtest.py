@@ -0,0 +1,157 @@
+"""
+Compare throughput and latency of running deployments, for example the
+default gunicorn setup against the ASGI profile:
+
+    python loadtest.py --target wsgi=http://localhost:8000 \
+        --target asgi=http://localhost:8001 --concurrency 64 --duration 30
+
+Every client thread keeps one connection open and requests the paths in
+turn. Only the standard library is used.
+"""
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = (
+    "/api/v1/titles/",
+    "/api/v1/titles/?genre=genre",
+    "/api/v1/genres/",
+    "/api/v1/categories/",
+    "/api/v1/titles/{title_id}/",
+    "/api/v1/titles/{title_id}/reviews/",
+)
+
+
+class Client(threading.Thread):
+    def __init__(self, base_url, paths, headers, deadline):
+        super().__init__(daemon=True)
+        self.url = urlsplit(base_url)
+        self.paths = paths
+        self.headers = headers
+        self.deadline = deadline
+        self.latencies = []
+        self.errors = 0
+
+    def connect(self):
+        connection_class = (
+            http.client.HTTPSConnection
+            if self.url.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        return connection_class(self.url.netloc, timeout=30)
+
+    def run(self):
+        connection = self.connect()
+        index = 0
+        while time.monotonic() < self.deadline:
+            path = self.paths[index % len(self.paths)]
+            index += 1
+            started = time.perf_counter()
+            try:
+                connection.request("GET", path, headers=self.headers)
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                connection.close()
+                connection = self.connect()
+                continue
+            if response.status >= 400:
+                self.errors += 1
+            self.latencies.append(time.perf_counter() - started)
+        connection.close()
+
+
+def percentile(values, share):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(share * len(ordered)), len(ordered) - 1)]
+
+
+def run_target(base_url, paths, headers, concurrency, duration):
+    deadline = time.monotonic() + duration
+    clients = [
+        Client(base_url, paths, headers, deadline)
+        for _ in range(concurrency)
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    latencies = [value for client in clients for value in client.latencies]
+    return {
+        "requests": len(latencies),
+        "errors": sum(client.errors for client in clients),
+        "rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(
+            statistics.mean(latencies) * 1000 if latencies else 0, 2
+        ),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--target",
+        action="append",
+        required=True,
+        help="name=base URL of a deployment, may be repeated.",
+    )
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument(
+        "--duration", type=float, default=20, help="Seconds per target."
+    )
+    parser.add_argument(
+        "--path",
+        action="append",
+        help="Path to request, may be repeated. Defaults to catalog reads.",
+    )
+    parser.add_argument(
+        "--title-id", type=int, default=1, help="Title of detail paths."
+    )
+    parser.add_argument("--token", help="Bearer token sent with requests.")
+    parser.add_argument("--json", help="Also write results to this file.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    paths = [
+        path.format(title_id=args.title_id)
+        for path in (args.path or DEFAULT_PATHS)
+    ]
+    headers = {"Accept": "application/json"}
+    if args.token:
+        headers["Authorization"] = f"Bearer {args.token}"
+    results = {}
+    for target in args.target:
+        name, _, base_url = target.partition("=")
+        results[name] = run_target(
+            base_url.rstrip("/"),
+            paths,
+            headers,
+            args.concurrency,
+            args.duration,
+        )
+    columns = ("requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms")
+    print("target".ljust(12) + "".join(name.rjust(10) for name in columns))
+    for name, result in results.items():
+        print(
+            name.ljust(12)
+            + "".join(str(result[column]).rjust(10) for column in columns)
+        )
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
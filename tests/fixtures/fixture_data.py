@@ -0,0 +1,54 @@
+import pytest
+
+
+@pytest.fixture
+def category():
+    from reviews.models import Category
+    return Category.objects.create(name='Фильм', slug='films')
+
+
+@pytest.fixture
+def genres():
+    from reviews.models import Genre
+    return [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre_{i}')
+        for i in range(1, 4)
+    ]
+
+
+@pytest.fixture
+def title(category, genres):
+    from reviews.models import Title
+    title = Title.objects.create(name='Чужой', year=1979, category=category)
+    title.genre.set(genres[:2])
+    return title
+
+
+@pytest.fixture
+def titles(category, genres):
+    from reviews.models import Title
+    titles = []
+    for i in range(1, 31):
+        title = Title.objects.create(
+            name=f'Произведение {i:02}', year=1950 + i, category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    return titles
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    """Default cache in files, which all processes of the host share."""
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path / 'cache'),
+        }
+    }
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    cache.clear()
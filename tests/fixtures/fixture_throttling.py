@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def throttle_stores(monkeypatch):
+    """Every test starts with empty throttle counters."""
+    from api import throttling
+    monkeypatch.setattr(throttling, '_stores', {})
@@ -0,0 +1,54 @@
+import pytest
+from rest_framework.test import APIClient
+from users.tokens import RoleAccessToken
+
+
+def get_client(user=None):
+    client = APIClient()
+    if user is not None:
+        token = RoleAccessToken.for_user(user)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUser', email='testuser@yamdb.fake', password='1234567'
+    )
+
+
+@pytest.fixture
+def moderator(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestModerator', email='moderator@yamdb.fake',
+        password='1234567', role='moderator'
+    )
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestAdmin', email='admin@yamdb.fake',
+        password='1234567', role='admin'
+    )
+
+
+@pytest.fixture
+def guest_client():
+    return get_client()
+
+
+@pytest.fixture
+def user_client(user):
+    return get_client(user)
+
+
+@pytest.fixture
+def moderator_client(moderator):
+    return get_client(moderator)
+
+
+@pytest.fixture
+def admin_client(admin):
+    return get_client(admin)
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from api.v1 import async_reads
+from api.v1.async_reads import async_read_urls, async_read_view
+from api.v1.views import ManageUsersViewSet, TitleViewSet
+from api_yamdb import asgi
+from asgiref.sync import async_to_sync, sync_to_async
+from django.http import HttpResponse
+from django.test import AsyncClient, AsyncRequestFactory, override_settings
+from rest_framework.routers import SimpleRouter
+
+
+@pytest.fixture
+def read_pool(monkeypatch):
+    """Fresh read pool of two threads."""
+    monkeypatch.setattr(async_reads, '_executors', {})
+    with override_settings(ASYNC_READ_THREADS=2):
+        yield
+    async_reads.get_read_executor().shutdown()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncReads:
+
+    def test_wrapped_listing(self, titles, read_pool):
+        view = async_read_view(TitleViewSet.as_view({'get': 'list'}))
+        assert asyncio.iscoroutinefunction(view)
+        request = AsyncRequestFactory().get('/api/v1/titles/')
+        response = async_to_sync(view)(request)
+        assert response.status_code == 200
+        assert response.data['count'] == 30, (
+            'Проверьте, что чтение выполняется в пуле потоков'
+        )
+
+    def test_bounded_concurrency(self, read_pool):
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def slow_view(request):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+            return HttpResponse(threading.current_thread().name)
+
+        view = async_read_view(slow_view)
+        factory = AsyncRequestFactory()
+
+        async def requests():
+            return await asyncio.gather(
+                *(view(factory.get('/')) for _ in range(6))
+            )
+
+        responses = async_to_sync(requests)()
+        assert max(peak) == 2, (
+            'Проверьте, что число потоков чтения ограничено'
+        )
+        assert all(
+            response.content.startswith(b'api-read')
+            for response in responses
+        )
+
+    def test_only_listed_views_are_wrapped(self):
+        router = SimpleRouter()
+        router.register('titles', TitleViewSet, basename='titles')
+        router.register('users', ManageUsersViewSet, basename='users')
+        patterns = async_read_urls(router.urls, (TitleViewSet,))
+        wrapped = {
+            pattern.callback.cls: asyncio.iscoroutinefunction(
+                pattern.callback
+            )
+            for pattern in patterns
+            if hasattr(pattern.callback, 'cls')
+        }
+        assert wrapped == {TitleViewSet: True, ManageUsersViewSet: False}
+
+    def test_asgi_request(self, titles):
+        response = async_to_sync(AsyncClient().get)('/api/v1/titles/')
+        assert response.status_code == 200
+        assert response.json()['count'] == 30
+
+    def test_sync_work_of_requests_in_parallel(self, monkeypatch):
+        threads = set()
+        barrier = threading.Barrier(2, timeout=5)
+
+        def sync_work():
+            threads.add(threading.current_thread().name)
+            # Both requests must be inside sync code at the same time
+            barrier.wait()
+
+        async def django_application(scope, receive, send):
+            await sync_to_async(sync_work)()
+
+        monkeypatch.setattr(asgi, 'django_application', django_application)
+
+        async def requests():
+            await asyncio.gather(
+                *(asgi.application({}, None, None) for _ in range(2))
+            )
+
+        # As under uvicorn, no outer sync thread takes the sync work
+        asyncio.run(requests())
+        assert len(threads) == 2, (
+            'Проверьте, что синхронный код запросов не делит один поток'
+        )
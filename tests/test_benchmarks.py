@@ -0,0 +1,332 @@
+import gc
+import json
+import math
+import os
+import statistics
+import time
+import tracemalloc
+from io import StringIO
+from os.path import dirname, join
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, resolve
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    TitleRanking,
+)
+from reviews.seeding import CatalogSeeder
+
+from .fixtures.fixture_user import get_client
+
+BASELINE_PATH = join(dirname(__file__), 'benchmark_baseline.json')
+API_PREFIX = 'api/v1/'
+UNSAFE_METHODS = ('POST', 'PATCH', 'PUT', 'DELETE')
+
+
+def setting(name, default):
+    return type(default)(os.getenv(f'BENCHMARK_{name}', default))
+
+
+SCALE = {
+    'titles': setting('TITLES', 100),
+    'reviews': setting('REVIEWS', 1000),
+    'comments': setting('COMMENTS', 1000),
+}
+RUNS = setting('RUNS', 5)
+# Timings depend on the machine, so only query counts are always checked
+CHECK_LATENCY = setting('LATENCY', 0) == 1
+TOLERANCE = setting('TOLERANCE', 0.25)
+# Timer noise below this is not a regression
+SLACK_MS = setting('SLACK_MS', 5.0)
+UPDATE_BASELINE = setting('UPDATE', 0) == 1
+
+
+def api_routes(patterns=None, prefix=''):
+    """Routes of the API as ResolverMatch.route, without format suffixes."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        # Joined the way ResolverMatch.route is
+        route = prefix + str(pattern.pattern).lstrip('^')
+        if isinstance(pattern, URLResolver):
+            yield from api_routes(pattern.url_patterns, route)
+        elif route.startswith(API_PREFIX) and '<format>' not in route:
+            yield route
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(share * len(ordered)) - 1, 0)]
+
+
+def cases(data):
+    """(method, path template, client, payload) of every benchmark."""
+    title_item = {
+        'name': 'Новинка', 'year': 2020,
+        'genre': [data['genre']], 'category': data['category'],
+    }
+    reviews = '/api/v1/titles/{title}/reviews/'
+    comments = reviews + '{review}/comments/'
+    return [
+        ('GET', '/api/v1/', 'guest', None),
+        ('POST', '/api/v1/auth/signup/', 'guest',
+         {'username': 'newcomer', 'email': 'newcomer@yamdb.fake'}),
+        ('POST', '/api/v1/auth/token/', 'guest',
+         {'username': 'bench', 'confirmation_code': 'code'}),
+        ('GET', '/api/v1/users/', 'admin', None),
+        ('POST', '/api/v1/users/', 'admin',
+         {'username': 'created', 'email': 'created@yamdb.fake'}),
+        ('GET', '/api/v1/users/{username}/', 'admin', None),
+        ('PATCH', '/api/v1/users/{username}/', 'admin', {'bio': 'Био'}),
+        ('DELETE', '/api/v1/users/{spare_username}/', 'admin', None),
+        ('GET', '/api/v1/users/me/', 'user', None),
+        ('PATCH', '/api/v1/users/me/', 'user', {'bio': 'Био'}),
+        ('GET', '/api/v1/categories/', 'guest', None),
+        ('GET', '/api/v1/categories/?search={category_name}', 'guest', None),
+        ('POST', '/api/v1/categories/', 'admin',
+         {'name': 'Новая', 'slug': 'new'}),
+        ('DELETE', '/api/v1/categories/{spare_category}/', 'admin', None),
+        ('POST', '/api/v1/categories/bulk/', 'admin',
+         [{'name': f'Новая {i}', 'slug': f'new-{i}'} for i in range(20)]),
+        ('GET', '/api/v1/genres/', 'guest', None),
+        ('POST', '/api/v1/genres/', 'admin',
+         {'name': 'Новый', 'slug': 'new'}),
+        ('DELETE', '/api/v1/genres/{spare_genre}/', 'admin', None),
+        ('POST', '/api/v1/genres/bulk/', 'admin',
+         [{'name': f'Новый {i}', 'slug': f'new-{i}'} for i in range(20)]),
+        ('GET', '/api/v1/titles/', 'guest', None),
+        ('GET', '/api/v1/titles/?genre={genre}', 'guest', None),
+        ('GET', '/api/v1/titles/?category={category}&year=2000', 'guest',
+         None),
+        ('GET', '/api/v1/titles/?name=Title', 'guest', None),
+        ('GET', '/api/v1/titles/?q=Title 00001', 'guest', None),
+        ('GET', '/api/v1/titles/?fields=id,name,rating', 'guest', None),
+        ('GET', '/api/v1/titles/?limit=100', 'guest', None),
+        ('POST', '/api/v1/titles/', 'admin', title_item),
+        ('GET', '/api/v1/titles/{title}/', 'guest', None),
+        ('PATCH', '/api/v1/titles/{title}/', 'admin', {'name': 'Новое'}),
+        ('DELETE', '/api/v1/titles/{spare_title}/', 'admin', None),
+        ('GET', '/api/v1/titles/{title}/stats/', 'guest', None),
+        ('POST', '/api/v1/titles/bulk/', 'admin',
+         [dict(title_item, name=f'Новинка {i}') for i in range(20)]),
+        ('GET', reviews, 'guest', None),
+        ('GET', reviews + '?pagination=cursor', 'guest', None),
+        ('GET', reviews + '?limit=100', 'guest', None),
+        ('POST', reviews.replace('{title}', '{other_title}'), 'user',
+         {'text': 'Отзыв', 'score': 7}),
+        ('GET', reviews + '{review}/', 'guest', None),
+        ('PATCH', reviews + '{review}/', 'user', {'score': 3}),
+        ('DELETE', reviews + '{review}/', 'user', None),
+        ('GET', comments, 'guest', None),
+        ('POST', comments, 'user', {'text': 'Комментарий'}),
+        ('GET', comments + '{comment}/', 'guest', None),
+        ('PATCH', comments + '{comment}/', 'user', {'text': 'Другой'}),
+        ('DELETE', comments + '{comment}/', 'user', None),
+        ('GET', '/api/v1/export/titles/', 'admin', None),
+        ('GET', '/api/v1/_metrics', 'admin', None),
+        ('GET', '/api/v1/leaderboards/top/', 'guest', None),
+        ('GET', '/api/v1/leaderboards/top/?fields=position,title.name',
+         'guest', None),
+    ]
+
+
+def measure(client, method, path, payload):
+    """Run one request, return (queries, seconds, response)."""
+    cache.clear()
+    request = getattr(client, method.lower())
+    # Bulk payloads are lists, which only JSON carries
+    output = 'json' if isinstance(payload, list) else None
+    with transaction.atomic():
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = request(path, data=payload, format=output)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            seconds = time.perf_counter() - started
+        if method in UNSAFE_METHODS:
+            transaction.set_rollback(True)
+    return len(context.captured_queries), seconds, response
+
+
+def run_case(client, method, path, payload):
+    queries, timings = set(), []
+    # Collector pauses would land on random requests, as with timeit
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(RUNS):
+            count, seconds, response = measure(
+                client, method, path, payload
+            )
+            assert response.status_code < 400, (
+                f'{method} {path}: {response.status_code} '
+                f'{response.content}'
+            )
+            queries.add(count)
+            timings.append(seconds * 1000)
+    finally:
+        gc.enable()
+    peaks = []
+    for _ in range(3):
+        tracemalloc.start()
+        measure(client, method, path, payload)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {
+        'queries': max(queries),
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'peak_kb': round(min(peaks) / 1024),
+    }
+
+
+def regressions(key, result, baseline):
+    expected = baseline['routes'].get(key)
+    if expected is None:
+        return [f'{key}: нет в базовой линии, запустите с BENCHMARK_UPDATE=1']
+    found = []
+    if result['queries'] > expected['queries']:
+        found.append(
+            f'{key}: {result["queries"]} запросов, '
+            f'было {expected["queries"]}'
+        )
+    if CHECK_LATENCY:
+        for metric, slack in (('p95_ms', SLACK_MS), ('peak_kb', 0)):
+            limit = max(
+                expected[metric] * (1 + TOLERANCE), expected[metric] + slack
+            )
+            if result[metric] > limit:
+                found.append(
+                    f'{key}: {metric} {result[metric]}, '
+                    f'было {expected[metric]}'
+                )
+    return found
+
+
+@pytest.fixture
+def catalog(django_user_model, settings):
+    # Repeated requests of a case must not be throttled
+    settings.REST_FRAMEWORK = dict(
+        settings.REST_FRAMEWORK,
+        DEFAULT_THROTTLE_RATES={
+            scope: '1000000/s'
+            for scope in settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+        },
+    )
+    users, titles, reviews = CatalogSeeder(**SCALE).run()
+    author = django_user_model.objects.create_user(
+        username='bench', email='bench@yamdb.fake', confirmation_code='code'
+    )
+    admin = django_user_model.objects.create_user(
+        username='bench_admin', email='bench_admin@yamdb.fake',
+        role='admin',
+    )
+    spare = django_user_model.objects.create_user(
+        username='spare', email='spare@yamdb.fake'
+    )
+    review = Review.objects.create(
+        title_id=titles[0], author=author, text='Отзыв', score=5
+    )
+    comment = Comment.objects.create(
+        review=review, author=author, text='Комментарий'
+    )
+    category = Category.objects.order_by('id').first()
+    # Rows deleted by benchmarks have no dependants, so the number
+    # of cascade queries does not grow with the scale
+    spare_category = Category.objects.create(name='Пустая', slug='spare')
+    spare_genre = Genre.objects.create(name='Пустой', slug='spare')
+    spare_title = Title.objects.create(
+        name='Без отзывов', year=2000, category=category
+    )
+    return {
+        'clients': {
+            'guest': get_client(),
+            'user': get_client(author),
+            'admin': get_client(admin),
+        },
+        'username': django_user_model.objects.get(pk=users[0]).username,
+        'spare_username': spare.username,
+        'category': category.slug,
+        'category_name': category.name,
+        'genre': Genre.objects.order_by('id').first().slug,
+        'title': titles[0],
+        'other_title': titles[-1],
+        'spare_category': spare_category.slug,
+        'spare_genre': spare_genre.slug,
+        'spare_title': spare_title.id,
+        'review': review.id,
+        'comment': comment.id,
+    }
+
+
+@pytest.mark.django_db
+class TestBenchmarks:
+
+    def test_every_route_is_benchmarked(self, catalog):
+        benchmarked = {
+            resolve(path.format(**catalog).split('?')[0]).route
+            for _, path, _, _ in cases(catalog)
+        }
+        missing = set(api_routes()) - benchmarked
+        assert not missing, (
+            f'Добавьте маршруты в бенчмарк: {", ".join(sorted(missing))}'
+        )
+
+    def test_seed_catalog(self):
+        call_command(
+            'seed_catalog', titles=5, reviews=12, comments=4,
+            stdout=StringIO(),
+        )
+        assert Title.objects.count() == 5
+        assert Review.objects.count() == 12
+        assert Comment.objects.count() == 4
+        assert sum(
+            Title.objects.values_list('rating_count', flat=True)
+        ) == 12, 'Проверьте, что seed_catalog пересчитывает рейтинги'
+        assert TitleRanking.objects.exists()
+
+    def test_against_baseline(self, catalog):
+        if connection.vendor != 'sqlite':
+            pytest.skip('Базовая линия записана на SQLite')
+        results = {}
+        for method, template, client, payload in cases(catalog):
+            results[f'{method} {template}'] = run_case(
+                catalog['clients'][client],
+                method,
+                template.format(**catalog),
+                payload,
+            )
+
+        if UPDATE_BASELINE:
+            for key, result in results.items():
+                print(key, result)
+            with open(BASELINE_PATH, 'w', encoding='utf-8') as file:
+                json.dump(
+                    {'scale': SCALE, 'routes': results},
+                    file,
+                    ensure_ascii=False,
+                    indent=2,
+                    sort_keys=True,
+                )
+                file.write('\n')
+            return
+        with open(BASELINE_PATH, encoding='utf-8') as file:
+            baseline = json.load(file)
+        if CHECK_LATENCY and baseline['scale'] != SCALE:
+            pytest.fail(
+                f'Задержки базовой линии записаны для {baseline["scale"]}'
+            )
+        found = []
+        for key, result in results.items():
+            found.extend(regressions(key, result, baseline))
+        assert not found, 'Регрессии производительности:\n' + '\n'.join(
+            found
+        )
@@ -0,0 +1,145 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Genre, Title
+
+
+def title_items(count, start=0):
+    return [
+        {
+            'name': f'Пакет {i}',
+            'year': 2000,
+            'genre': ['genre_1', 'genre_2'],
+            'category': 'films',
+        }
+        for i in range(start, start + count)
+    ]
+
+
+@pytest.mark.django_db
+class TestBulkWrite:
+
+    def test_create_titles(self, admin_client, genres, category):
+        response = admin_client.post(
+            '/api/v1/titles/bulk/', data=title_items(3), format='json'
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что пакетное создание произведений возвращает 201'
+        )
+        data = response.json()
+        assert [item['name'] for item in data] == [
+            'Пакет 0', 'Пакет 1', 'Пакет 2'
+        ]
+        assert data[0]['category']['slug'] == 'films'
+        assert {genre['slug'] for genre in data[0]['genre']} == {
+            'genre_1', 'genre_2'
+        }
+        assert Title.genre.through.objects.count() == 6
+
+    def test_constant_query_count(self, admin_client, genres, category):
+        counts = []
+        # The first request also caches the token version
+        for count, start in ((1, 0), (2, 1), (20, 10)):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(
+                    '/api/v1/titles/bulk/',
+                    data=title_items(count, start),
+                    format='json',
+                )
+            assert response.status_code == 201
+            counts.append(len(context.captured_queries))
+        assert counts[1] == counts[2], (
+            'Проверьте, что число запросов не зависит от размера пакета'
+        )
+
+    def test_errors_per_item(self, admin_client, title, genres):
+        items = title_items(3)
+        items[2]['year'] = 'год'
+        response = admin_client.post(
+            '/api/v1/titles/bulk/', data=items, format='json'
+        )
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[:2] == [{}, {}] and 'year' in errors[2], (
+            'Проверьте, что ошибки возвращаются для каждого элемента'
+        )
+
+        items = title_items(3)
+        items[0]['genre'] = ['unknown']
+        items[1]['name'], items[1]['year'] = title.name, title.year
+        response = admin_client.post(
+            '/api/v1/titles/bulk/', data=items, format='json'
+        )
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0]['genre'] and errors[2] == {}, (
+            'Проверьте, что slug жанров проверяются для всего пакета'
+        )
+        assert Title.objects.count() == 1, (
+            'Проверьте, что пакет с ошибками не записывается'
+        )
+
+        response = admin_client.post(
+            '/api/v1/titles/bulk/', data=title_items(3)[:2] * 2,
+            format='json'
+        )
+        errors = response.json()
+        assert errors[:2] == [{}, {}] and errors[2], (
+            'Проверьте, что повторы внутри пакета отклоняются'
+        )
+
+    def test_update_titles(self, admin_client, titles, genres):
+        response = admin_client.patch(
+            '/api/v1/titles/bulk/',
+            data=[
+                {'id': titles[0].id, 'name': 'Новое имя'},
+                {'id': titles[1].id, 'genre': ['genre_3']},
+            ],
+            format='json',
+        )
+        assert response.status_code == 200
+        titles[0].refresh_from_db()
+        assert titles[0].name == 'Новое имя'
+        assert list(
+            titles[1].genre.values_list('slug', flat=True)
+        ) == ['genre_3'], 'Проверьте, что жанры произведения заменяются'
+        assert titles[0].genre.count() == 3
+
+        response = admin_client.patch(
+            '/api/v1/titles/bulk/', data=[{'id': 0, 'name': 'Нет'}],
+            format='json'
+        )
+        assert response.status_code == 400
+
+    def test_genres_and_categories(self, admin_client, category):
+        response = admin_client.post(
+            '/api/v1/genres/bulk/',
+            data=[{'name': 'Драма', 'slug': 'drama'},
+                  {'name': 'Комедия', 'slug': 'comedy'}],
+            format='json',
+        )
+        assert response.status_code == 201
+        assert Genre.objects.count() == 2
+        response = admin_client.post(
+            '/api/v1/categories/bulk/',
+            data=[{'name': 'Книги', 'slug': 'books'},
+                  {'name': 'Фильм', 'slug': 'films'}],
+            format='json',
+        )
+        assert response.status_code == 400
+        assert response.json()[1]['slug'], (
+            'Проверьте, что занятый slug отклоняется'
+        )
+        response = admin_client.patch(
+            '/api/v1/categories/bulk/',
+            data=[{'name': 'Кино', 'slug': 'films'}],
+            format='json',
+        )
+        assert response.status_code == 200
+        assert Category.objects.get(slug='films').name == 'Кино'
+
+    def test_permissions(self, user_client, genres, category):
+        response = user_client.post(
+            '/api/v1/titles/bulk/', data=title_items(1), format='json'
+        )
+        assert response.status_code == 403
@@ -0,0 +1,90 @@
+import gzip
+import time
+
+import pytest
+from api import compression
+from api.compression import accepted_encodings, compress
+from django.test import RequestFactory
+from reviews.seeding import CatalogSeeder
+
+TITLES_URL = '/api/v1/titles/?limit=100'
+
+
+def requires_brotli(test):
+    return pytest.mark.skipif(
+        compression.brotli is None, reason='brotli is not installed'
+    )(test)
+
+
+@pytest.mark.django_db
+class TestCompression:
+
+    def test_gzip(self, client, titles):
+        plain = client.get(TITLES_URL)
+        response = client.get(TITLES_URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response['Vary']
+        assert int(response['Content-Length']) < len(plain.content) / 4
+        assert gzip.decompress(response.content) == plain.content
+
+    @requires_brotli
+    def test_brotli_is_preferred(self, client, titles):
+        plain = client.get(TITLES_URL)
+        response = client.get(TITLES_URL, HTTP_ACCEPT_ENCODING='gzip, br')
+        assert response['Content-Encoding'] == 'br'
+        assert compression.brotli.decompress(response.content) == (
+            plain.content
+        )
+
+    def test_small_responses_are_plain(self, client, settings, titles):
+        response = client.get(
+            '/api/v1/titles/?limit=1', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        assert len(response.content) < settings.COMPRESSION_MIN_SIZE
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что небольшие ответы не сжимаются'
+        )
+
+    def test_refused_encoding(self, client, monkeypatch, titles):
+        monkeypatch.setattr(compression, 'brotli', None)
+        response = client.get(
+            TITLES_URL, HTTP_ACCEPT_ENCODING='br, gzip;q=0'
+        )
+        assert not response.has_header('Content-Encoding')
+
+    def test_streamed_export(self, admin_client, titles):
+        response = admin_client.get(
+            '/api/v1/export/titles/', HTTP_ACCEPT_ENCODING='gzip, br'
+        )
+        assert response['Content-Encoding'] == 'gzip'
+        content = gzip.decompress(b''.join(response.streaming_content))
+        assert content.count(b'\n') == len(titles)
+
+    def test_accepted_encodings(self):
+        request = RequestFactory().get(
+            '/', HTTP_ACCEPT_ENCODING='gzip;q=0.5, BR, identity;q=0, x;q=a'
+        )
+        assert accepted_encodings(request) == {'gzip', 'br'}
+
+    def test_tradeoffs(self, client, settings, capsys):
+        """Size and time of compressing a page of seeded titles."""
+        CatalogSeeder(titles=100, reviews=0).run()
+        content = client.get(TITLES_URL).content
+        codecs = [('gzip', level) for level in (1, 6, 9)]
+        if compression.brotli is not None:
+            codecs += [('br', quality) for quality in (1, 5, 11)]
+        results = {}
+        for encoding, level in codecs:
+            settings.COMPRESSION_GZIP_LEVEL = level
+            settings.COMPRESSION_BROTLI_QUALITY = level
+            started = time.perf_counter()
+            for _ in range(20):
+                size = len(compress(content, encoding))
+            results[encoding, level] = (
+                size / len(content), (time.perf_counter() - started) * 50
+            )
+        with capsys.disabled():
+            print(f'\nCompressing {len(content)} bytes of JSON:')
+            for (encoding, level), (ratio, ms) in results.items():
+                print(f'  {encoding} {level:>2}: {ratio:.1%} in {ms:.2f} ms')
+        assert results['gzip', 6][0] < 0.5
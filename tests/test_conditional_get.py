@@ -0,0 +1,112 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Comment, Review
+
+
+def get(client, url, **extra):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, **extra)
+    return response, len(context.captured_queries)
+
+
+@pytest.fixture
+def review(title, user):
+    review = Review.objects.create(
+        title=title, author=user, text='Отзыв', score=7
+    )
+    Comment.objects.create(review=review, author=user, text='Комментарий')
+    return review
+
+
+@pytest.fixture
+def reviews_url(review):
+    return f'/api/v1/titles/{review.title_id}/reviews/'
+
+
+@pytest.fixture
+def comments_url(review, reviews_url):
+    return f'{reviews_url}{review.id}/comments/'
+
+
+# Write times are recorded on commit, so tests need real transactions
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+
+    @pytest.mark.parametrize('url', ['reviews_url', 'comments_url'])
+    def test_not_modified(self, client, request, url):
+        url = request.getfixturevalue(url)
+        first, queries = get(client, url)
+        assert first.status_code == 200
+        assert queries == 2, (
+            'Проверьте, что пагинация использует уже посчитанное число строк'
+        )
+
+        response, queries = get(client, url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == 304
+        assert queries == 1
+        assert response['ETag'] == first['ETag']
+
+        response, _ = get(
+            client, url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']
+        )
+        assert response.status_code == 304
+
+    def test_query_string_changes_etag(self, client, reviews_url):
+        first, _ = get(client, reviews_url)
+        response, _ = get(
+            client, reviews_url + '?limit=1', HTTP_IF_NONE_MATCH=first['ETag']
+        )
+        assert response.status_code == 200
+
+    def test_edit_changes_etag(self, client, review, reviews_url):
+        etag = get(client, reviews_url)[0]['ETag']
+        review.text = 'Исправлено'
+        review.save()
+
+        response, _ = get(client, reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['results'][0]['text'] == 'Исправлено'
+
+    def test_delete_without_signals_changes_etag(
+        self, client, review, comments_url
+    ):
+        etag = get(client, comments_url)[0]['ETag']
+        Comment.objects.filter(review=review).delete()
+
+        response, _ = get(client, comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что штамп учитывает число строк коллекции'
+        )
+
+    def test_author_rename_changes_etag(self, client, user, comments_url):
+        etag = get(client, comments_url)[0]['ETag']
+        user.username = 'renamed'
+        user.save()
+
+        response, _ = get(client, comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['results'][0]['author'] == 'renamed'
+
+    def test_deleted_review_is_gone(self, client, review, comments_url):
+        Comment.objects.filter(review=review).delete()
+        etag = get(client, comments_url)[0]['ETag']
+        review.delete()
+
+        response, _ = get(client, comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 404
+
+    def test_keyset_pages_are_not_counted(self, client, reviews_url):
+        response, queries = get(client, reviews_url + '?pagination=cursor')
+        assert response.status_code == 200
+        assert 'ETag' not in response
+        assert queries == 1
+
+    def test_compressed_etag_matches(self, client, titles):
+        first, _ = get(client, '/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip')
+        assert first['ETag'].startswith('W/"')
+
+        response, _ = get(
+            client, '/api/v1/titles/', HTTP_IF_NONE_MATCH=first['ETag']
+        )
+        assert response.status_code == 304
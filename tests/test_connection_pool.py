@@ -0,0 +1,119 @@
+import time
+
+import pytest
+from api_yamdb.postgresql_pool.base import DatabaseWrapper
+from api_yamdb.postgresql_pool.pool import PoolTimeout, close_pools
+from django.db import connection
+from django.db.backends.postgresql import base
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+CYCLES = 50
+
+
+def make_wrapper(wrapper_class, alias, **pool):
+    settings_dict = dict(
+        connection.settings_dict,
+        ENGINE='api_yamdb.postgresql_pool',
+        CONN_MAX_AGE=0,
+        POOL=dict({'CHECK_AFTER': 30, 'TIMEOUT': 1}, **pool),
+    )
+    return wrapper_class(settings_dict, alias=alias)
+
+
+def backend_pid(wrapper):
+    wrapper.ensure_connection()
+    pid = wrapper.connection.get_backend_pid()
+    wrapper.close()
+    return pid
+
+
+def request_cycles(wrapper):
+    """Seconds per request which connects, queries once and closes."""
+    started = time.perf_counter()
+    for _ in range(CYCLES):
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        wrapper.close()
+    return (time.perf_counter() - started) / CYCLES
+
+
+@pytest.fixture
+def pooled():
+    if connection.vendor != 'postgresql':
+        pytest.skip('Пул соединений работает только с PostgreSQL')
+    wrappers = []
+
+    def factory(**pool):
+        wrapper = make_wrapper(DatabaseWrapper, 'pooled', **pool)
+        wrappers.append(wrapper)
+        return wrapper
+
+    yield factory
+    for wrapper in wrappers:
+        wrapper.close()
+    close_pools(connection.settings_dict['NAME'])
+
+
+@pytest.mark.django_db
+class TestConnectionPool:
+
+    def test_connection_is_reused(self, pooled):
+        wrapper = pooled()
+        assert backend_pid(wrapper) == backend_pid(wrapper), (
+            'Проверьте, что закрытое соединение возвращается в пул'
+        )
+
+    def test_max_lifetime(self, pooled):
+        wrapper = pooled(MAX_LIFETIME=0)
+        assert backend_pid(wrapper) != backend_pid(wrapper), (
+            'Проверьте, что соединения старше MAX_LIFETIME закрываются'
+        )
+
+    def test_broken_connection_is_replaced(self, pooled):
+        wrapper = pooled(CHECK_AFTER=0)
+        pid = backend_pid(wrapper)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [pid])
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT pg_backend_pid()')
+            assert cursor.fetchone()[0] != pid, (
+                'Проверьте, что разорванное соединение не выдаётся из пула'
+            )
+
+    def test_open_transaction_is_rolled_back(self, pooled):
+        wrapper = pooled()
+        wrapper.ensure_connection()
+        pool = wrapper.get_pool(wrapper.get_connection_params())
+        wrapper.set_autocommit(False)
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        raw = wrapper.connection
+        wrapper.close()
+        assert raw.info.transaction_status == TRANSACTION_STATUS_IDLE
+        assert pool.get() is raw
+        pool.put(raw)
+
+    def test_exhausted_pool_times_out(self, pooled):
+        pool = {'MAX_SIZE': 1, 'TIMEOUT': 0.1}
+        pooled(**pool).ensure_connection()
+        other = make_wrapper(DatabaseWrapper, 'other', **pool)
+        with pytest.raises(PoolTimeout):
+            other.get_new_connection(other.get_connection_params())
+
+    def test_connect_overhead(self, pooled, capsys):
+        stock = make_wrapper(base.DatabaseWrapper, 'stock')
+        try:
+            unpooled = request_cycles(stock)
+        finally:
+            stock.close()
+        wrapper = pooled()
+        backend_pid(wrapper)
+        reused = request_cycles(wrapper)
+        with capsys.disabled():
+            print(
+                f'\nConnect per request: {unpooled * 1000:.2f} ms, '
+                f'from the pool: {reused * 1000:.2f} ms'
+            )
+        assert reused < unpooled, (
+            'Проверьте, что пул убирает затраты на подключение'
+        )
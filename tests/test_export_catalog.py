@@ -0,0 +1,74 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from reviews.exporting import export
+from reviews.models import Comment, Review
+
+
+@pytest.fixture
+def review(title, user):
+    return Review.objects.create(
+        title=title, author=user, text='Отзыв', score=7
+    )
+
+
+@pytest.mark.django_db
+class TestExportCatalog:
+
+    def test_titles_jsonl(self, titles, title):
+        out = StringIO()
+        call_command('export_catalog', 'titles', stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert [row['id'] for row in rows] == sorted(
+            item.id for item in titles + [title]
+        ), 'Проверьте, что выгружаются все произведения по порядку id'
+        assert rows[-1]['genre'] == ['genre_1', 'genre_2'], (
+            'Проверьте, что произведения выгружаются со slug жанров'
+        )
+        assert rows[0]['genre'] == ['genre_1', 'genre_2', 'genre_3']
+        assert rows[0]['category'] == 'films'
+
+    def test_query_count(self, titles, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            pieces = list(export('titles', 'jsonl', chunk_size=7))
+        assert pieces, (
+            'Проверьте, что число запросов не зависит от числа произведений'
+        )
+
+    def test_reviews_csv(self, review, tmp_path):
+        Comment.objects.create(review=review, author=review.author, text='Да')
+        path = tmp_path / 'reviews.csv'
+        call_command(
+            'export_catalog', 'reviews', format='csv', output=str(path),
+            stdout=StringIO()
+        )
+        with open(path, encoding='utf-8', newline='') as file:
+            rows = list(csv.DictReader(file))
+        assert len(rows) == 1
+        assert rows[0]['author'] == review.author.username
+        assert rows[0]['score'] == '7'
+        out = StringIO()
+        call_command('export_catalog', 'comments', stdout=out)
+        assert json.loads(out.getvalue())['review_id'] == review.id
+
+    def test_endpoint(self, admin_client, user_client, title):
+        response = admin_client.get('/api/v1/export/titles/?output=csv')
+        assert response.status_code == 200
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоком'
+        )
+        assert response['Content-Type'] == 'text/csv'
+        content = b''.join(response.streaming_content).decode()
+        assert content.splitlines()[1].startswith(f'{title.id},Чужой,1979')
+
+        response = user_client.get('/api/v1/export/titles/')
+        assert response.status_code == 403, (
+            'Проверьте, что выгрузка доступна только администратору'
+        )
+        response = admin_client.get('/api/v1/export/users/')
+        assert response.status_code == 404
+        response = admin_client.get('/api/v1/export/titles/?output=xml')
+        assert response.status_code == 400
@@ -0,0 +1,154 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from api import parsers, renderers
+from api.renderers import FastJSONRenderer
+from api.v1 import views
+from api.v1.serializers import CreateTitleSerializer, ReadTitleSerializer
+from api.v1.values import get_values_reader
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext_lazy
+from reviews.models import Comment, Review, Title
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+ENCODERS = [
+    'stdlib',
+    pytest.param('orjson', marks=pytest.mark.skipif(
+        renderers.orjson is None, reason='orjson is not installed'
+    )),
+]
+
+
+@pytest.fixture(params=ENCODERS)
+def encoder(request, monkeypatch):
+    if request.param == 'stdlib':
+        monkeypatch.setattr(renderers, 'orjson', None)
+        monkeypatch.setattr(parsers, 'orjson', None)
+    return request.param
+
+
+@pytest.fixture
+def catalog(titles, genres, user, admin):
+    Title.objects.create(
+        name='Без категории', year=2001,
+        description='Строка\u2028другая «кавычки» "и" \\ слеш',
+    )
+    titles[0].genre.set(genres[:1])
+    titles[1].genre.clear()
+    for number, title in enumerate(titles[:3]):
+        review = Review.objects.create(
+            title=title, author=user, text=f'Отзыв {number}', score=number + 5
+        )
+        Review.objects.create(
+            title=title, author=admin, text='Отзыв\u2029', score=10
+        )
+        Comment.objects.create(review=review, author=admin, text='Ответ')
+    return titles
+
+
+def get(client, url):
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response.content, len(context.captured_queries)
+
+
+@pytest.mark.django_db
+class TestFastReads:
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/?limit=100',
+        '/api/v1/titles/?ordering=-year&offset=3',
+        '/api/v1/titles/?fields=id,name,rating,genre.slug',
+        '/api/v1/titles/?omit=genre,description&year=1951',
+        '/api/v1/titles/?q=Произведение',
+        '/api/v1/titles/?pagination=cursor&limit=7',
+        '/api/v1/titles/{title}/reviews/',
+        '/api/v1/titles/{title}/reviews/?pagination=cursor&limit=1',
+        '/api/v1/titles/{title}/reviews/?fields=author,score',
+        '/api/v1/titles/{title}/reviews/{review}/comments/',
+    ])
+    def test_same_bytes(self, client, catalog, encoder, monkeypatch, url):
+        review = Review.objects.filter(title=catalog[0]).first()
+        url = url.format(title=catalog[0].id, review=review.id)
+        fast, fast_queries = get(client, url)
+
+        monkeypatch.setattr(renderers, 'orjson', None)
+        monkeypatch.setattr(views, 'get_values_reader', lambda _: None)
+        expected, queries = get(client, url)
+
+        assert fast == expected, (
+            'Проверьте, что быстрый путь отдаёт те же байты, что и сериализатор'
+        )
+        assert fast_queries <= queries
+
+    def test_empty_nested_page(self, client, title, encoder):
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.json()['results'] == []
+        assert client.get('/api/v1/titles/0/reviews/').status_code == 404
+
+    def test_unsupported_serializer(self):
+        assert get_values_reader(CreateTitleSerializer()) is None, (
+            'Проверьте, что поля не из столбцов читаются сериализатором'
+        )
+        assert get_values_reader(ReadTitleSerializer()) is not None
+
+    def test_reader_per_selection(self, rf):
+        def reader(query=''):
+            request = Request(rf.get(f'/api/v1/titles/{query}'))
+            return get_values_reader(
+                ReadTitleSerializer(context={'request': request})
+            )
+
+        assert reader() is reader(), (
+            'Проверьте, что читатель строится один раз для сериализатора'
+        )
+        assert reader('?fields=id,name') is reader('?fields=name,id')
+        assert reader('?fields=id').lookups == ['id']
+
+    def test_parser(self, user_client, title, encoder):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response = user_client.post(
+            url, data='{"text": "Отзыв\\u2028текст", "score": 7}',
+            content_type='application/json',
+        )
+        assert response.status_code == 201
+        assert Review.objects.get().text == 'Отзыв\u2028текст'
+
+        response = user_client.post(
+            url, data='{"text": NaN}', content_type='application/json'
+        )
+        assert response.status_code == 400
+        assert response.json()['detail'].startswith('JSON parse error - ')
+
+
+class TestFastJSONRenderer:
+
+    def test_same_bytes_as_drf(self, encoder):
+        data = {
+            'date': datetime(2022, 5, 1, 10, 30, 1, 123456, timezone.utc),
+            'decimal': Decimal('1.50'),
+            'lazy': gettext_lazy('Отзыв'),
+            'separators': 'a\u2028b\u2029c',
+            'numbers': [1, 2.5, 1 / 3, None, True],
+            'big': 2 ** 70,
+            1: 'int key',
+        }
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    @pytest.mark.parametrize('value', [
+        1e-7, -1e-5, 1e-4, 1e16, 1.5e300, -0.0, 2 / 3, Decimal('1E-7'),
+    ])
+    def test_same_floats_as_drf(self, encoder, value):
+        data = {'score': value, 'scores': [{'mean': value}]}
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    @pytest.mark.parametrize('value', [float('nan'), float('inf')])
+    def test_nan_is_refused(self, encoder, value):
+        with pytest.raises(ValueError):
+            FastJSONRenderer().render({'score': value})
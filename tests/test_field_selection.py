@@ -0,0 +1,130 @@
+from io import StringIO
+
+import pytest
+from api.v1.projection import FieldSelection
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Review
+
+
+def get_with_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response.json(), [query['sql'] for query in context.captured_queries]
+
+
+class TestFieldSelection:
+
+    def test_fields(self):
+        selection = FieldSelection(fields={'name', 'category.slug'})
+        assert selection.is_selected('name')
+        assert not selection.is_selected('year')
+        assert selection.is_selected('category')
+        assert selection.is_selected('category.slug')
+        assert not selection.is_selected('category.name')
+
+    def test_whole_nested_field(self):
+        selection = FieldSelection(fields={'title'})
+        assert selection.is_selected('title.category.slug')
+        assert not selection.is_selected('position')
+
+    def test_omit_and_expand(self):
+        selection = FieldSelection(omit={'genre'}, expand={'review_count'})
+        assert selection.is_selected('name')
+        assert not selection.is_selected('genre.slug')
+        assert selection.is_selected('review_count', optional=True)
+        assert not selection.is_selected('comment_count', optional=True)
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+
+    def test_narrow_title_list(self, client, titles):
+        data, queries = get_with_queries(
+            client, '/api/v1/titles/?fields=id,name,rating'
+        )
+        assert data['results'][0] == {
+            'id': titles[0].id, 'name': titles[0].name, 'rating': None
+        }
+        assert len(queries) == 2, (
+            'Проверьте, что жанры не подгружаются, если они не запрошены'
+        )
+        assert 'description' not in queries[-1], (
+            'Проверьте, что незапрошенные столбцы не читаются из базы'
+        )
+        assert 'reviews_category' not in queries[-1]
+
+    def test_omit(self, client, titles):
+        data, queries = get_with_queries(
+            client, '/api/v1/titles/?omit=description,genre'
+        )
+        assert set(data['results'][0]) == {
+            'id', 'name', 'year', 'rating', 'category'
+        }
+        assert not any('reviews_genre' in query for query in queries)
+        assert 'description' not in queries[-1]
+
+    def test_nested_fields(self, client, titles):
+        data, queries = get_with_queries(
+            client,
+            f'/api/v1/titles/{titles[0].id}/?fields=name,category.slug',
+        )
+        assert data == {
+            'name': titles[0].name, 'category': {'slug': 'films'}
+        }
+        assert '"reviews_category"."name"' not in queries[-1]
+
+    def test_default_response_is_complete(self, client, titles):
+        data, _ = get_with_queries(client, f'/api/v1/titles/{titles[0].id}/')
+        assert set(data) == {
+            'id', 'name', 'year', 'rating', 'description', 'genre', 'category'
+        }
+
+    def test_reviews(self, client, title, user):
+        Review.objects.create(title=title, author=user, text='Текст', score=8)
+        data, queries = get_with_queries(
+            client, f'/api/v1/titles/{title.id}/reviews/?omit=text,author'
+        )
+        assert set(data['results'][0]) == {'id', 'score', 'pub_date'}
+        assert not any('users_user' in query for query in queries), (
+            'Проверьте, что автор не подгружается, если он не запрошен'
+        )
+        assert '"text"' not in queries[-1]
+
+    def test_leaderboard(self, client, title, user):
+        Review.objects.create(title=title, author=user, text='Текст', score=8)
+        call_command(
+            'rebuild_leaderboards', stdout=StringIO(), min_reviews=1
+        )
+        data, queries = get_with_queries(
+            client, '/api/v1/leaderboards/top/?fields=position,title.name'
+        )
+        assert data['results'] == [
+            {'position': 1, 'title': {'name': title.name}}
+        ]
+        assert len(queries) == 2
+        assert 'reviews_category' not in queries[-1]
+        assert '"reviews_title"."description"' not in queries[-1]
+
+    def test_expand(self, user_client, user):
+        data, _ = get_with_queries(
+            user_client, '/api/v1/users/me/?expand=review_count'
+        )
+        assert data['review_count'] == 0
+        assert 'email' in data and 'comment_count' not in data
+
+    def test_writes_load_whole_objects(self, user_client, title, user):
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=8
+        )
+        response = user_client.patch(
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/?fields=score',
+            data={'score': 3},
+        )
+        assert response.status_code == 200
+        assert response.json() == {'score': 3}
+        review.refresh_from_db()
+        assert (review.text, review.score) == ('Текст', 3)
+        assert type(user).objects.get(pk=user.pk).average_score == 3.0
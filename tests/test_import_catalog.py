@@ -0,0 +1,142 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+
+def write(path, text):
+    path.write_text(text, encoding='utf-8')
+
+
+@pytest.fixture
+def catalog_dir(tmp_path):
+    write(tmp_path / 'users.csv', (
+        'id,username,email,role,bio,first_name,last_name\n'
+        '100,reader,reader@yamdb.fake,user,,,\n'
+        '101,boss,boss@yamdb.fake,admin,Начальник,,\n'
+    ))
+    write(tmp_path / 'category.csv', (
+        'id,name,slug\n'
+        '1,Книги,books\n'
+        '2,Фильмы,movie\n'
+    ))
+    write(tmp_path / 'genre.jsonl', (
+        '{"id": 1, "name": "Драма", "slug": "drama"}\n'
+        '\n'
+        '{"name": "Комедия", "slug": "comedy"}\n'
+    ))
+    write(tmp_path / 'titles.csv', (
+        'id,name,year,category\n'
+        '10,Мизери,1987,books\n'
+        '11,Побег из Шоушенка,1994,2\n'
+        '12,Без категории,2000,\n'
+    ))
+    write(tmp_path / 'genre_title.csv', (
+        'id,title_id,genre_id\n'
+        '1,10,drama\n'
+        '2,11,drama\n'
+        '3,11,comedy\n'
+    ))
+    write(tmp_path / 'review.csv', (
+        'id,title_id,text,author,score,pub_date\n'
+        '1,10,Страшно,reader,8,2019-09-24T21:08:21.567Z\n'
+        '2,10,Жутко,101,6,2019-09-25T21:08:21.567Z\n'
+        '3,11,Отлично,reader,10,\n'
+    ))
+    lines = [
+        {'id': 1, 'review_id': 1, 'text': 'Согласен', 'author': 'boss',
+         'pub_date': '2019-09-26T10:00:00Z'},
+        {'review': 3, 'text': 'Да', 'author': 'reader'},
+    ]
+    write(tmp_path / 'comments.jsonl', '\n'.join(map(json.dumps, lines)))
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestImportCatalog:
+
+    def test_import(self, catalog_dir):
+        out = StringIO()
+        call_command(
+            'import_catalog', str(catalog_dir), batch_size=2, stdout=out
+        )
+        assert User.objects.count() == 2
+        assert Category.objects.count() == 2
+        assert Genre.objects.count() == 2
+        assert Title.objects.count() == 3
+        assert Review.objects.count() == 3
+        assert Comment.objects.count() == 2
+        assert 'rows/s' in out.getvalue(), (
+            'Проверьте, что команда сообщает скорость импорта'
+        )
+
+        boss = User.objects.get(username='boss')
+        assert boss.id == 101 and boss.is_staff and boss.bio == 'Начальник'
+        assert not boss.has_usable_password()
+        assert Title.objects.get(id=10).category.slug == 'books'
+        assert Title.objects.get(id=11).category.slug == 'movie'
+        assert Title.objects.get(id=12).category is None
+        assert set(
+            Title.objects.get(id=11).genre.values_list('slug', flat=True)
+        ) == {'drama', 'comedy'}, (
+            'Проверьте, что жанры произведений связываются по slug'
+        )
+        review = Review.objects.get(id=1)
+        assert review.author.username == 'reader'
+        assert review.pub_date.isoformat().startswith('2019-09-24T21:08'), (
+            'Проверьте, что дата публикации сохраняется из файла'
+        )
+        assert Comment.objects.get(text='Да').review_id == 3
+
+    def test_derived_data(self, catalog_dir):
+        call_command('import_catalog', str(catalog_dir), stdout=StringIO())
+        title = Title.objects.get(id=10)
+        assert (title.rating_sum, title.rating_count) == (14, 2)
+        assert title.rating == 7, (
+            'Проверьте, что рейтинг пересчитывается после импорта'
+        )
+        assert Title.objects.get(id=12).rating is None
+        # Sequences continue after imported ids
+        Category.objects.create(name='Музыка', slug='music')
+
+    def test_unknown_reference(self, catalog_dir):
+        write(catalog_dir / 'review.csv', (
+            'title_id,text,author,score\n'
+            '10,Текст,nobody,5\n'
+        ))
+        with pytest.raises(CommandError, match='review.csv:2'):
+            call_command(
+                'import_catalog', str(catalog_dir), stdout=StringIO()
+            )
+        assert not Title.objects.exists(), (
+            'Проверьте, что импорт выполняется в одной транзакции'
+        )
+
+    def test_ignore_conflicts(self, catalog_dir):
+        call_command('import_catalog', str(catalog_dir), stdout=StringIO())
+        for path in catalog_dir.iterdir():
+            if path.stem not in ('category', 'genre'):
+                path.unlink()
+        call_command(
+            'import_catalog', str(catalog_dir), ignore_conflicts=True,
+            stdout=StringIO()
+        )
+        assert Category.objects.count() == 2
+
+    def test_copy(self, catalog_dir):
+        if connection.vendor != 'postgresql':
+            with pytest.raises(CommandError):
+                call_command(
+                    'import_catalog', str(catalog_dir), copy=True,
+                    stdout=StringIO()
+                )
+            return
+        call_command(
+            'import_catalog', str(catalog_dir), copy=True, stdout=StringIO()
+        )
+        assert Comment.objects.count() == 2
+        assert Title.objects.get(id=10).rating == 7
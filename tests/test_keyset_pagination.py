@@ -0,0 +1,96 @@
+import json
+from base64 import b64encode
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Review
+
+
+def collect_pages(client, url):
+    pages = []
+    while url:
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200, response.content
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), 'Курсорная пагинация не должна выполнять COUNT(*)'
+        pages.append(response.json())
+        url = pages[-1]['next']
+    return pages
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_titles_cursor_walk(self, client, titles):
+        expected = [
+            item['id'] for item in
+            client.get('/api/v1/titles/?limit=100').json()['results']
+        ]
+        pages = collect_pages(
+            client, '/api/v1/titles/?pagination=cursor&limit=7'
+        )
+
+        assert [len(page['results']) for page in pages] == [7, 7, 7, 7, 2]
+        assert [
+            item['id'] for page in pages for item in page['results']
+        ] == expected
+        assert pages[0]['previous'] is None
+        assert 'count' not in pages[0]
+
+        previous = client.get(pages[-1]['previous']).json()
+        assert previous['results'] == pages[-2]['results']
+
+    def test_reviews_cursor_walk(self, client, title, django_user_model):
+        for i in range(12):
+            author = django_user_model.objects.create_user(
+                username=f'reviewer{i}', email=f'reviewer{i}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text=f'Отзыв {i}', score=5
+            )
+        pages = collect_pages(
+            client,
+            f'/api/v1/titles/{title.id}/reviews/?pagination=cursor&limit=5'
+        )
+
+        texts = [item['text'] for page in pages for item in page['results']]
+        assert texts == [f'Отзыв {i}' for i in range(12)]
+
+    def test_limit_offset_is_default(self, client, titles):
+        response = client.get('/api/v1/titles/?limit=5&offset=5')
+
+        assert response.json()['count'] == len(titles)
+
+    def test_invalid_cursor(self, client, titles):
+        response = client.get('/api/v1/titles/?cursor=broken')
+
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize('url, position', [
+        ('/api/v1/titles/', ['a', None]),
+        ('/api/v1/titles/', [['x'], {}]),
+        ('/api/v1/titles/', ['a', 'abc']),
+        ('/api/v1/titles/{title}/reviews/', ['zz', 'abc']),
+        ('/api/v1/titles/{title}/reviews/', ['bad-date', 1]),
+        ('/api/v1/titles/{title}/reviews/', ['2020-01-01T00:00:00', 'x']),
+    ])
+    def test_invalid_cursor_position(self, client, title, url, position):
+        cursor = b64encode(json.dumps({'p': position}).encode()).decode()
+        response = client.get(
+            url.format(title=title.id), data={'cursor': cursor}
+        )
+
+        assert response.status_code == 404, (
+            'Проверьте, что курсор с неверной позицией отклоняется'
+        )
+
+    def test_ordering_is_rejected(self, client, titles):
+        response = client.get(
+            '/api/v1/titles/?pagination=cursor&ordering=-year'
+        )
+
+        assert response.status_code == 400
+        assert 'ordering' in response.json()
@@ -0,0 +1,99 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from reviews.models import Genre, Review, TitleRanking
+
+
+@pytest.fixture
+def reviewers(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=f'critic{i}', email=f'critic{i}@yamdb.fake'
+        )
+        for i in range(4)
+    ]
+
+
+def review(title, author, score, days_ago=0):
+    item = Review.objects.create(
+        title=title, author=author, text='Текст', score=score
+    )
+    if days_ago:
+        Review.objects.filter(pk=item.pk).update(
+            pub_date=timezone.now() - timedelta(days=days_ago)
+        )
+    return item
+
+
+def rebuild(**options):
+    call_command('rebuild_leaderboards', stdout=StringIO(), **options)
+
+
+@pytest.mark.django_db
+class TestLeaderboards:
+
+    def test_top_is_bayesian(self, titles, reviewers):
+        # One perfect score loses to many high ones
+        review(titles[0], reviewers[0], 10)
+        for reviewer in reviewers:
+            review(titles[1], reviewer, 9)
+            review(titles[2], reviewer, 2)
+        rebuild(min_reviews=1)
+
+        top = list(
+            TitleRanking.objects.filter(board='top', scope='all')
+            .order_by('position')
+            .values_list('title_id', flat=True)
+        )
+        assert top == [titles[1].id, titles[0].id, titles[2].id], (
+            'Проверьте, что оценка в рейтинге учитывает число отзывов'
+        )
+        rebuild(min_reviews=2)
+        assert not TitleRanking.objects.filter(
+            board='top', title=titles[0]
+        ).exists(), 'Проверьте минимальное число отзывов'
+
+    def test_trending(self, titles, reviewers):
+        for reviewer in reviewers:
+            review(titles[3], reviewer, 5, days_ago=30)
+        review(titles[4], reviewers[0], 5)
+        review(titles[4], reviewers[1], 5)
+        review(titles[5], reviewers[2], 5)
+        rebuild(trending_days=7)
+
+        trending = list(
+            TitleRanking.objects.filter(board='trending', scope='all')
+            .order_by('position')
+            .values_list('title_id', 'score')
+        )
+        assert trending == [(titles[4].id, 2), (titles[5].id, 1)], (
+            'Проверьте, что популярность считается по отзывам за период'
+        )
+
+    def test_endpoint(self, client, titles, reviewers,
+                      django_assert_num_queries):
+        other = Genre.objects.create(name='Другой', slug='other')
+        titles[1].genre.set([other])
+        review(titles[0], reviewers[0], 8)
+        review(titles[1], reviewers[0], 9)
+        rebuild(min_reviews=1)
+
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/leaderboards/top/')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [item['position'] for item in results] == [1, 2]
+        assert results[0]['title']['id'] == titles[1].id
+        assert results[0]['title']['genre'][0]['slug'] == 'other'
+
+        response = client.get('/api/v1/leaderboards/top/?genre=other')
+        assert [
+            item['title']['id'] for item in response.json()['results']
+        ] == [titles[1].id]
+        response = client.get('/api/v1/leaderboards/top/?category=films')
+        assert response.json()['count'] == 2
+        response = client.get('/api/v1/leaderboards/worst/')
+        assert response.status_code == 404
@@ -0,0 +1,103 @@
+import pytest
+from api.v1.permissions import ReviewCommentPermission
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Comment, Review
+from rest_framework.test import APIRequestFactory
+from users.authentication import ClaimsUser
+from users.tokens import RoleAccessToken
+
+
+@pytest.fixture
+def review(title, user):
+    return Review.objects.create(
+        title=title, author=user, text='Отзыв', score=7
+    )
+
+
+@pytest.fixture
+def comment(review, user):
+    return Comment.objects.create(
+        review=review, author=user, text='Комментарий'
+    )
+
+
+def claims_user(user):
+    return ClaimsUser(RoleAccessToken.for_user(user))
+
+
+def author_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT "users_user"."id"')
+    ]
+
+
+@pytest.mark.django_db
+class TestPermissions:
+
+    @pytest.mark.parametrize('method', ['PATCH', 'DELETE'])
+    def test_object_permission_skips_author(
+        self, review, user, moderator, admin, method
+    ):
+        obj = Review.objects.get(pk=review.pk)
+        request = APIRequestFactory().generic(method, '/')
+        permission = ReviewCommentPermission()
+        with CaptureQueriesContext(connection) as context:
+            for request.user in (
+                user,
+                claims_user(user),
+                claims_user(moderator),
+                claims_user(admin),
+            ):
+                assert permission.has_object_permission(request, None, obj)
+        assert not context.captured_queries, (
+            'Проверьте, что права проверяются без загрузки автора'
+        )
+
+    def test_stranger_is_denied(self, review, django_user_model):
+        stranger = django_user_model.objects.create_user(
+            username='stranger', email='stranger@yamdb.fake'
+        )
+        request = APIRequestFactory().patch('/')
+        request.user = claims_user(stranger)
+        assert not ReviewCommentPermission().has_object_permission(
+            request, None, Review.objects.get(pk=review.pk)
+        )
+
+    def test_role_checks_are_computed_once(self, moderator):
+        assert moderator.is_moderator and not moderator.is_admin
+        moderator.role = moderator.USER
+        moderator.is_staff = True
+        assert moderator.is_moderator and not moderator.is_admin, (
+            'Проверьте, что роль вычисляется один раз'
+        )
+        moderator.save()
+        assert moderator.is_admin, (
+            'Проверьте, что сохранение пользователя сбрасывает роль'
+        )
+
+    def test_owner_edits(self, shared_cache, review, comment, user_client):
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        for path in ('', f'comments/{comment.id}/'):
+            with CaptureQueriesContext(connection) as context:
+                response = user_client.patch(
+                    url + path, data={'text': 'Исправлено'}
+                )
+            assert response.status_code == 200
+            assert response.json()['author'] == 'TestUser'
+            assert not author_queries(context), (
+                'Проверьте, что автор не загружается отдельным запросом'
+            )
+
+    def test_moderator_deletes(
+        self, shared_cache, review, comment, moderator_client
+    ):
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        for path in (f'comments/{comment.id}/', ''):
+            with CaptureQueriesContext(connection) as context:
+                response = moderator_client.delete(url + path)
+            assert response.status_code == 204
+            assert not author_queries(context), (
+                'Проверьте, что автор не загружается при удалении'
+            )
@@ -0,0 +1,127 @@
+import contextvars
+import pstats
+import re
+import threading
+
+import pytest
+from api.profiling import (
+    MetricsRegistry,
+    RequestProfile,
+    current_profile,
+    metrics,
+)
+from django.db import connection
+from django.test import override_settings
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics.clear()
+    yield
+    metrics.clear()
+
+
+def timings(response):
+    return dict(
+        re.findall(r'(\w+);dur=([\d.]+)', response['Server-Timing'])
+    )
+
+
+@pytest.mark.django_db
+class TestProfiling:
+
+    def test_disabled_by_default(self, client, titles):
+        response = client.get('/api/v1/titles/')
+        assert 'Server-Timing' not in response
+
+    @override_settings(API_PROFILING=True)
+    def test_server_timing(self, client, titles):
+        response = client.get('/api/v1/titles/')
+        header = response['Server-Timing']
+        assert 'view;desc="TitleViewSet.list"' in header, (
+            'Проверьте, что в Server-Timing указаны view и action'
+        )
+        assert re.search(r'db;dur=[\d.]+;desc="[1-9]\d* queries"', header)
+        values = timings(response)
+        assert set(values) == {'db', 'serializer', 'render', 'total'}
+        assert float(values['serializer']) > 0
+        assert float(values['render']) > 0
+
+        response = client.get(f'/api/v1/titles/{titles[0].id}/stats/')
+        assert 'TitleViewSet.stats' in response['Server-Timing']
+
+    @override_settings(API_PROFILING=True)
+    def test_metrics(self, client, admin_client, user_client, titles):
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/0/')
+        exported = admin_client.get('/api/v1/export/titles/')
+        b''.join(exported.streaming_content)
+
+        response = user_client.get('/api/v1/_metrics')
+        assert response.status_code == 403
+        response = admin_client.get('/api/v1/_metrics')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        assert (
+            'yamdb_requests_total{view="TitleViewSet",action="list",'
+            'method="GET",status="200"} 2'
+        ) in text, 'Проверьте, что запросы считаются по view и action'
+        assert (
+            'yamdb_requests_total{view="TitleViewSet",action="retrieve",'
+            'method="GET",status="404"} 1'
+        ) in text
+        assert '# TYPE yamdb_db_queries_total counter' in text
+        exported = re.search(
+            r'yamdb_response_bytes_total\{view="ExportView",[^}]*\} (\d+)',
+            text,
+        )
+        assert exported and int(exported.group(1)) > 0, (
+            'Проверьте, что размер потоковых ответов учитывается'
+        )
+
+    @override_settings(API_PROFILING=True)
+    def test_metrics_shared_by_workers(self, shared_cache, client, titles):
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        worker = MetricsRegistry()
+        assert (
+            'yamdb_requests_total{view="TitleViewSet",action="list",'
+            'method="GET",status="200"} 2'
+        ) in worker.render(), (
+            'Проверьте, что счётчики хранятся в общем кэше'
+        )
+
+    def test_queries_of_other_threads(self):
+        def query():
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+            finally:
+                connection.close()
+
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        try:
+            thread = threading.Thread(
+                target=contextvars.copy_context().run, args=(query,)
+            )
+            thread.start()
+            thread.join()
+        finally:
+            current_profile.reset(token)
+        assert profile.queries == 1, (
+            'Проверьте, что считаются запросы соединений других потоков'
+        )
+
+    def test_cprofile_dumps(self, client, titles, tmp_path):
+        with override_settings(
+            API_PROFILING=True,
+            API_PROFILING_DUMP_DIR=str(tmp_path),
+            API_PROFILING_SAMPLE_RATE=1,
+        ):
+            client.get('/api/v1/titles/')
+        dumps = list(tmp_path.glob('*TitleViewSet.list*.prof'))
+        assert len(dumps) == 1, 'Проверьте, что профиль запроса сохранён'
+        assert pstats.Stats(str(dumps[0])).total_calls > 0
@@ -0,0 +1,82 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Comment, Review, Title
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, response.content
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db
+class TestQueryCount:
+
+    @pytest.mark.parametrize('limit', [1, 5, 30])
+    def test_titles_list(self, client, titles, limit):
+        queries = count_queries(client, f'/api/v1/titles/?limit={limit}')
+        assert queries == 3, (
+            'Страница произведений должна загружаться за постоянное число '
+            f'запросов, получено {queries} при limit={limit}'
+        )
+
+    def test_title_retrieve(self, client, title):
+        assert count_queries(client, f'/api/v1/titles/{title.id}/') == 2
+
+    @pytest.mark.parametrize('limit', [1, 10])
+    def test_reviews_list(self, client, titles, django_user_model, limit):
+        title = titles[0]
+        for i in range(10):
+            author = django_user_model.objects.create_user(
+                username=f'reviewer{i}', email=f'reviewer{i}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=5
+            )
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                f'/api/v1/titles/{title.id}/reviews/?limit={limit}'
+            )
+        assert response.status_code == 200
+        assert len(context.captured_queries) == 2, (
+            'Страница отзывов должна загружаться двумя запросами: '
+            'подсчёт и сама страница'
+        )
+        page_sql = context.captured_queries[-1]['sql']
+        assert 'users_user' in page_sql, (
+            'Проверьте, что авторы загружаются в том же запросе'
+        )
+        assert 'confirmation_code' not in page_sql, (
+            'Проверьте, что загружаются только нужные столбцы'
+        )
+        assert count_queries(
+            client, f'/api/v1/titles/{title.id}/reviews/?pagination=cursor'
+        ) == 1
+
+    def test_empty_reviews_list(self, client, title):
+        queries = count_queries(client, f'/api/v1/titles/{title.id}/reviews/')
+        assert queries == 2, (
+            'Для пустой страницы должно проверяться существование произведения'
+        )
+        response = client.get(f'/api/v1/titles/{title.id + 1}/reviews/')
+        assert response.status_code == 404
+
+    def test_comments_list(self, client, title, user):
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=5
+        )
+        for i in range(5):
+            Comment.objects.create(review=review, author=user, text='Да')
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        assert count_queries(client, url) == 2
+        Comment.objects.all().delete()
+        assert count_queries(client, url) == 2
+        other = Title.objects.create(name='Другое', year=2000)
+        response = client.get(
+            f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/'
+        )
+        assert response.status_code == 404, (
+            'Проверьте, что отзыв другого произведения не найден'
+        )
@@ -0,0 +1,86 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Comment, Review
+
+# Plan lines reading a whole table instead of an index
+FULL_SCANS = {
+    'sqlite': re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$'),
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+}
+# Looked up by substring in their own small tables, see TitleFilter
+SCANNED_TABLES = {'reviews_category', 'reviews_genre'}
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return [row[-1] for row in cursor.fetchall()]
+        # Tiny test tables are cheaper to scan, ask for an index anyway
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute('EXPLAIN ' + sql)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def full_scans(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, url
+    pattern = FULL_SCANS[connection.vendor]
+    scans = []
+    for query in context.captured_queries:
+        if not query['sql'].startswith('SELECT'):
+            continue
+        for line in explain(query['sql']):
+            match = pattern.search(line.strip())
+            if match and match.group(1) not in SCANNED_TABLES:
+                scans.append((query['sql'], line))
+    return scans
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+
+    @pytest.fixture
+    def comment(self, titles, user):
+        review = Review.objects.create(
+            title=titles[0], author=user, text='Текст', score=5
+        )
+        return Comment.objects.create(review=review, author=user, text='Да')
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/',
+        '/api/v1/titles/?year=1960',
+        '/api/v1/titles/?category=films',
+        '/api/v1/titles/?genre=genre_1',
+        '/api/v1/titles/?search=Произведение 01',
+        '/api/v1/genres/',
+        '/api/v1/genres/?search=Жанр 1',
+        '/api/v1/categories/?search=Фильм',
+    ])
+    def test_catalog(self, user_client, titles, url):
+        if connection.vendor not in FULL_SCANS:
+            pytest.skip('План запроса проверяется только для SQLite и PG')
+        assert full_scans(user_client, url) == [], (
+            f'Проверьте, что запросы {url} используют индексы'
+        )
+
+    def test_reviews_and_comments(self, user_client, comment):
+        if connection.vendor not in FULL_SCANS:
+            pytest.skip('План запроса проверяется только для SQLite и PG')
+        review = comment.review
+        urls = [
+            f'/api/v1/titles/{review.title_id}/',
+            f'/api/v1/titles/{review.title_id}/stats/',
+            f'/api/v1/titles/{review.title_id}/reviews/',
+            f'/api/v1/titles/{review.title_id}/reviews/?pagination=cursor',
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+            f'comments/',
+        ]
+        for url in urls:
+            assert full_scans(user_client, url) == [], (
+                f'Проверьте, что запросы {url} используют индексы'
+            )
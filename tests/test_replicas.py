@@ -0,0 +1,139 @@
+import sqlite3
+import threading
+
+import pytest
+from api.replicas import ReplicaRouter, reading_from_replica, replica_reads
+from api.v1.async_reads import async_read_view
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, connections, transaction
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory
+from reviews.models import Review, Title
+
+
+@pytest.fixture
+def replicate(tmp_path, settings):
+    """
+    Second SQLite file standing in for a replica of the test database.
+    Calling the fixture copies the primary there.
+    """
+    if connection.vendor != 'sqlite':
+        pytest.skip('Реплика в тестах - копия базы SQLite')
+    path = str(tmp_path / 'replica.sqlite3')
+    connections.databases['replica'] = dict(
+        connection.settings_dict, NAME=path
+    )
+    settings.DATABASE_REPLICAS = ['replica']
+    caches[settings.API_CACHE_ALIAS].clear()
+
+    def copy():
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        connection.connection.backup(target)
+        target.close()
+
+    yield copy
+    connections['replica'].close()
+    del connections['replica']
+    del connections.databases['replica']
+
+
+@pytest.fixture
+def review(title, user):
+    return Review.objects.create(
+        title=title, author=user, text='Отзыв', score=7
+    )
+
+
+def reviews_url(title):
+    return f'/api/v1/titles/{title.id}/reviews/'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReplicas:
+
+    def test_safe_requests_read_replica(
+        self, replicate, review, guest_client
+    ):
+        replicate()
+        Review.objects.update(text='Изменённый отзыв')
+        response = guest_client.get(reviews_url(review.title))
+        assert response.status_code == 200
+        assert response.json()['results'][0]['text'] == 'Отзыв', (
+            'Проверьте, что GET-запросы читают из реплики'
+        )
+
+    def test_writer_reads_primary(
+        self, replicate, title, user_client, moderator_client
+    ):
+        replicate()
+        response = user_client.post(
+            reviews_url(title), data={'text': 'Новый отзыв', 'score': 5}
+        )
+        assert response.status_code == 201
+        assert Review.objects.filter(title=title).count() == 1, (
+            'Проверьте, что запись идёт в основную базу'
+        )
+        assert user_client.get(reviews_url(title)).json()['count'] == 1, (
+            'Проверьте, что автор изменений читает из основной базы'
+        )
+        assert moderator_client.get(
+            reviews_url(title)
+        ).json()['count'] == 0, (
+            'Проверьте, что остальные пользователи читают из реплики'
+        )
+
+    def test_pin_expires(self, replicate, title, user_client, settings):
+        settings.REPLICA_PIN_SECONDS = 0
+        replicate()
+        user_client.post(
+            reviews_url(title), data={'text': 'Новый отзыв', 'score': 5}
+        )
+        assert user_client.get(reviews_url(title)).json()['count'] == 0
+
+    def test_cached_responses_read_primary(
+        self, replicate, title, guest_client
+    ):
+        replicate()
+        Title.objects.filter(id=title.id).update(name='Чужие')
+        caches[settings.API_CACHE_ALIAS].clear()
+        response = guest_client.get(f'/api/v1/titles/{title.id}/')
+        assert response.json()['name'] == 'Чужие', (
+            'Проверьте, что кэш заполняется из основной базы'
+        )
+
+    def test_router(self, replicate):
+        router = ReplicaRouter()
+        assert router.db_for_read(Title) is None
+        with replica_reads():
+            assert router.db_for_read(Title) == 'replica'
+            assert router.db_for_write(Title) == 'default'
+            with transaction.atomic():
+                assert router.db_for_read(Title) is None, (
+                    'Проверьте, что внутри транзакции чтение идёт '
+                    'из основной базы'
+                )
+        assert router.allow_migrate('replica', 'reviews') is False
+
+    def test_async_reads_keep_routing(self, replicate):
+        seen = []
+
+        def view(request):
+            seen.append(
+                (threading.current_thread().name, reading_from_replica.get())
+            )
+            return HttpResponse()
+
+        async def request():
+            with replica_reads():
+                return await async_read_view(view)(
+                    AsyncRequestFactory().get('/')
+                )
+
+        async_to_sync(request)()
+        assert seen[0][0].startswith('api-read')
+        assert seen[0][1] is True, (
+            'Проверьте, что потоки чтения наследуют маршрутизацию запроса'
+        )
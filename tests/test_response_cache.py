@@ -0,0 +1,104 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Review
+
+
+def get(client, url, **extra):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, **extra)
+    return response, len(context.captured_queries)
+
+
+# Versions are bumped on commit, so tests need real transactions
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+
+    @pytest.mark.parametrize(
+        'url', ['/api/v1/titles/', '/api/v1/genres/', '/api/v1/categories/']
+    )
+    def test_repeated_list_skips_database(self, client, titles, url):
+        first, _ = get(client, url)
+        second, queries = get(client, url)
+
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        assert queries == 0
+        assert second['ETag'] == first['ETag']
+
+    def test_query_string_is_part_of_key(self, client, titles):
+        first, _ = get(client, '/api/v1/titles/?limit=2')
+        second, queries = get(client, '/api/v1/titles/?limit=3')
+
+        assert queries > 0
+        assert len(second.json()['results']) == 3
+        assert first['ETag'] != second['ETag']
+
+    def test_host_is_part_of_key(self, client, titles, settings):
+        settings.ALLOWED_HOSTS = ['first.test', 'second.test']
+        url = '/api/v1/titles/?limit=1'
+        get(client, url, HTTP_HOST='first.test')
+        response, _ = get(client, url, HTTP_HOST='second.test', secure=True)
+
+        assert response.json()['next'].startswith(
+            'https://second.test/api/v1/titles/'
+        ), 'Проверьте, что ссылки пагинации не берутся из ответа другому хосту'
+
+    def test_review_invalidates_title(self, client, title, user):
+        url = f'/api/v1/titles/{title.id}/'
+        assert get(client, url)[0].json()['rating'] is None
+
+        Review.objects.create(title=title, author=user, text='Текст', score=6)
+
+        assert get(client, url)[0].json()['rating'] == 6
+        assert get(client, '/api/v1/titles/')[0].json()[
+            'results'][0]['rating'] == 6
+
+    def test_command_invalidates_shared_cache(
+        self, shared_cache, client, title, user
+    ):
+        url = '/api/v1/titles/'
+        Review.objects.create(title=title, author=user, text='Текст', score=8)
+        assert get(client, url)[0].json()['results'][0]['rating'] == 8
+        # Bulk changes bypass signals, the command announces them
+        Review.objects.update(score=2)
+        call_command('rebuild_ratings', stdout=StringIO())
+
+        response, queries = get(client, url)
+        assert queries > 0
+        assert response.json()['results'][0]['rating'] == 2, (
+            'Проверьте, что команды сбрасывают кэш ответов в общем кэше'
+        )
+
+    def test_category_rename_invalidates_titles(self, client, title, category):
+        get(client, '/api/v1/titles/')
+
+        category.name = 'Кино'
+        category.save()
+
+        response, queries = get(client, '/api/v1/titles/')
+        assert queries > 0
+        assert response.json()['results'][0]['category']['name'] == 'Кино'
+
+    def test_unrelated_title_keeps_cached_detail(self, client, titles):
+        url = f'/api/v1/titles/{titles[0].id}/'
+        get(client, url)
+
+        titles[1].name = 'Другое'
+        titles[1].save()
+
+        assert get(client, url)[1] == 0
+
+    def test_if_none_match(self, client, titles):
+        etag = get(client, '/api/v1/titles/')[0]['ETag']
+
+        response, queries = get(
+            client, '/api/v1/titles/', HTTP_IF_NONE_MATCH=etag
+        )
+
+        assert response.status_code == 304
+        assert queries == 0
+        assert not response.content
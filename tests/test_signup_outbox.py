@@ -0,0 +1,75 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+from users.models import OutgoingEmail
+
+
+class FailingBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('SMTP is down')
+
+
+def send_outbox(**options):
+    out = StringIO()
+    call_command('send_outbox', '--once', stdout=out, **options)
+    return out.getvalue()
+
+
+def signup(client):
+    response = client.post(
+        '/api/v1/auth/signup/',
+        data={'username': 'newuser', 'email': 'newuser@yamdb.fake'},
+    )
+    assert response.status_code == 200, response.content
+
+
+@pytest.mark.django_db
+class TestSignupOutbox:
+
+    def test_signup_queues_email(self, client, django_user_model):
+        signup(client)
+
+        assert mail.outbox == []
+        email = OutgoingEmail.objects.get()
+        user = django_user_model.objects.get(username='newuser')
+        assert email.recipient == 'newuser@yamdb.fake'
+        assert user.confirmation_code in email.body
+        assert email.status == OutgoingEmail.PENDING
+
+    def test_worker_sends_batch(self, client):
+        signup(client)
+
+        output = send_outbox()
+
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['newuser@yamdb.fake']
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.SENT
+        assert email.attempts == 1
+        assert 'sent=1' in output
+
+    def test_worker_retries_with_backoff(self, client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_signup_outbox.FailingBackend'
+        signup(client)
+
+        output = send_outbox(backoff=10, max_attempts=2)
+
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.PENDING
+        assert email.attempts == 1
+        assert 'ConnectionRefusedError' in email.last_error
+        assert email.next_attempt_at > timezone.now() + timedelta(seconds=5)
+        assert 'retried=1' in output
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        send_outbox(backoff=10, max_attempts=2)
+
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.FAILED
+        assert email.attempts == 2
@@ -0,0 +1,124 @@
+import pytest
+from rest_framework_simplejwt.tokens import AccessToken
+from users.authentication import ClaimsUser
+
+from .fixtures.fixture_user import get_client
+
+
+@pytest.mark.django_db(transaction=True)
+class TestStatelessJWT:
+
+    def test_token_claims(self, client, user):
+        user.confirmation_code = 'code'
+        user.save()
+        response = client.post(
+            '/api/v1/auth/token/',
+            data={'username': user.username, 'confirmation_code': 'code'}
+        )
+        assert response.status_code == 200
+        token = AccessToken(response.json()['token'])
+        assert token['username'] == user.username, (
+            'Проверьте, что токен содержит имя пользователя'
+        )
+        assert token['role'] == 'user', (
+            'Проверьте, что токен содержит роль пользователя'
+        )
+        assert token['ver'] == user.token_version, (
+            'Проверьте, что токен содержит версию токенов пользователя'
+        )
+
+    def test_no_user_query(self, shared_cache, user_client, admin_client,
+                           django_assert_num_queries):
+        # The first request caches the token version
+        user_client.post('/api/v1/categories/', data={})
+        with django_assert_num_queries(0):
+            response = user_client.post(
+                '/api/v1/categories/', data={'name': 'Книги', 'slug': 'b'}
+            )
+        assert response.status_code == 403, (
+            'Проверьте, что права проверяются по данным из токена'
+        )
+        admin_client.post('/api/v1/categories/', data={})
+        # Slug uniqueness check and insert only
+        with django_assert_num_queries(2):
+            response = admin_client.post(
+                '/api/v1/categories/', data={'name': 'Книги', 'slug': 'b'}
+            )
+        assert response.status_code == 201, (
+            'Проверьте, что администратор определяется по данным из токена'
+        )
+
+    def test_local_cache_loads_user(self, user_client,
+                                    django_assert_num_queries):
+        user_client.get('/api/v1/users/me/')
+        with django_assert_num_queries(1):
+            response = user_client.post('/api/v1/categories/', data={})
+        assert response.status_code == 403, (
+            'Проверьте, что с кэшем одного процесса токены проверяются по базе'
+        )
+
+    @pytest.mark.parametrize('cache', ['local', 'shared'])
+    def test_deleted_user_token(self, request, cache, admin, admin_client):
+        if cache == 'shared':
+            request.getfixturevalue('shared_cache')
+        data = {'name': 'Книги', 'slug': 'b'}
+        # The first request caches the token version
+        admin_client.post('/api/v1/categories/', data={})
+        admin.delete()
+        response = admin_client.post('/api/v1/categories/', data=data)
+        assert response.status_code == 401, (
+            'Проверьте, что токены удалённого пользователя отклоняются'
+        )
+
+    def test_claims_user(self, user):
+        token = AccessToken.for_user(user)
+        token['role'] = 'moderator'
+        claims_user = ClaimsUser(token)
+        assert claims_user.id == user.id
+        assert claims_user.is_authenticated
+        assert claims_user.is_moderator and not claims_user.is_admin
+
+    def test_role_change_invalidates_token(self, user, user_client):
+        user.role = 'admin'
+        user.save()
+        response = user_client.get('/api/v1/titles/')
+        assert response.status_code == 401, (
+            'Проверьте, что смена роли делает выданные токены '
+            'недействительными'
+        )
+        response = get_client(user).post(
+            '/api/v1/categories/', data={'name': 'Книги', 'slug': 'b'}
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что новый токен содержит новую роль'
+        )
+
+    def test_other_changes_keep_token(self, user, user_client):
+        user.bio = 'Новое описание'
+        user.save()
+        response = user_client.get('/api/v1/titles/')
+        assert response.status_code == 200, (
+            'Проверьте, что изменение прочих полей не отзывает токены'
+        )
+
+    def test_profile_loads_user(self, user, user_client):
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == 200
+        assert response.json()['email'] == user.email, (
+            'Проверьте, что профиль возвращает данные из базы'
+        )
+        user.is_active = False
+        user.save()
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == 401, (
+            'Проверьте, что токены неактивного пользователя отклоняются'
+        )
+
+    def test_token_without_claims(self, user):
+        client = get_client()
+        token = AccessToken.for_user(user)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == 200, (
+            'Проверьте, что токены без данных о роли проверяются по базе'
+        )
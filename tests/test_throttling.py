@@ -0,0 +1,175 @@
+import pytest
+from api import throttling
+from api.throttling import CacheStore, MemoryStore
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+@pytest.fixture
+def rates(settings):
+    def set_rates(**rates):
+        settings.REST_FRAMEWORK = dict(
+            settings.REST_FRAMEWORK,
+            DEFAULT_THROTTLE_RATES={
+                scope.replace('_', '.'): rate for scope, rate in rates.items()
+            },
+        )
+    return set_rates
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Stopped time of the throttle stores, moved by assignment."""
+    class Clock:
+        now = 1000000.0
+
+        def __call__(self):
+            return self.now
+
+    clock = Clock()
+    monkeypatch.setattr(throttling.time, 'monotonic', clock)
+    monkeypatch.setattr(throttling.time, 'time', clock)
+    return clock
+
+
+def signup(client, number, address='10.0.0.1'):
+    return client.post(
+        SIGNUP_URL,
+        data={
+            'username': f'newcomer{number}',
+            'email': f'newcomer{number}@yamdb.fake',
+        },
+        REMOTE_ADDR=address,
+    )
+
+
+def assert_throttled(client, *args, **kwargs):
+    with CaptureQueriesContext(connection) as context:
+        response = client.post(*args, **kwargs)
+    assert response.status_code == 429
+    assert int(response['Retry-After']) > 0, (
+        'Проверьте, что ответ 429 содержит заголовок Retry-After'
+    )
+    assert not context.captured_queries, (
+        'Проверьте, что ограничение срабатывает без запросов к базе'
+    )
+    return response
+
+
+@pytest.mark.django_db
+class TestThrottling:
+
+    @pytest.mark.parametrize('store', ['memory', 'cache'])
+    def test_signup_by_address(self, client, rates, settings, store):
+        settings.THROTTLE_STORE = store
+        cache.clear()
+        rates(signup_ip='2/h')
+        assert signup(client, 1).status_code == 200
+        assert signup(client, 2).status_code == 200
+        assert_throttled(
+            client, SIGNUP_URL,
+            data={'username': 'newcomer3', 'email': 'newcomer3@yamdb.fake'},
+            REMOTE_ADDR='10.0.0.1',
+        )
+        assert signup(client, 3, address='10.0.0.2').status_code == 200, (
+            'Проверьте, что адреса ограничиваются по отдельности'
+        )
+
+    @pytest.mark.parametrize('proxies, throttled', [(0, True), (1, False)])
+    def test_forwarded_for(self, client, rates, settings, proxies, throttled):
+        rates(signup_ip='1/h')
+        settings.REST_FRAMEWORK = dict(
+            settings.REST_FRAMEWORK, NUM_PROXIES=proxies
+        )
+        statuses = [
+            client.post(
+                SIGNUP_URL,
+                data={
+                    'username': f'newcomer{number}',
+                    'email': f'newcomer{number}@yamdb.fake',
+                },
+                REMOTE_ADDR='10.0.0.1',
+                HTTP_X_FORWARDED_FOR=f'192.0.2.{number}',
+            ).status_code
+            for number in range(2)
+        ]
+        assert (statuses[1] == 429) is throttled, (
+            'Проверьте, что без прокси X-Forwarded-For не меняет адрес клиента'
+        )
+
+    def test_signup_by_username(self, client, rates):
+        rates(signup_username='1/h')
+        assert signup(client, 1).status_code == 200
+        response = assert_throttled(
+            client, SIGNUP_URL,
+            data={'username': 'NEWCOMER1', 'email': 'other@yamdb.fake'},
+            REMOTE_ADDR='10.0.0.2',
+        )
+        assert int(response['Retry-After']) == 3600
+
+    def test_confirmation_code_guessing(self, client, user, rates):
+        rates(token_username='3/h')
+        data = {'username': user.username, 'confirmation_code': 'guess'}
+        for address in ('10.0.0.1', '10.0.0.2', '10.0.0.3'):
+            response = client.post(TOKEN_URL, data=data, REMOTE_ADDR=address)
+            assert response.status_code == 400
+        assert_throttled(client, TOKEN_URL, data=data, REMOTE_ADDR='10.0.0.4')
+
+    def test_authenticated_users(self, user_client, admin_client, rates):
+        rates(user='2/m', ip='1/m')
+        for _ in range(2):
+            assert user_client.get('/api/v1/categories/').status_code == 200
+        response = user_client.get('/api/v1/categories/')
+        assert response.status_code == 429
+        assert admin_client.get('/api/v1/categories/').status_code == 200, (
+            'Проверьте, что пользователи ограничиваются по отдельности'
+        )
+
+    def test_no_rate_no_limit(self, client, rates):
+        rates()
+        for number in range(30):
+            assert signup(client, number).status_code == 200
+
+    @pytest.mark.parametrize('rate', ['0/m', '-1/h'])
+    def test_rate_below_one(self, rate):
+        with pytest.raises(ImproperlyConfigured):
+            throttling.parse_rate(rate)
+
+
+class TestStores:
+
+    def test_token_bucket(self, clock):
+        store = MemoryStore(max_entries=10)
+        assert store.consume('key', 2, 60) is None
+        assert store.consume('key', 2, 60) is None
+        assert store.consume('key', 2, 60) == pytest.approx(30)
+        clock.now += 30
+        assert store.consume('key', 2, 60) is None, (
+            'Проверьте, что токены пополняются со временем'
+        )
+        assert store.consume('other', 2, 60) is None
+
+    def test_least_recent_buckets_are_dropped(self, clock):
+        store = MemoryStore(max_entries=2)
+        for key in ('first', 'second', 'third'):
+            store.consume(key, 1, 60)
+        assert list(store.buckets) == ['second', 'third']
+
+    def test_sliding_window(self, clock):
+        cache.clear()
+        clock.now = 600.0
+        store = CacheStore('default')
+        assert store.consume('key', 2, 60) is None
+        assert store.consume('key', 2, 60) is None
+        assert store.consume('key', 2, 60) == pytest.approx(90)
+        clock.now += 60
+        assert store.consume('key', 2, 60) == pytest.approx(30), (
+            'Проверьте, что учитываются запросы прошлого окна'
+        )
+        clock.now += 30
+        assert store.consume('key', 2, 60) is None
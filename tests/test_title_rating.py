@@ -0,0 +1,63 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Review, Title
+
+
+def rating_of(title):
+    title.refresh_from_db()
+    return title.rating_sum, title.rating_count, title.rating
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_rating_follows_review_writes(self, title, user, moderator):
+        assert rating_of(title) == (0, 0, None)
+
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=4
+        )
+        Review.objects.create(
+            title=title, author=moderator, text='Текст', score=9
+        )
+        assert rating_of(title) == (13, 2, 6.5)
+
+        review.score = 10
+        review.save()
+        assert rating_of(title) == (19, 2, 9.5)
+
+        deferred = Review.objects.only('id').get(pk=review.pk)
+        deferred.score = 2
+        deferred.save()
+        assert rating_of(title) == (11, 2, 5.5)
+
+        deferred.delete()
+        assert rating_of(title) == (9, 1, 9.0)
+
+        moderator.delete()
+        assert rating_of(title) == (0, 0, None)
+
+    def test_rebuild_ratings_command(self, title, user):
+        Review.objects.create(title=title, author=user, text='Текст', score=7)
+        Title.objects.update(rating_sum=100, rating_count=3, rating=None)
+
+        call_command('rebuild_ratings', stdout=StringIO())
+
+        assert rating_of(title) == (7, 1, 7.0)
+
+    def test_titles_read_stored_rating(self, client, title, user):
+        Review.objects.create(title=title, author=user, text='Текст', score=8)
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/')
+
+        assert response.status_code == 200
+        assert response.json()['results'][0]['rating'] == 8
+        assert not any(
+            Review._meta.db_table in query['sql']
+            for query in context.captured_queries
+        ), 'Список произведений не должен обращаться к таблице отзывов'
@@ -0,0 +1,83 @@
+import pytest
+from reviews.models import Genre, Title
+
+
+def names(response):
+    assert response.status_code == 200, response.content
+    return [item['name'] for item in response.json()['results']]
+
+
+@pytest.fixture
+def library(category, genres):
+    data = [
+        ('Мастер и Маргарита', 1967),
+        ('Маргарита', 2000),
+        ('Собачье сердце', 1987),
+        ('Master of Puppets', 1986),
+    ]
+    titles = [
+        Title.objects.create(name=name, year=year, category=category)
+        for name, year in data
+    ]
+    titles[0].genre.set(genres)
+    titles[2].genre.set(genres[:1])
+    return titles
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_name_substring(self, client, library):
+        response = client.get('/api/v1/titles/?name=аргари')
+
+        assert names(response) == ['Маргарита', 'Мастер и Маргарита']
+
+    def test_name_substring_is_case_insensitive(self, client, library):
+        response = client.get('/api/v1/titles/?name=PUPPET')
+
+        assert names(response) == ['Master of Puppets']
+
+    def test_short_name_substring(self, client, library):
+        response = client.get('/api/v1/titles/?name=ас')
+
+        assert names(response) == ['Мастер и Маргарита']
+
+    def test_index_follows_updates(self, client, library):
+        library[2].name = 'Роковые яйца'
+        library[2].save()
+        Title.objects.filter(pk=library[3].pk).delete()
+
+        assert names(client.get('/api/v1/titles/?name=яйца')) == [
+            'Роковые яйца'
+        ]
+        assert names(client.get('/api/v1/titles/?name=сердце')) == []
+        assert names(client.get('/api/v1/titles/?name=Puppets')) == []
+
+    def test_genre_without_duplicates(self, client, library):
+        response = client.get('/api/v1/titles/?genre=genre')
+
+        assert names(response) == ['Мастер и Маргарита', 'Собачье сердце']
+
+    def test_genre_and_category(self, client, library):
+        Genre.objects.create(name='Другой', slug='other')
+
+        response = client.get('/api/v1/titles/?genre=genre_2&category=film')
+
+        assert names(response) == ['Мастер и Маргарита']
+
+    def test_ranked_query(self, client, library):
+        response = client.get('/api/v1/titles/?q=Маргарита')
+
+        assert names(response) == ['Маргарита', 'Мастер и Маргарита']
+
+    def test_ranked_query_keeps_explicit_ordering(self, client, library):
+        response = client.get('/api/v1/titles/?q=Маргарита&ordering=-year')
+
+        assert names(response) == ['Маргарита', 'Мастер и Маргарита']
+        response = client.get('/api/v1/titles/?q=Маргарита&ordering=year')
+        assert names(response) == ['Мастер и Маргарита', 'Маргарита']
+
+    def test_exact_search(self, client, library):
+        response = client.get('/api/v1/titles/?search=Маргарита')
+
+        assert names(response) == ['Маргарита']
@@ -0,0 +1,77 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from reviews.models import Review, TitleScoreBucket
+from reviews.ratings import score_stats
+
+
+def histogram_of(title):
+    return dict(
+        TitleScoreBucket.objects.filter(
+            title=title, count__gt=0
+        ).values_list('score', 'count')
+    )
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    def test_histogram_follows_review_writes(self, title, user, moderator):
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=4
+        )
+        Review.objects.create(
+            title=title, author=moderator, text='Текст', score=4
+        )
+        assert histogram_of(title) == {4: 2}
+
+        review.score = 10
+        review.save()
+        assert histogram_of(title) == {4: 1, 10: 1}
+
+        review.delete()
+        assert histogram_of(title) == {4: 1}
+
+    def test_rebuild(self, title, user):
+        Review.objects.create(title=title, author=user, text='Текст', score=7)
+        TitleScoreBucket.objects.all().delete()
+
+        call_command('rebuild_ratings', stdout=StringIO())
+
+        assert histogram_of(title) == {7: 1}, (
+            'Проверьте, что rebuild_ratings пересчитывает гистограммы оценок'
+        )
+
+    def test_score_stats(self):
+        assert score_stats({})['median'] is None
+        stats = score_stats({2: 1, 5: 2, 9: 1})
+        assert stats['count'] == 4
+        assert stats['mean'] == 5.25
+        assert stats['median'] == 5
+        assert score_stats({2: 1, 9: 1})['median'] == 5.5
+        assert list(stats['histogram']) == list(range(1, 11))
+
+    def test_endpoint(self, client, title, user, moderator,
+                      django_assert_num_queries):
+        Review.objects.create(title=title, author=user, text='Текст', score=3)
+        Review.objects.create(
+            title=title, author=moderator, text='Текст', score=8
+        )
+        with django_assert_num_queries(1):
+            response = client.get(f'/api/v1/titles/{title.id}/stats/')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == 2
+        assert data['mean'] == 5.5
+        assert data['median'] == 5.5
+        assert data['histogram']['3'] == 1 and data['histogram']['1'] == 0, (
+            'Проверьте, что гистограмма содержит все оценки от 1 до 10'
+        )
+
+    def test_endpoint_without_reviews(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.id}/stats/')
+        assert response.status_code == 200
+        assert response.json()['count'] == 0
+        response = client.get(f'/api/v1/titles/{title.id + 1}/stats/')
+        assert response.status_code == 404
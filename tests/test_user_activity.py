@@ -0,0 +1,143 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Comment, Review
+
+COUNTERS = 'review_count,comment_count,average_score'
+
+
+def activity_of(user):
+    user.refresh_from_db()
+    return user.review_count, user.comment_count, user.average_score
+
+
+@pytest.fixture
+def other_title(category):
+    from reviews.models import Title
+    return Title.objects.create(name='Чужие', year=1986, category=category)
+
+
+@pytest.mark.django_db
+class TestUserActivity:
+
+    def test_counters_follow_writes(self, title, other_title, user, admin):
+        assert activity_of(user) == (0, 0, None)
+
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=4
+        )
+        Review.objects.create(
+            title=other_title, author=user, text='Текст', score=9
+        )
+        comment = Comment.objects.create(
+            review=review, author=user, text='Комментарий'
+        )
+        Comment.objects.create(review=review, author=admin, text='Ответ')
+        assert activity_of(user) == (2, 1, 6.5)
+
+        review.score = 10
+        review.save()
+        assert activity_of(user) == (2, 1, 9.5)
+
+        comment.delete()
+        assert activity_of(user) == (2, 0, 9.5)
+
+        review.delete()
+        assert activity_of(user) == (1, 0, 9.0)
+        assert activity_of(admin) == (0, 0, None), (
+            'Проверьте, что комментарии удалённого отзыва вычитаются'
+        )
+
+    def test_queryset_delete(self, title, user, admin):
+        review = Review.objects.create(
+            title=title, author=admin, text='Текст', score=4
+        )
+        for text in ('Первый', 'Второй'):
+            Comment.objects.create(review=review, author=user, text=text)
+        Comment.objects.filter(review=review).delete()
+        assert activity_of(user) == (0, 0, None), (
+            'Проверьте, что удаление комментариев запросом вычитает их'
+        )
+
+    def test_review_author_change(self, title, user, admin):
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=4
+        )
+        review.author = admin
+        review.score = 8
+        review.save()
+        assert activity_of(user) == (0, 0, None)
+        assert activity_of(admin) == (1, 0, 8.0), (
+            'Проверьте, что отзыв переходит к новому автору'
+        )
+
+    def test_user_save_keeps_counters(self, title, user):
+        stale = type(user).objects.get(pk=user.pk)
+        Review.objects.create(title=title, author=user, text='Текст', score=5)
+        stale.bio = 'Обо мне'
+        stale.save()
+        assert activity_of(user) == (1, 0, 5.0), (
+            'Проверьте, что сохранение пользователя не затирает счётчики'
+        )
+
+    def test_rebuild_command(self, title, user, admin):
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=7
+        )
+        Comment.objects.create(review=review, author=admin, text='Ответ')
+        type(user).objects.update(
+            review_count=5, review_score_sum=1, comment_count=3
+        )
+
+        call_command('rebuild_user_activity', stdout=StringIO())
+
+        assert activity_of(user) == (1, 0, 7.0)
+        assert activity_of(admin) == (0, 1, None)
+
+    def test_fields_opt_in(self, title, user, user_client, admin_client):
+        Review.objects.create(title=title, author=user, text='Текст', score=6)
+
+        profile = user_client.get('/api/v1/users/me/').json()
+        assert 'review_count' not in profile, (
+            'Проверьте, что счётчики не входят в ответ по умолчанию'
+        )
+        assert 'email' in profile
+
+        profile = user_client.get(
+            f'/api/v1/users/me/?fields=username,{COUNTERS}'
+        ).json()
+        assert profile == {
+            'username': user.username,
+            'review_count': 1,
+            'comment_count': 0,
+            'average_score': 6.0,
+        }
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(f'/api/v1/users/?fields={COUNTERS}')
+        assert response.status_code == 200
+        assert {'review_count': 1, 'comment_count': 0, 'average_score': 6.0} in (
+            response.json()['results']
+        )
+        assert not any(
+            'reviews_review' in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что счётчики читаются из полей пользователя'
+
+    def test_fields_do_not_limit_input(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/users/?fields=username',
+            data={'username': 'created', 'email': 'created@yamdb.fake'},
+        )
+        assert response.status_code == 201
+        assert response.json() == {'username': 'created'}
+
+    def test_counters_are_read_only(self, user_client, user):
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'review_count': 100}
+        )
+        assert response.status_code == 200
+        assert activity_of(user) == (0, 0, None)